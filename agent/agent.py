@@ -8,13 +8,20 @@ from .tools import tools
 # Load environment variables before creating agent
 load_dotenv()
 
-BASE_SYSTEM_PROMPT = """You are a helpful assistant that can answer questions and help with tasks. You can use the semantic_search tool to find relevant information from the knowledge base."""
+# Send parallel_tool_calls=true/false with each LLM request; unset leaves it out,
+# since many local OpenAI-compatible servers reject the option. Either way the
+# agent's tool node runs all tool calls of one step concurrently
+AGENT_PARALLEL_TOOL_CALLS = (
+    os.getenv("AGENT_PARALLEL_TOOL_CALLS").lower() == "true" if os.getenv("AGENT_PARALLEL_TOOL_CALLS") else None
+)
+
+BASE_SYSTEM_PROMPT = """You are a helpful assistant that can answer questions and help with tasks. You can use the semantic_search tool to find relevant information from the knowledge base. When a question needs several lookups, search for them together with semantic_search_batch, or request all independent tool calls at once instead of one after another."""
 
 _agent_instance = None
 
 def create_agent_instance():
     """Initialize and return the LangChain agent"""
-    llm = get_llm()
+    llm = get_llm(parallel_tool_calls=AGENT_PARALLEL_TOOL_CALLS)
     
     agent = create_agent(
         model=llm,
@@ -26,8 +33,15 @@ def create_agent_instance():
     return agent
 
 
-def get_agent_with_history():
-    """Get agent instance (singleton pattern)"""
+def get_agent():
+    """
+    Get agent instance (singleton pattern).
+
+    The agent is stateless; conversation history is supplied per request
+    by services.conversation_memory. Its tools are async only (they use the
+    async database pool), so run it with ainvoke or astream_events; a sync
+    invoke fails when the model calls a tool.
+    """
     global _agent_instance
     if _agent_instance is None:
         _agent_instance = create_agent_instance()
@@ -0,0 +1,12 @@
+from contextvars import ContextVar
+from typing import Optional, Set
+from database.models import DEFAULT_COLLECTION
+
+# Collection searched by the agent's tools for the current request. Set by the
+# chat controller; asyncio tasks spawned while running the agent inherit it.
+current_collection: ContextVar[str] = ContextVar("current_collection", default=DEFAULT_COLLECTION)
+
+# IDs of the documents the agent's searches returned during the current
+# request, so a cached answer can be invalidated when one of them changes.
+# The chat controller sets a fresh set per request; None means not tracked.
+retrieved_documents: ContextVar[Optional[Set[str]]] = ContextVar("retrieved_documents", default=None)
@@ -0,0 +1,200 @@
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Set
+
+# LLM tokens the semantic_search tool may return per call (0 = unlimited)
+SEARCH_CONTEXT_TOKEN_BUDGET = int(os.getenv("SEARCH_CONTEXT_TOKEN_BUDGET", "1500"))
+# Share of a passage's word trigrams found in a better-ranked passage above which it is dropped
+SEARCH_DUPLICATE_THRESHOLD = float(os.getenv("SEARCH_DUPLICATE_THRESHOLD", "0.8"))
+
+# Shortest repeated text treated as chunker overlap between neighbouring chunks
+MIN_OVERLAP_CHARS = 8
+
+WORD = re.compile(r"\w+")
+
+
+@dataclass(eq=False)
+class Passage:
+    """Text of one or more neighbouring chunks of a document, shown as a single result."""
+    document_id: str
+    rank: int  # position of its best hit in the search results
+    similarity: float  # of its best hit
+    chunks: Dict[Optional[int], str] = field(default_factory=dict)
+    first: Optional[int] = None
+    last: Optional[int] = None
+    text: str = ""
+
+
+@dataclass
+class PackedContext:
+    text: str
+    document_ids: Set[str]  # documents of the passages that were included
+    passages: int
+    merged: int  # hits folded into another hit's passage
+    duplicates: int  # passages dropped as near-duplicates
+    truncated: bool
+    raw_tokens: int  # tokens of the unpacked results
+    tokens: int
+
+    @property
+    def tokens_saved(self) -> int:
+        return max(0, self.raw_tokens - self.tokens)
+
+
+def format_result(number: int, similarity: float, body: str) -> str:
+    return f"[Result {number}] (Similarity: {similarity:.2%})\n{body}\n---"
+
+
+def pack_results(
+    results: List[Dict],
+    count_tokens: Callable[[str], int],
+    token_budget: int = SEARCH_CONTEXT_TOKEN_BUDGET,
+    duplicate_threshold: float = SEARCH_DUPLICATE_THRESHOLD
+) -> PackedContext:
+    """
+    Assemble search results into a token-budgeted context for the LLM.
+
+    Hits from the same document whose chunks overlap or are adjacent are
+    merged into one passage, with the text the chunker repeated between
+    neighbouring chunks removed. Passages mostly repeating a better-ranked
+    one are dropped. The rest are added in rank order while they fit the
+    budget; a passage that alone exceeds the remaining budget is cut only
+    if nothing has been added yet, so the LLM always gets something.
+
+    Args:
+        results: Search results in rank order (with "context" when that projection was used)
+        count_tokens: Counts the LLM tokens of a text
+        token_budget: Maximum tokens of the packed text (0 = unlimited)
+        duplicate_threshold: Trigram overlap above which a passage counts as a duplicate
+
+    Returns:
+        PackedContext with the text and what packing did
+    """
+    raw_tokens = count_tokens("\n\n".join(
+        format_result(number, result["similarity"], _result_body(result))
+        for number, result in enumerate(results, 1)
+    ))
+
+    passages = _merge(results)
+    kept, shingles = [], []
+    for passage in passages:
+        words = _shingles(passage.text)
+        if any(_overlap(words, other) >= duplicate_threshold for other in shingles):
+            continue
+        kept.append(passage)
+        shingles.append(words)
+
+    blocks, document_ids, used, truncated = [], set(), 0, False
+    for passage in kept:
+        block = format_result(len(blocks) + 1, passage.similarity, passage.text)
+        tokens = count_tokens(block)
+        if token_budget and used + tokens > token_budget:
+            if blocks:
+                continue  # a smaller passage further down may still fit
+            block, tokens = _truncate(passage, token_budget, count_tokens)
+            truncated = True
+        blocks.append(block)
+        document_ids.add(passage.document_id)
+        used += tokens
+
+    return PackedContext(
+        text="\n\n".join(blocks),
+        document_ids=document_ids,
+        passages=len(blocks),
+        merged=len(results) - len(passages),
+        duplicates=len(passages) - len(kept),
+        truncated=truncated,
+        raw_tokens=raw_tokens,
+        tokens=used
+    )
+
+
+def _result_body(result: Dict) -> str:
+    if "context" in result:
+        return "\n".join(chunk["text"] for chunk in result["context"])
+    return result["chunk_text"]
+
+
+def _merge(results: List[Dict]) -> List[Passage]:
+    """Group hits into passages of overlapping or adjacent chunks, ordered by their best hit."""
+    passages: List[Passage] = []
+    spans: Dict[str, List[Passage]] = {}
+    for rank, result in enumerate(results):
+        if "context" in result:
+            chunks = {chunk["chunk_index"]: chunk["text"] for chunk in result["context"]}
+        else:
+            chunks = {result["chunk_index"]: result["chunk_text"]}
+        passage = Passage(result["document_id"], rank, result["similarity"], chunks)
+        if None in chunks:
+            # Chunks stored without a position cannot be placed next to others
+            passage.text = chunks[None]
+            passages.append(passage)
+            continue
+        passage.first, passage.last = min(chunks), max(chunks)
+
+        # Absorb every earlier passage of the document this one touches
+        document_spans = spans.setdefault(result["document_id"], [])
+        for other in list(document_spans):
+            if passage.first <= other.last + 1 and other.first <= passage.last + 1:
+                passage.rank = min(passage.rank, other.rank)
+                passage.similarity = max(passage.similarity, other.similarity)
+                passage.chunks.update(other.chunks)
+                passage.first, passage.last = min(passage.first, other.first), max(passage.last, other.last)
+                document_spans.remove(other)
+                passages.remove(other)
+        document_spans.append(passage)
+        passages.append(passage)
+
+    for passage in passages:
+        if passage.first is not None:
+            passage.text = _join(passage.chunks)
+    passages.sort(key=lambda passage: passage.rank)
+    return passages
+
+
+def _join(chunks: Dict[int, str]) -> str:
+    """Concatenate chunks in document order, dropping the overlap between consecutive ones."""
+    parts, previous_index, previous_text = [], None, ""
+    for index in sorted(chunks):
+        text = chunks[index]
+        if previous_index is not None and index == previous_index + 1:
+            text = _strip_overlap(previous_text, text)
+        elif previous_index is not None:
+            parts.append("\n[...]\n")
+        parts.append(text)
+        previous_index, previous_text = index, chunks[index]
+    return "".join(parts)
+
+
+def _strip_overlap(previous: str, text: str) -> str:
+    """Remove the longest prefix of text that previous ends with (the chunker overlap)."""
+    for size in range(min(len(previous), len(text)) // 2, MIN_OVERLAP_CHARS - 1, -1):
+        if previous.endswith(text[:size]):
+            return text[size:]
+    return text if previous[-1:].isspace() or text[:1].isspace() else " " + text
+
+
+def _shingles(text: str) -> Set[tuple]:
+    words = WORD.findall(text.lower())
+    return {tuple(words[i:i + 3]) for i in range(max(1, len(words) - 2))}
+
+
+def _overlap(words: Set[tuple], other: Set[tuple]) -> float:
+    """Share of a passage's trigrams also found in another; a passage extending another is not a duplicate."""
+    if not words:
+        return 0.0
+    return len(words & other) / len(words)
+
+
+def _truncate(passage: Passage, token_budget: int, count_tokens: Callable[[str], int]):
+    """Cut a passage's text until its formatted block fits the budget."""
+    text = passage.text
+    while text:
+        block = format_result(1, passage.similarity, text + " [...]")
+        tokens = count_tokens(block)
+        if tokens <= token_budget:
+            return block, tokens
+        text = text[:int(len(text) * token_budget / tokens * 0.95)]
+    block = format_result(1, passage.similarity, "[...]")
+    return block, count_tokens(block)
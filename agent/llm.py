@@ -1,21 +1,72 @@
 import os
+import threading
+from typing import Callable, Optional
 from dotenv import load_dotenv
 from langchain_openai import ChatOpenAI
+from utils.logger import logger
 
 load_dotenv()
 
-def get_llm():
+# Tokenizer used to measure text sent to the LLM: empty uses the chat model's
+# own counter (tiktoken for OpenAI models); a GGUF path loads that model's vocabulary
+LLM_TOKENIZER = os.getenv("LLM_TOKENIZER", "")
+
+_token_counter = None
+_token_counter_lock = threading.Lock()
+
+def get_llm(parallel_tool_calls: Optional[bool] = None):
     """
     Get LLM instance based on configuration.
+
+    Args:
+        parallel_tool_calls: Let the model request several tool calls in one
+            turn (None leaves the server default). Only for a model that is
+            given tools; the API rejects the option otherwise.
     """
     model_name = os.getenv("LLM_MODEL")
     api_key = os.getenv("LLM_API_KEY")
     temperature = 0
     base_url = os.getenv("LLM_BASE_URL")
+    model_kwargs = {}
+    if parallel_tool_calls is not None:
+        model_kwargs["parallel_tool_calls"] = parallel_tool_calls
     
     return ChatOpenAI(
         model=model_name,
         temperature=temperature,
         openai_api_key=api_key,
         openai_api_base=base_url,
-    )
\ No newline at end of file
+        model_kwargs=model_kwargs,
+    )
+
+
+def get_token_counter() -> Callable[[str], int]:
+    """
+    Get a function counting the LLM tokens of a text (created on first use).
+
+    Falls back to an estimate of four characters per token, with a warning,
+    if the chat model's tokenizer is unavailable (e.g. tiktoken data cannot
+    be downloaded). Creating it may load a vocabulary or download tiktoken
+    data, so async code should call this off the event loop; the app warms
+    it up at startup.
+    """
+    global _token_counter
+    with _token_counter_lock:
+        if _token_counter is None:
+            _token_counter = _create_token_counter()
+    return _token_counter
+
+
+def _create_token_counter() -> Callable[[str], int]:
+    if LLM_TOKENIZER:
+        from llama_cpp import Llama
+
+        vocab = Llama(model_path=LLM_TOKENIZER, vocab_only=True, verbose=False)
+        return lambda text: len(vocab.tokenize(text.encode("utf-8"), add_bos=False))
+    llm = get_llm()
+    try:
+        llm.get_num_tokens("tokenizer check")
+        return llm.get_num_tokens
+    except Exception as e:
+        logger.warning(f"[LLM] no tokenizer for {llm.model_name}, estimating tokens: {str(e)}")
+        return lambda text: (len(text) + 3) // 4
@@ -0,0 +1,68 @@
+import os
+import time
+from typing import Any, Dict
+from uuid import UUID
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+from utils.metrics import LLM_SECONDS, LLM_TOKENS
+
+
+class AgentMetricsCallback(BaseCallbackHandler):
+    """
+    Per-request callback that times LLM calls and counts their tokens.
+    
+    One instance is passed in the run config of each chat request; after the
+    run, ``steps`` holds the number of LLM calls the agent made and
+    ``prompt_tokens``/``completion_tokens`` the usage the server reported.
+    Servers that report no usage simply add nothing to llm_tokens_total.
+    """
+    
+    # Record inline instead of on an executor thread; the work is trivial
+    run_inline = True
+    
+    def __init__(self, model: str = None):
+        self.model = model or os.getenv("LLM_MODEL") or "unknown"
+        self.steps = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self._started: Dict[UUID, float] = {}
+    
+    def on_chat_model_start(self, serialized: Dict[str, Any], messages, *, run_id: UUID, **kwargs):
+        self._started[run_id] = time.perf_counter()
+    
+    def on_llm_start(self, serialized: Dict[str, Any], prompts, *, run_id: UUID, **kwargs):
+        self._started[run_id] = time.perf_counter()
+    
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs):
+        started = self._started.pop(run_id, None)
+        if started is not None:
+            LLM_SECONDS.labels(self.model).observe(time.perf_counter() - started)
+        self.steps += 1
+        
+        prompt_tokens, completion_tokens = self._usage(response)
+        self.prompt_tokens += prompt_tokens
+        self.completion_tokens += completion_tokens
+        if prompt_tokens:
+            LLM_TOKENS.labels(self.model, "prompt").inc(prompt_tokens)
+        if completion_tokens:
+            LLM_TOKENS.labels(self.model, "completion").inc(completion_tokens)
+    
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs):
+        self._started.pop(run_id, None)
+        self.steps += 1
+    
+    @staticmethod
+    def _usage(response: LLMResult):
+        """Token usage from the generated messages, falling back to the provider's llm_output."""
+        prompt_tokens = completion_tokens = 0
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+                if usage:
+                    prompt_tokens += usage.get("input_tokens", 0)
+                    completion_tokens += usage.get("output_tokens", 0)
+        if not prompt_tokens and not completion_tokens:
+            usage = (response.llm_output or {}).get("token_usage") or {}
+            prompt_tokens = usage.get("prompt_tokens", 0) or 0
+            completion_tokens = usage.get("completion_tokens", 0) or 0
+        return prompt_tokens, completion_tokens
@@ -1,6 +1,7 @@
-from .semantic_search_tool import semantic_search_tool
+from .semantic_search_tool import semantic_search_tool, semantic_search_batch_tool
 
-tools = [semantic_search_tool]
+# Async-only tools: the agent must be run with ainvoke/astream_events
+tools = [semantic_search_tool, semantic_search_batch_tool]
 
-__all__ = ["tools", "semantic_search_tool"]
+__all__ = ["tools", "semantic_search_tool", "semantic_search_batch_tool"]
 
@@ -1,62 +1,210 @@
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from itertools import zip_longest
+from typing import AsyncIterator, Dict, List, Optional
 from langchain_core.tools import tool
-from sqlalchemy.orm import Session
-from services.semantic_search_service import SemanticSearchService
-from services.embedding_service import EmbeddingService
-from database.database import SessionLocal
-from utils.tool_logger import log_tool_call
+from sqlalchemy.ext.asyncio import AsyncConnection
+from services.semantic_search_service import SemanticSearchService, SEARCH_MODE
+from services.search_options import SearchOptions
+from services.model_registry import get_embedding_service
+from services.collection_service import collection_service
+from agent.context import current_collection, retrieved_documents
+from agent.context_packing import pack_results
+from agent.llm import get_token_counter
+from database.database import read_only_connection
+from utils.logger import logger
+from utils.tool_logger import ToolErrorMessage, log_tool_call
+from utils.metrics import SEARCH_CONTEXT_TOKENS, stage_timer
 
+# Most queries one semantic_search_batch call may run
+SEARCH_BATCH_MAX_QUERIES = int(os.getenv("SEARCH_BATCH_MAX_QUERIES", "8"))
 
 # Initialize services (singleton pattern)
-_embedding_service = None
 _search_service = None
 
 def get_search_service():
     """Get or create semantic search service instance"""
-    global _embedding_service, _search_service
+    global _search_service
     if _search_service is None:
-        if _embedding_service is None:
-            _embedding_service = EmbeddingService()
-        _search_service = SemanticSearchService(_embedding_service)
+        # Share the embedding model with the HTTP controllers
+        _search_service = SemanticSearchService(get_embedding_service())
     return _search_service
 
 
 @tool
 @log_tool_call
-def semantic_search(query: str, limit: int = 5) -> str:
+async def semantic_search(
+    query: str,
+    limit: int = 5,
+    mode: str = SEARCH_MODE,
+    context: int = 0,
+    filters: Optional[dict] = None
+) -> str:
     """
     Perform semantic search on stored documents using vector similarity.
     Use this tool to find relevant information from the knowledge base.
+    Hybrid mode also matches exact keywords such as names, IDs and error codes.
     
     Args:
         query: The search query/question to find relevant information
         limit: Maximum number of results to return (default: 5)
+        mode: "hybrid" (keyword + vector, default) or "vector" (similarity only)
+        context: Number of adjacent chunks to include before and after each result (default: 0)
+        filters: Optional metadata filter, e.g. {"source": "wiki", "tags": {"$contains": "billing"},
+            "published": {"$gte": "2024-01-01"}, "lang": {"$in": ["en", "de"]}}
         
     Returns:
         A formatted string containing the most relevant chunks of text from the knowledge base
     """
-    db = SessionLocal()
     try:
         search_service = get_search_service()
-        results = search_service.search(db, query, limit=limit)
+        projection = {"projection": "context", "context_window": context} if context > 0 else {}
+        collection = current_collection.get()
+        scope = await _search_scope(search_service, collection, filters)
+        if scope is None:
+            return f"Collection {collection} does not exist."
+        options = SearchOptions.of(scope, limit=limit, **projection)
+        # Embed before taking a connection, so none is held while inference runs
+        with stage_timer("search", "embed"):
+            query_embedding = await search_service.embedding_service.acreate_embedding(query)
+        async with _search_connection(search_service) as db:
+            if mode == "vector":
+                results = await search_service.asearch_by_embedding(db, query_embedding, options, query=query)
+            else:
+                results = await search_service.ahybrid_search_by_embedding(db, query, query_embedding, options)
         
         if not results:
             return "No relevant information found in the knowledge base."
         
-        # Format results
-        formatted_results = []
-        for i, result in enumerate(results, 1):
-            formatted_results.append(
-                f"[Result {i}] (Similarity: {result['similarity']:.2%})\n"
-                f"{result['chunk_text']}\n"
-                f"---"
-            )
+        return await _apack(results)
+    except Exception as e:
+        return ToolErrorMessage(f"Error performing semantic search: {str(e)}")
+
+
+@tool
+@log_tool_call
+async def semantic_search_batch(
+    queries: List[str],
+    limit: int = 5,
+    mode: str = SEARCH_MODE,
+    context: int = 0,
+    filters: Optional[dict] = None
+) -> str:
+    """
+    Run several semantic searches on stored documents in one call.
+    Use this instead of repeated semantic_search calls when a question has
+    several parts, or to search for different phrasings of the same question.
+    
+    Args:
+        queries: The search queries/questions, one per aspect to look up
+        limit: Maximum number of results per query (default: 5)
+        mode: "hybrid" (keyword + vector, default) or "vector" (similarity only)
+        context: Number of adjacent chunks to include before and after each result (default: 0)
+        filters: Optional metadata filter applied to every query (same format as semantic_search)
+        
+    Returns:
+        A formatted string containing the most relevant chunks of text for all queries together
+    """
+    try:
+        queries = list(dict.fromkeys(query for query in queries if query.strip()))
+        if not queries:
+            return "No queries given."
+        if len(queries) > SEARCH_BATCH_MAX_QUERIES:
+            return f"Too many queries: at most {SEARCH_BATCH_MAX_QUERIES} per call."
+        search_service = get_search_service()
+        projection = {"projection": "context", "context_window": context} if context > 0 else {}
+        collection = current_collection.get()
+        scope = await _search_scope(search_service, collection, filters)
+        if scope is None:
+            return f"Collection {collection} does not exist."
+        options = SearchOptions.of(scope, limit=limit, **projection)
+        # All queries share one embedding batch and one search statement
+        with stage_timer("search", "embed", queries=len(queries)):
+            query_embeddings = await search_service.embedding_service.acreate_embeddings(queries)
+        async with _search_connection(search_service) as db:
+            if mode == "vector":
+                result_lists = await search_service.asearch_many_by_embedding(db, queries, query_embeddings, options)
+            else:
+                result_lists = await search_service.ahybrid_search_many_by_embedding(
+                    db, queries, query_embeddings, options
+                )
+        
+        results = _interleave(result_lists)
+        if not results:
+            return "No relevant information found in the knowledge base."
         
-        return "\n\n".join(formatted_results)
+        return await _apack(results)
     except Exception as e:
-        return f"Error performing semantic search: {str(e)}"
-    finally:
-        db.close()
+        return ToolErrorMessage(f"Error performing semantic search: {str(e)}")
+
+
+async def _search_scope(
+    search_service: SemanticSearchService,
+    collection: str,
+    filters: Optional[dict]
+) -> Optional[SearchOptions]:
+    """Search options scoped to a collection, or None if it does not exist."""
+    backend = search_service.backend
+    if not backend.uses_database:
+        # The local backend runs without Postgres, so it answers for its own collections
+        if not backend.has_collection(collection):
+            return None
+        return SearchOptions(collection=collection, filters=filters)
+    quantization = await collection_service.aquantization(collection)  # cached after the first call
+    if quantization is None:
+        return None
+    return SearchOptions(collection=collection, quantization=quantization, filters=filters)
+
+
+@asynccontextmanager
+async def _search_connection(search_service: SemanticSearchService) -> AsyncIterator[Optional[AsyncConnection]]:
+    """Read-only connection for a search, or None for a backend that does not use the database."""
+    if not search_service.backend.uses_database:
+        yield None
+        return
+    # Searches only read, so skip the ORM session and run in a read-only transaction
+    async with read_only_connection() as db:
+        yield db
+
+
+def _interleave(result_lists: List[List[Dict]]) -> List[Dict]:
+    """
+    Merge per-query results rank by rank (every query's best hit first), keeping
+    the first occurrence of a chunk found by several queries, so each query is
+    represented when the token budget cuts the list short.
+    """
+    results, seen = [], set()
+    for rank in zip_longest(*result_lists):
+        for result in rank:
+            if result is not None and result["chunk_id"] not in seen:
+                seen.add(result["chunk_id"])
+                results.append(result)
+    return results
+
+
+async def _apack(results: List[Dict]) -> str:
+    """Pack results into the tool's answer and record the documents it shows."""
+    # Merge neighbouring chunks, drop near-duplicates and fit the token budget; tokenizing
+    # (and creating the tokenizer, which may download its data) stays off the event loop
+    with stage_timer("search", "pack"):
+        count_tokens = await asyncio.to_thread(get_token_counter)
+        packed = await asyncio.to_thread(pack_results, results, count_tokens)
+    SEARCH_CONTEXT_TOKENS.labels("raw").observe(packed.raw_tokens)
+    SEARCH_CONTEXT_TOKENS.labels("packed").observe(packed.tokens)
+    logger.info(
+        f"[CONTEXT] {len(results)} hits -> {packed.passages} passages "
+        f"({packed.merged} merged, {packed.duplicates} duplicates{', truncated' if packed.truncated else ''}): "
+        f"{packed.tokens} tokens, {packed.tokens_saved} saved"
+    )
+    
+    retrieved = retrieved_documents.get()
+    if retrieved is not None:
+        retrieved.update(packed.document_ids)
+    
+    return packed.text
 
 
 semantic_search_tool = semantic_search
+semantic_search_batch_tool = semantic_search_batch
 
@@ -0,0 +1,77 @@
+"""
+Recall@k and latency of ANN search against exact (sequential scan) search.
+
+Usage:
+    python -m benchmarks.bench_ann_recall --queries 100 --k 10 --ef-search 40 80 200
+"""
+import argparse
+import statistics
+import time
+from sqlalchemy import func, text
+from database.database import SessionLocal
+from database.models import DocumentChunk
+from services.semantic_search_service import SemanticSearchService
+
+
+def sample_query_embeddings(db, n: int) -> list:
+    """Use random stored chunk embeddings as query vectors."""
+    rows = db.query(DocumentChunk.embedding).order_by(func.random()).limit(n).all()
+    return [list(row.embedding) for row in rows]
+
+
+def timed_search(service, db, embedding, k, exact=False, ef_search=None, probes=None):
+    """Run one search inside its own transaction and return (chunk ids, seconds)."""
+    if exact:
+        db.execute(text("SET LOCAL enable_indexscan = off"))
+    start = time.perf_counter()
+    results = service.search_by_embedding(
+        db, embedding, limit=k, similarity_threshold=0.0, ef_search=ef_search, probes=probes
+    )
+    duration = time.perf_counter() - start
+    db.rollback()
+    return [result["chunk_id"] for result in results], duration
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--ef-search", type=int, nargs="*", default=[40, 80, 200])
+    parser.add_argument("--probes", type=int, nargs="*", default=[])
+    args = parser.parse_args()
+
+    service = SemanticSearchService(embedding_service=None)
+    db = SessionLocal()
+    try:
+        queries = sample_query_embeddings(db, args.queries)
+        db.rollback()
+        if not queries:
+            print("No chunks stored; ingest some documents first.")
+            return
+
+        exact = [timed_search(service, db, q, args.k, exact=True) for q in queries]
+        exact_latencies = [duration for _, duration in exact]
+        print(f"exact            p50={statistics.median(exact_latencies) * 1000:8.2f}ms "
+              f"p95={percentile(exact_latencies, 95) * 1000:8.2f}ms recall@{args.k}=1.0000")
+
+        settings = [("ef_search", v) for v in args.ef_search] + [("probes", v) for v in args.probes]
+        for name, value in settings:
+            recalls, latencies = [], []
+            for q, (truth, _) in zip(queries, exact):
+                ids, duration = timed_search(service, db, q, args.k, **{name: value})
+                latencies.append(duration)
+                recalls.append(len(set(ids) & set(truth)) / max(1, len(truth)))
+            print(f"{name}={value:<6} p50={statistics.median(latencies) * 1000:8.2f}ms "
+                  f"p95={percentile(latencies, 95) * 1000:8.2f}ms "
+                  f"recall@{args.k}={statistics.mean(recalls):.4f}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+"""
+End-to-end /chat and /chat/stream latency against a stub LLM.
+
+The stub OpenAI-compatible server (benchmarks.stub_llm) stands in for the
+LLM, so the numbers cover the app itself: agent loop, query embedding,
+search and response handling, plus the simulated LLM time. By default
+both the stub and the app run in this process on local ports; with --url
+an already running app is measured instead (it must be started with
+LLM_BASE_URL pointing at a stub, see benchmarks.stub_llm).
+
+A small synthetic corpus is loaded into its own collection first and
+dropped afterwards. Each concurrency level sends --requests chat calls;
+the streaming run also reports time to first token.
+
+Usage:
+    python -m benchmarks.bench_chat --documents 200 --requests 50 --concurrency 1 4 16 [--out run.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+from typing import Dict, List, Optional
+import httpx
+from benchmarks.corpus import synthetic_documents
+from benchmarks.results import latency_summary, write_results
+from benchmarks.stub_llm import create_stub_app, serve_in_thread
+
+BENCH_COLLECTION = "bench_chat"
+
+
+def chat_messages(documents: List[Dict], count: int, seed: int = 0) -> List[str]:
+    """Questions built from phrases of the loaded documents, so searches find something."""
+    rng = random.Random(seed)
+    messages = []
+    for _ in range(count):
+        words = rng.choice(documents)["text"].split()
+        start = rng.randrange(max(1, len(words) - 4))
+        messages.append(f"What does the knowledge base say about {' '.join(words[start:start + 4]).rstrip('.')}?")
+    return messages
+
+
+async def _load_corpus(client: httpx.AsyncClient, documents: List[Dict]):
+    response = await client.post("/collections", json={"name": BENCH_COLLECTION})
+    if response.status_code not in (201, 409):
+        response.raise_for_status()
+    body = "\n".join(json.dumps(document) for document in documents)
+    response = await client.post(
+        "/store/bulk/jsonl", params={"collection": BENCH_COLLECTION}, content=body,
+        headers={"Content-Type": "application/x-ndjson"}
+    )
+    response.raise_for_status()
+
+
+async def _chat(client: httpx.AsyncClient, message: str, stream: bool):
+    """Send one chat request; return (total seconds, seconds to first token or None)."""
+    payload = {"message": message, "collection": BENCH_COLLECTION}
+    start = time.perf_counter()
+    if not stream:
+        response = await client.post("/chat", json=payload)
+        response.raise_for_status()
+        return time.perf_counter() - start, None
+
+    first_token = None
+    async with client.stream("POST", "/chat/stream", json=payload) as response:
+        response.raise_for_status()
+        async for line in response.aiter_lines():
+            if first_token is None and line == "event: token":
+                first_token = time.perf_counter() - start
+            elif line == "event: error":
+                raise RuntimeError("chat stream reported an error")
+    return time.perf_counter() - start, first_token
+
+
+async def _run_level(client: httpx.AsyncClient, messages: List[str], concurrency: int, stream: bool) -> Dict:
+    queue = list(messages)
+    latencies, ttfts, errors = [], [], []
+
+    async def worker():
+        while queue:
+            message = queue.pop()
+            try:
+                latency, ttft = await _chat(client, message, stream)
+                latencies.append(latency)
+                if ttft is not None:
+                    ttfts.append(ttft)
+            except (httpx.HTTPError, RuntimeError) as e:
+                errors.append(type(e).__name__)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    duration = time.perf_counter() - start
+
+    result = {
+        "concurrency": concurrency,
+        "stream": stream,
+        "requests_per_sec": len(latencies) / duration,
+        "errors": len(errors),
+        **latency_summary(latencies),
+    }
+    if stream:
+        result["ttft"] = latency_summary(ttfts)
+    return result
+
+
+async def _run(url: str, documents: int, requests: int, concurrency: List[int], timeout: float, keep: bool) -> Dict:
+    corpus = list(synthetic_documents(documents, seed=1))
+    messages = chat_messages(corpus, requests)
+    levels = []
+    async with httpx.AsyncClient(base_url=url, timeout=timeout) as client:
+        await _load_corpus(client, corpus)
+        try:
+            await _chat(client, messages[0], stream=False)  # warm up agent, model and statements
+            for stream in (False, True):
+                for level in concurrency:
+                    result = await _run_level(client, messages, level, stream)
+                    levels.append(result)
+                    ttft = f" ttft_p50={result['ttft']['p50_ms']:.1f}ms" if stream and result["ttft"]["n"] else ""
+                    print(f"{'stream' if stream else 'chat':<6} concurrency={level:<3} "
+                          f"rps={result['requests_per_sec']:6.2f} p50={result.get('p50_ms', 0):8.1f}ms "
+                          f"p95={result.get('p95_ms', 0):8.1f}ms errors={result['errors']}{ttft}")
+        finally:
+            if not keep:
+                await client.delete(f"/collections/{BENCH_COLLECTION}")
+    return {"documents": documents, "requests_per_level": requests, "levels": levels}
+
+
+def run(
+    url: Optional[str] = None,
+    documents: int = 200,
+    requests: int = 50,
+    concurrency: List[int] = (1, 4, 16),
+    llm_latency_ms: float = 200,
+    llm_tokens_per_sec: float = 50,
+    app_port: int = 8090,
+    llm_port: int = 8091,
+    timeout: float = 120,
+    keep: bool = False
+) -> Dict:
+    """
+    Measure /chat and /chat/stream end to end.
+
+    Returns:
+        Dict with the LLM simulation settings and one entry per (mode, concurrency)
+    """
+    servers = []
+    try:
+        if url is None:
+            servers.append(serve_in_thread(create_stub_app(llm_latency_ms, llm_tokens_per_sec), llm_port))
+            os.environ.update({
+                "LLM_BASE_URL": f"http://127.0.0.1:{llm_port}/v1",
+                "LLM_MODEL": "stub",
+                "LLM_API_KEY": "stub",
+            })
+            from main import app  # imported here so the agent picks up the stub settings
+
+            servers.append(serve_in_thread(app, app_port))
+            url = f"http://127.0.0.1:{app_port}"
+            _wait_ready(url, timeout)
+
+        result = asyncio.run(_run(url, documents, requests, concurrency, timeout, keep))
+    finally:
+        for server in servers:
+            server.should_exit = True
+    return dict(result, llm_latency_ms=llm_latency_ms, llm_tokens_per_sec=llm_tokens_per_sec)
+
+
+def _wait_ready(url: str, timeout: float):
+    """Wait until /ready reports the embedding models loaded."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{url}/ready").status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError(f"{url} did not become ready within {timeout}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=None, help="Measure an already running app instead of starting one")
+    parser.add_argument("--documents", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=50, help="Chat requests per concurrency level")
+    parser.add_argument("--concurrency", type=int, nargs="*", default=[1, 4, 16])
+    parser.add_argument("--llm-latency-ms", type=float, default=200)
+    parser.add_argument("--llm-tokens-per-sec", type=float, default=50)
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--keep", action="store_true", help="Keep the benchmark collection afterwards")
+    parser.add_argument("--out", help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    result = run(
+        args.url, args.documents, args.requests, args.concurrency, args.llm_latency_ms,
+        args.llm_tokens_per_sec, timeout=args.timeout, keep=args.keep
+    )
+    if args.out:
+        write_results({"chat": result}, args.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Chunker throughput on multi-MB synthetic documents.
+
+Compares the legacy character chunker with the token-aware strategies.
+With --model the GGUF tokenizer is used for token counts; otherwise a
+four-characters-per-token estimate stands in.
+
+Usage:
+    python -m benchmarks.bench_chunker --size-mb 4 --max-tokens 500 --overlap 50 [--model] [--out run.json]
+"""
+import argparse
+import random
+import time
+from typing import Dict
+from services.chunking import CHUNKING_STRATEGIES, Chunker, RESERVED_TOKENS, approx_token_count
+from benchmarks.results import write_results
+
+SENTENCES = [
+    "Vector databases store embeddings for similarity search.",
+    "The quick brown fox jumps over the lazy dog!",
+    "Does the index fit in memory?",
+    "Die Einbettungen werden in Postgres gespeichert.",
+    "Les documents sont découpés en morceaux avant l'indexation.",
+    "文档被分割成块。",
+    "埋め込みはコサイン類似度で比較されます。",
+    "Error code E1234 was reported by the ingestion worker.",
+]
+
+
+def synthetic_document(size_bytes: int, seed: int = 0) -> str:
+    """Build a multilingual document of roughly size_bytes with paragraph breaks."""
+    rng = random.Random(seed)
+    parts, size = [], 0
+    while size < size_bytes:
+        paragraph = " ".join(rng.choice(SENTENCES) for _ in range(rng.randint(3, 30)))
+        parts.append(paragraph)
+        size += len(paragraph.encode("utf-8")) + 2
+    return "\n\n".join(parts)
+
+
+def run(size_mb: float = 4, max_tokens: int = 500, overlap: int = 50, model: bool = False) -> Dict:
+    """
+    Chunk one synthetic document with every strategy.
+
+    Returns:
+        Dict with the document size and one entry per strategy (MB/s, chunk statistics)
+    """
+    count_tokens = approx_token_count
+    requested_max_tokens = max_tokens
+    if model:
+        from services.model_registry import get_embedding_service
+        embedding_service = get_embedding_service()
+        count_tokens = embedding_service.count_tokens
+        max_tokens = min(max_tokens, embedding_service.n_ctx - RESERVED_TOKENS)
+
+    text = synthetic_document(int(size_mb * 1024 * 1024))
+    size_mb = len(text.encode("utf-8")) / (1024 * 1024)
+    print(f"document: {size_mb:.2f} MB, tokenizer: {'gguf' if model else 'approx'}")
+
+    strategies = {}
+    for strategy in CHUNKING_STRATEGIES:
+        if strategy == "characters":
+            chunker = Chunker(max_tokens=requested_max_tokens, overlap_tokens=overlap, strategy=strategy)
+        else:
+            chunker = Chunker(count_tokens, max_tokens=max_tokens, overlap_tokens=overlap, strategy=strategy)
+
+        start = time.perf_counter()
+        chunks = list(chunker.iter_chunks(text))
+        duration = time.perf_counter() - start
+
+        # Measure the produced chunks with the same tokenizer (outside the timed section)
+        tokens = [count_tokens(chunk) for chunk in chunks]
+        over_budget = sum(1 for n in tokens if n > max_tokens)
+        strategies[strategy] = {
+            "seconds": duration,
+            "mb_per_sec": size_mb / duration,
+            "chunks": len(chunks),
+            "mean_tokens": sum(tokens) / len(tokens),
+            "max_tokens": max(tokens),
+            "over_budget": over_budget,
+        }
+        print(f"{strategy:<11} {duration:7.3f}s {size_mb / duration:8.2f} MB/s chunks={len(chunks):<7} "
+              f"mean_tokens={sum(tokens) / len(tokens):6.1f} max_tokens={max(tokens):<5} over_budget={over_budget}")
+
+    return {"size_mb": size_mb, "tokenizer": "gguf" if model else "approx", "strategies": strategies}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-mb", type=float, default=4)
+    parser.add_argument("--max-tokens", type=int, default=500)
+    parser.add_argument("--overlap", type=int, default=50)
+    parser.add_argument("--model", action="store_true", help="Count tokens with the default GGUF model")
+    parser.add_argument("--out", help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    result = run(args.size_mb, args.max_tokens, args.overlap, args.model)
+    if args.out:
+        write_results({"chunker": result}, args.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Embedding throughput against llama.cpp batch size and thread count.
+
+Each (threads, batch size) pair loads its own EmbeddingService with the
+cache disabled and embeds the same set of synthetic chunks, so only
+inference is measured. With --workers the pool variants are measured too.
+
+Usage:
+    python -m benchmarks.bench_embedding --texts 512 --batch-sizes 1 8 32 64 --threads 2 4 8 [--out run.json]
+"""
+import argparse
+import time
+from typing import Dict, List
+from services.embedding_service import EmbeddingService, MODEL_PATH
+from services.chunking import Chunker, approx_token_count
+from benchmarks.corpus import synthetic_documents
+from benchmarks.results import write_results
+
+
+def sample_chunks(count: int, max_tokens: int = 200, seed: int = 0) -> List[str]:
+    """Chunk synthetic documents until count chunks of up to max_tokens are collected."""
+    chunker = Chunker(approx_token_count, max_tokens=max_tokens, overlap_tokens=0)
+    chunks = []
+    for document in synthetic_documents(count, seed=seed):
+        chunks.extend(chunker.iter_chunks(document["text"]))
+        if len(chunks) >= count:
+            break
+    return chunks[:count]
+
+
+def run(
+    texts: int = 512,
+    batch_sizes: List[int] = (1, 8, 32, 64),
+    threads: List[int] = (4, 8),
+    workers: List[int] = (),
+    model_path: str = MODEL_PATH
+) -> Dict:
+    """
+    Measure embedding throughput for every configuration.
+
+    Returns:
+        Dict with one entry per configuration (texts/sec, tokens/sec, seconds)
+    """
+    chunks = sample_chunks(texts)
+    configurations = [{"threads": t, "batch_size": b, "workers": 0} for t in threads for b in batch_sizes]
+    configurations += [{"threads": t, "batch_size": b, "workers": w} for w in workers for t in threads for b in batch_sizes]
+
+    results = []
+    for config in configurations:
+        service = EmbeddingService(
+            model_path,
+            n_threads=config["threads"],
+            max_batch_size=config["batch_size"],
+            cache=None,
+            workers=config["workers"],
+            threads_per_worker=config["threads"]
+        )
+        try:
+            service.load()
+            service.create_embeddings(chunks[:config["batch_size"]])  # warm up
+            tokens = sum(service.count_tokens(chunk) for chunk in chunks)
+
+            start = time.perf_counter()
+            service.create_embeddings(chunks)
+            duration = time.perf_counter() - start
+        finally:
+            service.shutdown()
+
+        result = dict(config, seconds=duration, texts_per_sec=len(chunks) / duration, tokens_per_sec=tokens / duration)
+        results.append(result)
+        print(f"workers={config['workers']:<2} threads={config['threads']:<3} batch={config['batch_size']:<4} "
+              f"{result['texts_per_sec']:8.1f} texts/s {result['tokens_per_sec']:10.1f} tokens/s")
+
+    return {"texts": len(chunks), "configurations": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--texts", type=int, default=512)
+    parser.add_argument("--batch-sizes", type=int, nargs="*", default=[1, 8, 32, 64])
+    parser.add_argument("--threads", type=int, nargs="*", default=[4, 8])
+    parser.add_argument("--workers", type=int, nargs="*", default=[], help="Also measure these worker pool sizes")
+    parser.add_argument("--model-path", default=MODEL_PATH)
+    parser.add_argument("--out", help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    result = run(args.texts, args.batch_sizes, args.threads, args.workers, args.model_path)
+    if args.out:
+        write_results({"embedding": result}, args.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Latency and exact-term retrieval quality of hybrid search against vector-only search.
+
+Each query is a short phrase taken from a random stored chunk, built around
+its most distinctive token (identifiers, codes, long rare words). A query
+counts as a hit when the chunk it was taken from comes back in the top k.
+With --rerank and/or --mmr-lambda, hybrid search is also run with the
+second retrieval stage on --overfetch candidates per result.
+
+Usage:
+    python -m benchmarks.bench_hybrid --queries 100 --k 5 --words 3
+    python -m benchmarks.bench_hybrid --rerank --overfetch 4 --mmr-lambda 0.7
+"""
+import argparse
+import re
+import statistics
+import time
+from sqlalchemy import func
+from database.database import SessionLocal
+from database.models import DocumentChunk
+from services.model_registry import get_embedding_service
+from services.semantic_search_service import SemanticSearchService
+
+TOKEN = re.compile(r"\w+")
+
+
+def distinctive_phrase(chunk_text: str, words: int) -> str:
+    """Pick the token with digits/underscores or, failing that, the longest one, plus its neighbours."""
+    tokens = TOKEN.findall(chunk_text)
+    if not tokens:
+        return ""
+    anchor = max(
+        range(len(tokens)),
+        key=lambda i: (any(ch.isdigit() or ch == "_" for ch in tokens[i]), len(tokens[i]))
+    )
+    start = max(0, anchor - (words - 1) // 2)
+    return " ".join(tokens[start:start + words])
+
+
+def sample_queries(db, n: int, words: int) -> list:
+    rows = db.query(DocumentChunk.id, DocumentChunk.text).order_by(func.random()).limit(n).all()
+    return [(str(row.id), distinctive_phrase(row.text, words)) for row in rows if row.text.strip()]
+
+
+def run(name, search, db, queries, k):
+    latencies, hits = [], 0
+    for chunk_id, phrase in queries:
+        start = time.perf_counter()
+        results = search(db, phrase, limit=k)
+        latencies.append(time.perf_counter() - start)
+        db.rollback()
+        hits += any(result["chunk_id"] == chunk_id for result in results)
+
+    ordered = sorted(latencies)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    print(f"{name:<14} p50={statistics.median(latencies) * 1000:8.2f}ms p95={p95 * 1000:8.2f}ms "
+          f"hit@{k}={hits / len(queries):.4f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--words", type=int, default=3, help="Words per query phrase")
+    parser.add_argument("--candidates", type=int, default=50, help="Hybrid candidates per retriever")
+    parser.add_argument("--rerank", action="store_true", help="Also measure cross-encoder re-ranking")
+    parser.add_argument("--mmr-lambda", type=float, default=None, help="Also measure MMR diversification")
+    parser.add_argument("--overfetch", type=int, default=4, help="Candidates per result for the second stage")
+    args = parser.parse_args()
+    baseline = {"rerank": False, "mmr_lambda": None}
+
+    service = SemanticSearchService(get_embedding_service())
+    db = SessionLocal()
+    try:
+        queries = sample_queries(db, args.queries, args.words)
+        db.rollback()
+        if not queries:
+            print("No chunks stored; ingest some documents first.")
+            return
+
+        # Load the model and prepare both statements before timing
+        service.search(db, queries[0][1], limit=args.k, similarity_threshold=0.0, **baseline)
+        service.hybrid_search(db, queries[0][1], limit=args.k, candidates=args.candidates, **baseline)
+        db.rollback()
+
+        run("vector", lambda db, q, limit: service.search(db, q, limit=limit, similarity_threshold=0.0, **baseline),
+            db, queries, args.k)
+        run("hybrid", lambda db, q, limit: service.hybrid_search(
+            db, q, limit=limit, candidates=args.candidates, **baseline
+        ), db, queries, args.k)
+
+        stages = []
+        if args.rerank:
+            stages.append(("hybrid+rerank", {"rerank": True, "mmr_lambda": None}))
+        if args.mmr_lambda is not None:
+            stages.append(("hybrid+mmr", {"rerank": False, "mmr_lambda": args.mmr_lambda}))
+        if args.rerank and args.mmr_lambda is not None:
+            stages.append(("hybrid+both", {"rerank": True, "mmr_lambda": args.mmr_lambda}))
+        for name, options in stages:
+            # Load the reranker before timing
+            service.hybrid_search(
+                db, queries[0][1], limit=args.k, candidates=args.candidates, overfetch_factor=args.overfetch, **options
+            )
+            db.rollback()
+            run(name, lambda db, q, limit: service.hybrid_search(
+                db, q, limit=limit, candidates=args.candidates, overfetch_factor=args.overfetch, **options
+            ), db, queries, args.k)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
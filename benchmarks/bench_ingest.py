@@ -0,0 +1,96 @@
+"""
+Bulk ingestion throughput (documents/sec and chunks/sec) into Postgres.
+
+Synthetic documents are ingested through IngestionPipeline into a
+throwaway collection, once per ingest batch size; the collection is
+dropped after each run so every run starts from an empty partition.
+
+Usage:
+    python -m benchmarks.bench_ingest --documents 2000 --batch-sizes 64 256 [--out run.json]
+"""
+import argparse
+import asyncio
+from typing import Dict, List
+from database.bootstrap import create_collection, drop_collection
+from database.database import async_engine
+from services.ingestion_pipeline import IngestionPipeline, INGEST_BATCH_SIZE
+from services.embedding_service import EmbeddingService
+from services.model_registry import DEFAULT_EMBEDDING_MODEL, load_model_specs
+from services.store_embedding_service import StoreEmbeddingService
+from benchmarks.corpus import synthetic_documents
+from benchmarks.results import write_results
+
+BENCH_COLLECTION = "bench_ingest"
+
+
+async def _ingest(store_service: StoreEmbeddingService, documents: int, batch_size: int, chunk_size: int, overlap: int):
+    try:
+        pipeline = IngestionPipeline(store_service, batch_size=batch_size)
+        return await pipeline.ingest(
+            synthetic_documents(documents), chunk_size=chunk_size, overlap=overlap, collection=BENCH_COLLECTION
+        )
+    finally:
+        # Pooled asyncpg connections belong to this event loop
+        await async_engine.dispose()
+
+
+def run(
+    documents: int = 2000,
+    batch_sizes: List[int] = (INGEST_BATCH_SIZE,),
+    chunk_size: int = 500,
+    overlap: int = 50,
+    model: str = None
+) -> Dict:
+    """
+    Ingest the synthetic corpus once per batch size.
+
+    Returns:
+        Dict with one entry per batch size (documents, chunks, seconds, rates)
+    """
+    # No embedding cache, so every run embeds every chunk
+    embedding_service = EmbeddingService(**load_model_specs()[model or DEFAULT_EMBEDDING_MODEL], cache=None)
+    embedding_service.load()
+    store_service = StoreEmbeddingService(embedding_service)
+
+    runs = []
+    for batch_size in batch_sizes:
+        drop_collection(name=BENCH_COLLECTION)
+        create_collection(name=BENCH_COLLECTION)
+        try:
+            result = asyncio.run(_ingest(store_service, documents, batch_size, chunk_size, overlap))
+        finally:
+            drop_collection(name=BENCH_COLLECTION)
+
+        runs.append({
+            "batch_size": batch_size,
+            "documents": len(result.document_ids),
+            "chunks": result.chunks_count,
+            "seconds": result.duration,
+            "docs_per_sec": result.docs_per_sec,
+            "chunks_per_sec": result.chunks_per_sec,
+        })
+        print(f"batch={batch_size:<5} documents={len(result.document_ids)} chunks={result.chunks_count} "
+              f"duration={result.duration:.2f}s docs/sec={result.docs_per_sec:.1f} "
+              f"chunks/sec={result.chunks_per_sec:.1f}")
+
+    embedding_service.shutdown()
+    return {"chunk_size": chunk_size, "overlap": overlap, "runs": runs}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=2000)
+    parser.add_argument("--batch-sizes", type=int, nargs="*", default=[INGEST_BATCH_SIZE])
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--overlap", type=int, default=50)
+    parser.add_argument("--model", default=None, help="Named embedding model (defaults to the default model)")
+    parser.add_argument("--out", help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    result = run(args.documents, args.batch_sizes, args.chunk_size, args.overlap, args.model)
+    if args.out:
+        write_results({"ingest": result}, args.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Storage, build time, latency and recall of quantized ANN indexes against the float32 index.
+
+For each quantization mode the index is (re)built, its size measured, and
+sampled chunk embeddings are searched through it; recall@k is measured
+against exact float32 search with index scans disabled. Quantized modes
+re-rank rerank_factor * k first-pass candidates at full precision.
+
+Usage:
+    python -m benchmarks.bench_quantization --queries 100 --k 10 --rerank-factor 2 4 8
+"""
+import argparse
+import statistics
+import time
+from sqlalchemy import text
+from database.bootstrap import VECTOR_INDEX_TYPE, create_vector_index, vector_index_name
+from database.database import SessionLocal, engine
+from database.models import EMBEDDING_DIM
+from services.search_backends import FIRST_PASS_DISTANCES
+from services.semantic_search_service import SemanticSearchService
+from benchmarks.bench_ann_recall import percentile, sample_query_embeddings
+
+# Average stored size of one vector in each representation
+VALUE_SIZE_SQL = text(f"""
+    SELECT
+        avg(pg_column_size(embedding)) AS none,
+        avg(pg_column_size(embedding::halfvec({EMBEDDING_DIM}))) AS halfvec,
+        avg(pg_column_size(binary_quantize(embedding))) AS binary
+    FROM document_chunks
+""")
+
+
+def search(service, db, embedding, k, quantization, rerank_factor, exact=False):
+    """Run one search inside its own transaction and return (chunk ids, seconds)."""
+    if exact:
+        db.execute(text("SET LOCAL enable_indexscan = off"))
+    start = time.perf_counter()
+    results = service.search_by_embedding(
+        db, embedding, limit=k, similarity_threshold=0.0,
+        quantization=quantization, rerank_factor=rerank_factor
+    )
+    duration = time.perf_counter() - start
+    db.rollback()
+    return [result["chunk_id"] for result in results], duration
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--index-type", default=VECTOR_INDEX_TYPE, choices=["hnsw", "ivfflat"])
+    parser.add_argument("--modes", nargs="*", default=list(FIRST_PASS_DISTANCES))
+    parser.add_argument("--rerank-factor", type=int, nargs="*", default=[4])
+    args = parser.parse_args()
+
+    service = SemanticSearchService(embedding_service=None)
+    db = SessionLocal()
+    try:
+        queries = sample_query_embeddings(db, args.queries)
+        value_sizes = db.execute(VALUE_SIZE_SQL).one()._mapping
+        db.rollback()
+        if not queries:
+            print("No chunks stored; ingest some documents first.")
+            return
+
+        exact = [search(service, db, q, args.k, "none", 1, exact=True) for q in queries]
+        print(f"exact search p50={statistics.median([d for _, d in exact]) * 1000:.2f}ms")
+
+        for mode in args.modes:
+            start = time.perf_counter()
+            create_vector_index(engine, index_type=args.index_type, rebuild=True, quantization=mode)
+            build_time = time.perf_counter() - start
+            index_size = db.execute(
+                text("SELECT pg_relation_size(CAST(:name AS regclass))"), {"name": vector_index_name(mode)}
+            ).scalar()
+            db.rollback()
+            print(f"\n{mode}: index={index_size / 2 ** 20:.1f}MiB build={build_time:.1f}s "
+                  f"vector={float(value_sizes[mode]):.0f}B")
+
+            for factor in args.rerank_factor if mode != "none" else [1]:
+                recalls, latencies = [], []
+                for q, (truth, _) in zip(queries, exact):
+                    ids, duration = search(service, db, q, args.k, mode, factor)
+                    latencies.append(duration)
+                    recalls.append(len(set(ids) & set(truth)) / max(1, len(truth)))
+                print(f"  rerank_factor={factor:<3} p50={statistics.median(latencies) * 1000:8.2f}ms "
+                      f"p95={percentile(latencies, 95) * 1000:8.2f}ms "
+                      f"recall@{args.k}={statistics.mean(recalls):.4f}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
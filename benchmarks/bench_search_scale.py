@@ -0,0 +1,236 @@
+"""
+Search latency and recall@k at 10k / 100k / 1M chunks.
+
+Each scale gets its own collection filled with clustered synthetic vectors
+(COPYed straight into the partition, no embedding model needed) and the
+ANN index is built once the data is in. Queries come from the same
+distribution but not from the corpus; recall is measured against exact
+neighbours computed in numpy from the regenerated corpus. A filtered run
+(metadata shard = 0, 10% of the rows) exercises the iterative index scan.
+
+Collections are kept between runs and reused when their size matches, so
+the 1M load and index build are paid once; --drop removes them afterwards.
+
+Usage:
+    python -m benchmarks.bench_search_scale --scales 10000 100000 1000000 --queries 100 --k 10 \\
+        --ef-search 40 100 200 [--quantization halfvec] [--out run.json]
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+import uuid
+from datetime import datetime
+from typing import Dict, List
+from sqlalchemy import text
+from database.bootstrap import (
+    VECTOR_INDEX_TYPE,
+    create_collection,
+    create_vector_index,
+    drop_collection,
+    partition_name,
+    vector_index_name,
+)
+from database.database import SessionLocal, async_engine, engine
+from database.models import EMBEDDING_DIM
+from services.search_backends import FIRST_PASS_DISTANCES
+from services.semantic_search_service import SemanticSearchService
+from benchmarks.corpus import clustered_vectors, exact_neighbours, query_vectors
+from benchmarks.results import latency_summary, write_results
+
+CHUNKS_PER_DOCUMENT = 100
+SHARDS = 10
+
+
+def collection_for(scale: int, quantization: str) -> str:
+    label = f"{scale // 1000000}m" if scale % 1000000 == 0 else f"{scale // 1000}k" if scale % 1000 == 0 else str(scale)
+    return f"bench_{label}" if quantization == "none" else f"bench_{label}_{quantization}"
+
+
+def document_id(collection: str, index: int) -> uuid.UUID:
+    # Document IDs are unique across collections, chunk IDs only within one
+    return uuid.uuid5(uuid.NAMESPACE_URL, f"{collection}/{index}")
+
+
+async def _load(collection: str, scale: int, vector_options: Dict):
+    """COPY the synthetic corpus into the collection's partition; chunk IDs encode corpus positions."""
+    try:
+        async with async_engine.connect() as conn:
+            raw = await conn.get_raw_connection()
+            driver = raw.driver_connection
+            for offset, vectors in clustered_vectors(scale, EMBEDDING_DIM, **vector_options):
+                now = datetime.utcnow()
+                first_document = offset // CHUNKS_PER_DOCUMENT
+                last_document = (offset + len(vectors) - 1) // CHUNKS_PER_DOCUMENT
+                async with driver.transaction():
+                    await driver.copy_records_to_table(
+                        "documents",
+                        records=[
+                            (collection, document_id(collection, i), f"synthetic document {i}", "{}", now, now)
+                            for i in range(first_document, last_document + 1)
+                            if i * CHUNKS_PER_DOCUMENT >= offset  # a document spanning two blocks is written once
+                        ],
+                        columns=["collection", "id", "text", "metadata", "created_at", "updated_at"]
+                    )
+                    await driver.copy_records_to_table(
+                        partition_name(collection),
+                        records=[
+                            (
+                                uuid.UUID(int=position), collection,
+                                document_id(collection, position // CHUNKS_PER_DOCUMENT), vector,
+                                f"synthetic chunk {position}", position % CHUNKS_PER_DOCUMENT,
+                                json.dumps({"shard": position % SHARDS})
+                            )
+                            for position, vector in enumerate(vectors, offset)
+                        ],
+                        columns=[
+                            "id", "collection", "document_id", "embedding", "text", "chunk_index", "metadata"
+                        ]
+                    )
+                print(f"  loaded {offset + len(vectors)}/{scale}")
+    finally:
+        await async_engine.dispose()
+
+
+def prepare_collection(scale: int, quantization: str, index_type: str, vector_options: Dict) -> Dict:
+    """Load and index a scale's collection unless an identical one is already there."""
+    collection = collection_for(scale, quantization)
+    with engine.connect() as conn:
+        stored = None
+        if conn.execute(text("SELECT to_regclass(:name)"), {"name": partition_name(collection)}).scalar():
+            stored = conn.execute(text(f"SELECT count(*) FROM {partition_name(collection)}")).scalar()
+
+    info = {"collection": collection, "chunks": scale, "load_seconds": None, "index_build_seconds": None}
+    if stored != scale:
+        drop_collection(name=collection)
+        create_collection(name=collection, quantization=quantization, index_type="none")
+        start = time.perf_counter()
+        asyncio.run(_load(collection, scale, vector_options))
+        info["load_seconds"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        create_vector_index(engine, index_type=index_type, quantization=quantization, collection=collection)
+        info["index_build_seconds"] = time.perf_counter() - start
+        with engine.begin() as conn:
+            conn.execute(text(f"ANALYZE {partition_name(collection)}"))
+    else:
+        create_vector_index(engine, index_type=index_type, quantization=quantization, collection=collection)
+
+    with engine.connect() as conn:
+        info["index_size_mb"] = conn.execute(
+            text("SELECT pg_relation_size(CAST(:name AS regclass))"),
+            {"name": vector_index_name(quantization, collection)}
+        ).scalar() / 2 ** 20
+    return info
+
+
+def measure(service, collection, queries, truth, k, quantization, filters=None, **settings) -> Dict:
+    """Search every query in its own transaction; return latency percentiles and mean recall@k."""
+    latencies, recalls = [], []
+    db = SessionLocal()
+    try:
+        # Prepare the statement before timing
+        service.search_by_embedding(db, queries[0].tolist(), limit=k, similarity_threshold=0.0, collection=collection,
+                                    quantization=quantization, filters=filters, **settings)
+        db.rollback()
+        for query, expected in zip(queries, truth):
+            start = time.perf_counter()
+            results = service.search_by_embedding(
+                db, query.tolist(), limit=k, similarity_threshold=0.0, collection=collection,
+                quantization=quantization, filters=filters, **settings
+            )
+            latencies.append(time.perf_counter() - start)
+            db.rollback()
+            found = {uuid.UUID(result["chunk_id"]).int for result in results}  # chunk IDs are corpus positions
+            recalls.append(len(found & set(expected.tolist())) / k)
+    finally:
+        db.close()
+    return dict(settings, **latency_summary(latencies), recall=statistics.mean(recalls))
+
+
+def run(
+    scales: List[int] = (10000, 100000, 1000000),
+    queries: int = 100,
+    k: int = 10,
+    ef_search: List[int] = (40, 100, 200),
+    probes: List[int] = (),
+    quantization: str = "none",
+    index_type: str = VECTOR_INDEX_TYPE,
+    filtered: bool = True,
+    drop: bool = False,
+    clusters: int = 1000,
+    spread: float = 0.6,
+    seed: int = 0
+) -> Dict:
+    """
+    Measure search latency and recall at each scale.
+
+    Returns:
+        Dict keyed by scale with load/build times, index size and one entry
+        per recall setting (unfiltered and, optionally, filtered)
+    """
+    vector_options = {"clusters": clusters, "spread": spread, "seed": seed}
+    service = SemanticSearchService(embedding_service=None)
+    query_set = query_vectors(queries, EMBEDDING_DIM, **vector_options)
+    settings = [{"ef_search": value} for value in ef_search] + [{"probes": value} for value in probes]
+    if not settings:
+        settings = [{}]
+
+    results = {}
+    for scale in scales:
+        print(f"scale={scale}")
+        info = prepare_collection(scale, quantization, index_type, vector_options)
+        collection = info["collection"]
+
+        truth = exact_neighbours(query_set, scale, EMBEDDING_DIM, k, **vector_options)
+        info["searches"] = []
+        for setting in settings:
+            result = measure(service, collection, query_set, truth, k, quantization, **setting)
+            info["searches"].append(result)
+            print(f"  {setting or 'defaults'} p50={result['p50_ms']:.2f}ms p95={result['p95_ms']:.2f}ms "
+                  f"recall@{k}={result['recall']:.4f}")
+
+        if filtered:
+            filtered_truth = exact_neighbours(
+                query_set, scale, EMBEDDING_DIM, k, keep=lambda positions: positions % SHARDS == 0, **vector_options
+            )
+            info["filtered_searches"] = []
+            for setting in settings:
+                result = measure(service, collection, query_set, filtered_truth, k, quantization,
+                                 filters={"shard": 0}, **setting)
+                info["filtered_searches"].append(result)
+                print(f"  filtered {setting or 'defaults'} p50={result['p50_ms']:.2f}ms "
+                      f"p95={result['p95_ms']:.2f}ms recall@{k}={result['recall']:.4f}")
+
+        if drop:
+            drop_collection(name=collection)
+        results[str(scale)] = info
+
+    return {"k": k, "queries": queries, "quantization": quantization, "index_type": index_type, "scales": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", type=int, nargs="*", default=[10000, 100000, 1000000])
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--ef-search", type=int, nargs="*", default=[40, 100, 200])
+    parser.add_argument("--probes", type=int, nargs="*", default=[])
+    parser.add_argument("--quantization", default="none", choices=list(FIRST_PASS_DISTANCES))
+    parser.add_argument("--index-type", default=VECTOR_INDEX_TYPE, choices=["hnsw", "ivfflat"])
+    parser.add_argument("--no-filtered", action="store_true", help="Skip the metadata-filtered searches")
+    parser.add_argument("--drop", action="store_true", help="Drop the benchmark collections afterwards")
+    parser.add_argument("--out", help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    result = run(
+        args.scales, args.queries, args.k, args.ef_search, args.probes, args.quantization,
+        args.index_type, not args.no_filtered, args.drop
+    )
+    if args.out:
+        write_results({"search_scale": result}, args.out)
+
+
+if __name__ == "__main__":
+    main()
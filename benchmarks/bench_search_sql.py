@@ -0,0 +1,85 @@
+"""
+Compare the legacy inlined-vector search SQL with the bound, prepared statement.
+
+Usage:
+    python -m benchmarks.bench_search_sql --iterations 200 --limit 5
+"""
+import argparse
+import random
+import statistics
+import time
+from sqlalchemy import text
+from database.database import SessionLocal
+from database.models import EMBEDDING_DIM
+from services.semantic_search_service import SemanticSearchService
+
+
+def legacy_search(db, query_embedding, limit, similarity_threshold):
+    """The original query: the vector literal is pasted into the SQL three times."""
+    embedding_array = ','.join(map(str, query_embedding))
+    sql_query = text(f"""
+        SELECT
+            dc.id,
+            dc.text,
+            dc.document_id,
+            d.text as document_text,
+            d.created_at,
+            1 - (dc.embedding <=> ARRAY[{embedding_array}]::vector) / 2 as similarity
+        FROM document_chunks dc
+        JOIN documents d ON dc.document_id = d.id
+        WHERE 1 - (dc.embedding <=> ARRAY[{embedding_array}]::vector) / 2 >= :threshold
+        ORDER BY dc.embedding <=> ARRAY[{embedding_array}]::vector
+        LIMIT :limit
+    """)
+    rows = db.execute(sql_query, {"threshold": similarity_threshold, "limit": limit}).fetchall()
+    return rows, len(sql_query.text)
+
+
+def random_embedding():
+    return [random.uniform(-1, 1) for _ in range(EMBEDDING_DIM)]
+
+
+def report(name, latencies, sql_bytes=None):
+    ordered = sorted(latencies)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    extra = f" sql={sql_bytes}B" if sql_bytes is not None else ""
+    print(f"{name:<10} mean={statistics.mean(latencies) * 1000:8.2f}ms "
+          f"p50={statistics.median(latencies) * 1000:8.2f}ms p95={p95 * 1000:8.2f}ms{extra}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=5)
+    parser.add_argument("--threshold", type=float, default=0.0)
+    args = parser.parse_args()
+
+    service = SemanticSearchService(embedding_service=None)
+    queries = [random_embedding() for _ in range(args.iterations)]
+    db = SessionLocal()
+    try:
+        # Warm up both paths so connection setup and PREPARE are not measured
+        legacy_search(db, queries[0], args.limit, args.threshold)
+        service.search_by_embedding(db, queries[0], limit=args.limit, similarity_threshold=args.threshold)
+        db.rollback()
+
+        legacy, prepared = [], []
+        sql_bytes = 0
+        for embedding in queries:
+            start = time.perf_counter()
+            _, sql_bytes = legacy_search(db, embedding, args.limit, args.threshold)
+            legacy.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            service.search_by_embedding(db, embedding, limit=args.limit, similarity_threshold=args.threshold)
+            prepared.append(time.perf_counter() - start)
+            db.rollback()
+
+        report("legacy", legacy, sql_bytes)
+        report("prepared", prepared)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
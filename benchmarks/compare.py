@@ -0,0 +1,84 @@
+"""
+Compare two benchmark result files and flag regressions.
+
+Every numeric metric present in both files is compared. Rates (*_per_sec)
+and recall should go up, latencies (*_ms) and durations (*seconds) down;
+a change in the wrong direction beyond --threshold percent is reported as
+a regression and makes the exit status 1, so the script can gate CI.
+
+Usage:
+    python -m benchmarks.compare before.json after.json --threshold 10
+"""
+import argparse
+import sys
+from typing import Dict, Optional
+from benchmarks.results import load_results
+
+# Keys that identify an entry in a list of results rather than measure anything
+IDENTITY_KEYS = ("batch_size", "threads", "workers", "ef_search", "probes", "concurrency", "stream")
+
+
+def flatten(value, prefix: str = "") -> Dict[str, float]:
+    """Map metric paths such as search_scale.scales.10000.searches[ef_search=40].p95_ms to values."""
+    metrics = {}
+    if isinstance(value, dict):
+        for key, item in value.items():
+            metrics.update(flatten(item, f"{prefix}.{key}" if prefix else str(key)))
+    elif isinstance(value, list):
+        for index, item in enumerate(value):
+            identity = ",".join(
+                f"{key}={item[key]}" for key in IDENTITY_KEYS if isinstance(item, dict) and key in item
+            ) or str(index)
+            metrics.update(flatten(item, f"{prefix}[{identity}]"))
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        metrics[prefix] = float(value)
+    return metrics
+
+
+def direction(path: str) -> Optional[int]:
+    """+1 if higher is better, -1 if lower is better, None for informational values."""
+    name = path.rsplit(".", 1)[-1]
+    if name.endswith("_per_sec") or name == "recall":
+        return 1
+    if name.endswith("_ms") or name.endswith("seconds"):
+        return -1
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("before")
+    parser.add_argument("after")
+    parser.add_argument("--threshold", type=float, default=10, help="Percent change tolerated before flagging")
+    parser.add_argument("--all", action="store_true", help="Show unchanged metrics too")
+    args = parser.parse_args()
+
+    before = flatten(load_results(args.before)["results"])
+    after = flatten(load_results(args.after)["results"])
+
+    regressions = 0
+    for path in sorted(before.keys() & after.keys()):
+        sign = direction(path)
+        if sign is None or before[path] == 0:
+            continue
+        change = (after[path] - before[path]) / abs(before[path]) * 100
+        if sign * change < -args.threshold:
+            status = "REGRESSION"
+            regressions += 1
+        elif sign * change > args.threshold:
+            status = "improved"
+        elif args.all:
+            status = ""
+        else:
+            continue
+        print(f"{status:<10} {path:<80} {before[path]:12.3f} -> {after[path]:12.3f} ({change:+.1f}%)")
+
+    only = sorted(before.keys() ^ after.keys())
+    if only:
+        print(f"{len(only)} metrics present in only one file")
+    print(f"{regressions} regression(s) beyond {args.threshold:.0f}%")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
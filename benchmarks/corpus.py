@@ -0,0 +1,180 @@
+"""
+Deterministic synthetic corpora for the benchmarks.
+
+Text documents are built from per-topic vocabularies, so documents on the
+same topic share terms (a realistic mix for full-text and vector search),
+sprinkled with identifiers and error codes and carrying filterable
+metadata. Vectors for the search benchmarks are drawn around cluster
+centres in fixed-size blocks, each block seeded on its own, so a corpus of
+any size can be regenerated block by block without holding it in memory.
+
+Usage:
+    python -m benchmarks.corpus --documents 10000 --out data/bench_corpus.jsonl
+"""
+import argparse
+import json
+import random
+from typing import Callable, Dict, Iterator, Optional, Tuple
+import numpy as np
+
+SYLLABLES = ["ka", "lo", "mi", "ra", "te", "vu", "sen", "dor", "pha", "qui", "zel", "bran", "tor", "nis", "gal", "ex"]
+SOURCES = ["wiki", "tickets", "manual", "blog", "email"]
+LANGS = ["en", "de", "fr"]
+
+# Vectors per generated block in clustered_vectors
+VECTOR_BLOCK_ROWS = 65536
+
+
+def _word(rng: random.Random) -> str:
+    return "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+
+
+def synthetic_documents(
+    count: int,
+    seed: int = 0,
+    topics: int = 50,
+    min_paragraphs: int = 2,
+    max_paragraphs: int = 8
+) -> Iterator[Dict]:
+    """
+    Generate ingestable documents ({"text", "metadata"}).
+
+    Args:
+        count: Number of documents
+        seed: Random seed; the same seed always yields the same corpus
+        topics: Number of topic vocabularies
+        min_paragraphs: Fewest paragraphs per document
+        max_paragraphs: Most paragraphs per document
+
+    Yields:
+        Document dicts as accepted by IngestionPipeline.ingest
+    """
+    rng = random.Random(seed)
+    common = [_word(rng) for _ in range(300)]
+    vocabularies = [[_word(rng) for _ in range(80)] for _ in range(topics)]
+
+    for document_index in range(count):
+        topic = rng.randrange(topics)
+        vocabulary = vocabularies[topic]
+        paragraphs = []
+        for _ in range(rng.randint(min_paragraphs, max_paragraphs)):
+            sentences = []
+            for _ in range(rng.randint(3, 8)):
+                words = [rng.choice(vocabulary if rng.random() < 0.4 else common) for _ in range(rng.randint(6, 18))]
+                if rng.random() < 0.1:
+                    words.insert(rng.randrange(len(words)), f"ERR-{rng.randint(1000, 9999)}")
+                sentences.append(" ".join(words).capitalize() + ".")
+            paragraphs.append(" ".join(sentences))
+        yield {
+            "text": "\n\n".join(paragraphs),
+            "metadata": {
+                "source": rng.choice(SOURCES),
+                "lang": rng.choice(LANGS),
+                "topic": topic,
+                "tags": rng.sample(vocabulary[:10], 2),
+                "published": f"20{rng.randint(18, 25)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+                "doc": document_index,
+            },
+        }
+
+
+def cluster_centres(dim: int, clusters: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centres = rng.standard_normal((clusters, dim)).astype(np.float32)
+    return centres / np.linalg.norm(centres, axis=1, keepdims=True)
+
+
+def clustered_vectors(
+    count: int,
+    dim: int,
+    clusters: int = 1000,
+    spread: float = 0.6,
+    seed: int = 0,
+    block_rows: int = VECTOR_BLOCK_ROWS
+) -> Iterator[Tuple[int, np.ndarray]]:
+    """
+    Generate unit vectors scattered around cluster centres, block by block.
+
+    Args:
+        count: Total number of vectors
+        dim: Vector dimension
+        clusters: Number of cluster centres
+        spread: Noise scale around a centre (larger = less clustered)
+        seed: Random seed
+        block_rows: Vectors per yielded block
+
+    Yields:
+        Tuples of (offset of the block's first vector, float32 array of shape (rows, dim))
+    """
+    centres = cluster_centres(dim, clusters, seed)
+    noise_scale = spread / np.sqrt(dim)
+    for block, offset in enumerate(range(0, count, block_rows)):
+        rng = np.random.default_rng([seed, block + 1])
+        rows = min(block_rows, count - offset)
+        vectors = centres[rng.integers(0, clusters, rows)] + rng.standard_normal((rows, dim)).astype(np.float32) * noise_scale
+        yield offset, vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def query_vectors(count: int, dim: int, clusters: int = 1000, spread: float = 0.6, seed: int = 0) -> np.ndarray:
+    """Query vectors drawn from the same distribution as clustered_vectors (but not from the corpus)."""
+    centres = cluster_centres(dim, clusters, seed)
+    rng = np.random.default_rng([seed, 0])
+    vectors = centres[rng.integers(0, clusters, count)] + rng.standard_normal((count, dim)).astype(np.float32) * (spread / np.sqrt(dim))
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def exact_neighbours(
+    queries: np.ndarray,
+    count: int,
+    dim: int,
+    k: int,
+    keep: Optional[Callable[[np.ndarray], np.ndarray]] = None,
+    **vector_options
+) -> np.ndarray:
+    """
+    Exact top-k corpus positions by cosine similarity, computed block by block.
+
+    Args:
+        queries: Query vectors
+        count: Corpus size, as passed to clustered_vectors
+        dim: Vector dimension
+        k: Neighbours per query
+        keep: Optional function mapping an array of corpus positions to a
+            boolean mask of the positions a filtered search may return
+        **vector_options: Further clustered_vectors arguments (clusters, spread, seed)
+
+    Returns:
+        int64 array of shape (queries, k), most similar first
+    """
+    best_scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+    best_ids = np.zeros((len(queries), k), dtype=np.int64)
+    for offset, vectors in clustered_vectors(count, dim, **vector_options):
+        positions = np.arange(offset, offset + len(vectors))
+        scores = queries @ vectors.T
+        if keep is not None:
+            scores[:, ~keep(positions)] = -np.inf
+        ids = np.broadcast_to(positions, scores.shape)
+        all_scores = np.concatenate([best_scores, scores], axis=1)
+        all_ids = np.concatenate([best_ids, ids], axis=1)
+        top = np.argpartition(-all_scores, k - 1, axis=1)[:, :k]
+        best_scores = np.take_along_axis(all_scores, top, axis=1)
+        best_ids = np.take_along_axis(all_ids, top, axis=1)
+    order = np.argsort(-best_scores, axis=1)
+    return np.take_along_axis(best_ids, order, axis=1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", required=True, help="JSONL file to write")
+    args = parser.parse_args()
+
+    with open(args.out, "w", encoding="utf-8") as f:
+        for document in synthetic_documents(args.documents, seed=args.seed):
+            f.write(json.dumps(document, ensure_ascii=False) + "\n")
+    print(f"wrote {args.documents} documents to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
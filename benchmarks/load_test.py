@@ -0,0 +1,85 @@
+"""
+Mixed-traffic load test against a running server.
+
+Runs concurrent /chat and /embed clients for a fixed duration and reports
+per-endpoint throughput and latency percentiles, so a few slow chat calls
+starving /embed shows up directly in the /embed p99.
+
+Usage:
+    python -m benchmarks.load_test --url http://localhost:8000 --duration 60 --chat-clients 4 --embed-clients 32
+"""
+import argparse
+import asyncio
+import random
+import time
+import httpx
+
+CHAT_MESSAGES = [
+    "What does the knowledge base say about vector indexes?",
+    "Summarize what is stored about embeddings.",
+    "Is there anything about chunking documents?",
+]
+
+EMBED_TEXTS = [
+    "The quick brown fox jumps over the lazy dog.",
+    "Retrieval augmented generation combines search with a language model.",
+    "pgvector adds vector similarity search to Postgres.",
+]
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def client_loop(client, path, payloads, deadline, latencies, errors):
+    while time.monotonic() < deadline:
+        start = time.perf_counter()
+        try:
+            response = await client.post(path, json=random.choice(payloads))
+            if response.status_code == 200:
+                latencies.append(time.perf_counter() - start)
+            else:
+                errors.append(response.status_code)
+        except httpx.HTTPError as e:
+            errors.append(type(e).__name__)
+
+
+async def run(args):
+    deadline = time.monotonic() + args.duration
+    stats = {"/chat": ([], []), "/embed": ([], [])}
+    chat_payloads = [{"message": message} for message in CHAT_MESSAGES]
+    embed_payloads = [{"text": text} for text in EMBED_TEXTS]
+
+    async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout) as client:
+        tasks = [
+            client_loop(client, "/chat", chat_payloads, deadline, *stats["/chat"])
+            for _ in range(args.chat_clients)
+        ] + [
+            client_loop(client, "/embed", embed_payloads, deadline, *stats["/embed"])
+            for _ in range(args.embed_clients)
+        ]
+        await asyncio.gather(*tasks)
+
+    for path, (latencies, errors) in stats.items():
+        if not latencies:
+            print(f"{path:<8} no successful requests ({len(errors)} errors)")
+            continue
+        print(f"{path:<8} n={len(latencies):<6} rps={len(latencies) / args.duration:8.2f} "
+              f"p50={percentile(latencies, 50) * 1000:8.1f}ms "
+              f"p95={percentile(latencies, 95) * 1000:8.1f}ms "
+              f"p99={percentile(latencies, 99) * 1000:8.1f}ms errors={len(errors)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--duration", type=float, default=60)
+    parser.add_argument("--chat-clients", type=int, default=4)
+    parser.add_argument("--embed-clients", type=int, default=32)
+    parser.add_argument("--timeout", type=float, default=120)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+JSON result files shared by the benchmarks, so runs can be compared for regressions.
+
+Every file holds the run environment (git commit, CPU, relevant settings)
+and one entry per benchmark; see benchmarks.compare for diffing two files.
+"""
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+# Settings that change performance and so belong with every result file
+RECORDED_SETTINGS = (
+    "EMBEDDING_N_THREADS", "EMBEDDING_BATCH_SIZE", "EMBEDDING_WORKERS", "EMBEDDING_THREADS_PER_WORKER",
+    "INGEST_BATCH_SIZE", "CHUNKING_STRATEGY", "SEARCH_BACKEND", "SEARCH_MODE", "VECTOR_INDEX_TYPE",
+    "VECTOR_QUANTIZATION", "HNSW_M", "HNSW_EF_CONSTRUCTION", "HNSW_EF_SEARCH", "IVFFLAT_LISTS",
+    "IVFFLAT_PROBES", "RERANK_FACTOR", "DB_POOL_SIZE", "DB_PGBOUNCER",
+)
+
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def latency_summary(latencies: List[float]) -> Dict[str, float]:
+    """Mean and percentiles in milliseconds of latencies given in seconds."""
+    if not latencies:
+        return {"n": 0}
+    return {
+        "n": len(latencies),
+        "mean_ms": statistics.mean(latencies) * 1000,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+    }
+
+
+def environment() -> Dict:
+    """Describe the machine and code version a run was made on."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_commit": commit,
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "settings": {name: os.environ[name] for name in RECORDED_SETTINGS if name in os.environ},
+    }
+
+
+def write_results(results: Dict[str, Dict], path: Optional[str] = None) -> str:
+    """
+    Write benchmark results with the run environment to a JSON file.
+
+    Args:
+        results: Mapping of benchmark name to its result dict
+        path: Output file (defaults to benchmarks/results/<timestamp>.json)
+
+    Returns:
+        Path of the written file
+    """
+    document = {"environment": environment(), "results": results}
+    if path is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = document["environment"]["timestamp"].replace(":", "").replace("-", "")
+        path = os.path.join(RESULTS_DIR, f"{stamp}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(document, f, indent=2, default=str)
+    print(f"results written to {path}")
+    return path
+
+
+def load_results(path: str) -> Dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
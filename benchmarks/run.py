@@ -0,0 +1,70 @@
+"""
+Run the benchmark suite and write one JSON result file.
+
+Needs a local Postgres with pgvector (docker compose -f docker/docker-compose.yaml
+up -d postgres) and the GGUF model for the embedding, ingest and chat suites;
+everything runs on CPU. The "quick" profile finishes in minutes and suits
+regression checks; "full" adds the 100k and 1M chunk search scales (the
+loaded collections are kept, so later full runs skip the load).
+
+Usage:
+    python -m benchmarks.run --profile quick
+    python -m benchmarks.run --profile full --suites search chat --out results/full.json
+    python -m benchmarks.compare benchmarks/results/<before>.json benchmarks/results/<after>.json
+"""
+import argparse
+import traceback
+from benchmarks import bench_chat, bench_chunker, bench_embedding, bench_ingest, bench_search_scale
+from benchmarks.results import write_results
+
+SUITES = ["chunker", "embedding", "ingest", "search", "chat"]
+
+PROFILES = {
+    "quick": {
+        "chunker": {"size_mb": 1},
+        "embedding": {"texts": 128, "batch_sizes": [1, 32], "threads": [4]},
+        "ingest": {"documents": 300},
+        "search": {"scales": [10000], "queries": 50, "ef_search": [40, 100]},
+        "chat": {"documents": 100, "requests": 20, "concurrency": [1, 4]},
+    },
+    "full": {
+        "chunker": {"size_mb": 4},
+        "embedding": {"texts": 512, "batch_sizes": [1, 8, 32, 64], "threads": [2, 4, 8]},
+        "ingest": {"documents": 2000, "batch_sizes": [64, 256]},
+        "search": {"scales": [10000, 100000, 1000000], "queries": 100, "ef_search": [40, 100, 200]},
+        "chat": {"documents": 500, "requests": 100, "concurrency": [1, 4, 16]},
+    },
+}
+
+RUNNERS = {
+    "chunker": ("chunker", bench_chunker.run),
+    "embedding": ("embedding", bench_embedding.run),
+    "ingest": ("ingest", bench_ingest.run),
+    "search": ("search_scale", bench_search_scale.run),
+    "chat": ("chat", bench_chat.run),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--profile", default="quick", choices=sorted(PROFILES))
+    parser.add_argument("--suites", nargs="*", default=SUITES, choices=SUITES)
+    parser.add_argument("--out", help="Result file (defaults to benchmarks/results/<timestamp>.json)")
+    args = parser.parse_args()
+
+    results = {}
+    for suite in args.suites:
+        name, runner = RUNNERS[suite]
+        print(f"\n== {suite}")
+        try:
+            results[name] = runner(**PROFILES[args.profile][suite])
+        except Exception as e:
+            # Keep going so one broken suite does not lose the others' results
+            traceback.print_exc()
+            results[name] = {"error": f"{type(e).__name__}: {e}"}
+    results["profile"] = {"name": args.profile, "suites": args.suites}
+    write_results(results, args.out)
+
+
+if __name__ == "__main__":
+    main()
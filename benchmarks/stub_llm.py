@@ -0,0 +1,157 @@
+"""
+Stub OpenAI-compatible chat completions server for end-to-end benchmarks.
+
+Plays a fixed two-step agent script with no model behind it: the first
+turn asks for the semantic_search tool with the user's message as the
+query, and once a tool result is in the conversation it answers with a
+short summary of that result. Latency is simulated (a fixed time to first
+token plus a decode rate) so /chat numbers isolate the app's own overhead.
+Usage is reported in every response, including streamed ones.
+
+Usage:
+    python -m benchmarks.stub_llm --port 8081 --latency-ms 200 --tokens-per-sec 50
+    LLM_BASE_URL=http://127.0.0.1:8081/v1 LLM_MODEL=stub LLM_API_KEY=stub uvicorn main:app
+"""
+import argparse
+import asyncio
+import json
+import threading
+import time
+import uuid
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+import uvicorn
+
+
+def approx_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+def create_stub_app(latency_ms: float = 200, tokens_per_sec: float = 50) -> FastAPI:
+    """
+    Build the stub server.
+
+    Args:
+        latency_ms: Simulated time to first token
+        tokens_per_sec: Simulated decode rate (0 = instant)
+    """
+    app = FastAPI(title="Stub LLM")
+
+    def plan(body: dict) -> dict:
+        """Decide the next assistant message: a tool call or the final answer."""
+        messages = body.get("messages", [])
+        tool_results = [m for m in messages if m.get("role") == "tool"]
+        user_messages = [m for m in messages if m.get("role") == "user"]
+        query = user_messages[-1]["content"] if user_messages else ""
+        if isinstance(query, list):
+            query = " ".join(part.get("text", "") for part in query if isinstance(part, dict))
+
+        if body.get("tools") and not tool_results:
+            return {
+                "role": "assistant",
+                "content": None,
+                "tool_calls": [{
+                    "id": f"call_{uuid.uuid4().hex[:12]}",
+                    "type": "function",
+                    "function": {"name": "semantic_search", "arguments": json.dumps({"query": query})},
+                }],
+            }
+        context = str(tool_results[-1].get("content", "")) if tool_results else ""
+        return {"role": "assistant", "content": f"According to the knowledge base: {context[:400]}"}
+
+    def usage(body: dict, message: dict) -> dict:
+        prompt = sum(approx_tokens(json.dumps(m.get("content") or "")) for m in body.get("messages", []))
+        completion = approx_tokens(message.get("content") or json.dumps(message.get("tool_calls")))
+        return {"prompt_tokens": prompt, "completion_tokens": completion, "total_tokens": prompt + completion}
+
+    async def decode(tokens: int):
+        if tokens_per_sec > 0:
+            await asyncio.sleep(tokens / tokens_per_sec)
+
+    @app.get("/v1/models")
+    def models():
+        return {"object": "list", "data": [{"id": "stub", "object": "model", "owned_by": "benchmarks"}]}
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        model = body.get("model", "stub")
+        message = plan(body)
+        token_usage = usage(body, message)
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        created = int(time.time())
+        finish_reason = "tool_calls" if message.get("tool_calls") else "stop"
+        await asyncio.sleep(latency_ms / 1000)
+
+        if not body.get("stream"):
+            await decode(token_usage["completion_tokens"])
+            return {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "message": message, "finish_reason": finish_reason}],
+                "usage": token_usage,
+            }
+
+        def chunk(delta: dict = None, finish=None, **extra) -> str:
+            payload = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [] if delta is None else [{"index": 0, "delta": delta, "finish_reason": finish}],
+                **extra,
+            }
+            return f"data: {json.dumps(payload)}\n\n"
+
+        async def events():
+            yield chunk({"role": "assistant", "content": ""})
+            if message.get("tool_calls"):
+                await decode(token_usage["completion_tokens"])
+                call = message["tool_calls"][0]
+                yield chunk({"tool_calls": [dict(call, index=0)]})
+            else:
+                words = message["content"].split(" ")
+                for i, word in enumerate(words):
+                    await decode(approx_tokens(word))
+                    yield chunk({"content": word if i == 0 else " " + word})
+            yield chunk({}, finish_reason)
+            if (body.get("stream_options") or {}).get("include_usage"):
+                yield chunk(usage=token_usage)
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return app
+
+
+def serve_in_thread(app, port: int, host: str = "127.0.0.1") -> uvicorn.Server:
+    """
+    Run an ASGI app with uvicorn on a background thread.
+
+    Returns:
+        The server; set ``should_exit = True`` to stop it
+    """
+    server = uvicorn.Server(uvicorn.Config(app, host=host, port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        if not thread.is_alive():
+            raise RuntimeError(f"Server on port {port} failed to start")
+        time.sleep(0.05)
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--latency-ms", type=float, default=200)
+    parser.add_argument("--tokens-per-sec", type=float, default=50)
+    args = parser.parse_args()
+    uvicorn.run(create_stub_app(args.latency_ms, args.tokens_per_sec), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,6 @@
 from .embedding_controller import EmbeddingController
+from .document_controller import DocumentController
+from .collection_controller import CollectionController
 
-__all__ = ["EmbeddingController"]
+__all__ = ["EmbeddingController", "DocumentController", "CollectionController"]
 
@@ -1,9 +1,18 @@
+import json
 import time
+from datetime import datetime
+from typing import AsyncIterator, List, Optional, Tuple
 from fastapi import HTTPException
-from schemas.schemas import ChatRequest, ChatResponse
-from agent.agent import get_agent_with_history
-from langchain_core.messages import HumanMessage
+from schemas.schemas import ChatMessage, ChatRequest, ChatResponse, ChatSessionResponse
+from agent.agent import get_agent
+from agent.context import current_collection, retrieved_documents
+from agent.metrics_callback import AgentMetricsCallback
+from langchain_core.messages.utils import count_tokens_approximately
+from services.conversation_memory import conversation_memory
+from services.model_registry import get_embedding_service
+from services.response_cache import CHAT_CACHE_ENABLED, CachedAnswer, chat_response_cache
 from utils.logger import logger
+from utils.metrics import AGENT_STEPS, STAGE_SECONDS, stage_timer
 
 
 class ChatController:
@@ -11,12 +20,12 @@ class ChatController:
         """Initialize the chat controller."""
         pass
     
-    def chat(self, req: ChatRequest) -> ChatResponse:
+    async def chat(self, req: ChatRequest) -> ChatResponse:
         """
         Handle chat request using the agent.
         
         Args:
-            req: ChatRequest containing the user message
+            req: ChatRequest containing the user message and the collection to search
             
         Returns:
             ChatResponse with the agent's response
@@ -30,36 +39,61 @@ class ChatController:
         try:
             start_time = time.time()
             
+            # Serve a cached answer to a near-identical question if its documents are unchanged
+            query_embedding, cached, answered_at = await self._cache_lookup(req)
+            if cached is not None:
+                logger.info(f"[CHAT CACHE] hit in {time.time() - start_time:.3f}s for: {req.message[:100]}")
+                return ChatResponse(response=cached.answer, cached=True)
+            
             # Get agent instance
-            agent = get_agent_with_history()
-            
-            # Create human message
-            messages = [HumanMessage(content=req.message)]
-            
-            # Log agent invocation
-            logger.info(f"[AGENT] invoked with message: {req.message[:100]}")
-            
-            # Invoke agent
-            response = agent.invoke({"messages": messages})
-            
-            # Extract response text from agent output
-            # The response format depends on LangChain version
-            if isinstance(response, dict):
-                if "output" in response:
-                    response_text = response["output"]
-                elif "messages" in response and len(response["messages"]) > 0:
-                    # Get the last message which should be the AI response
-                    last_message = response["messages"][-1]
-                    response_text = last_message.content if hasattr(last_message, "content") else str(last_message)
+            agent = get_agent()
+            
+            # Scope the agent's searches to the requested collection and track what they return
+            current_collection.set(req.collection)
+            retrieved = set()
+            retrieved_documents.set(retrieved)
+            
+            async with conversation_memory.turn(req.session_id) as session:
+                # Summary and recent turns of the session (if any), then the new message
+                messages = conversation_memory.context_messages(session, req.message)
+                
+                # Log agent invocation
+                logger.info(f"[AGENT] invoked with message: {req.message[:100]} ({len(messages) - 1} history messages)")
+                
+                # Invoke agent without blocking the event loop
+                callback = AgentMetricsCallback()
+                with stage_timer("chat", "agent", collection=req.collection):
+                    response = await agent.ainvoke({"messages": messages}, config={"callbacks": [callback]})
+                AGENT_STEPS.observe(callback.steps)
+                
+                # Extract response text from agent output
+                # The response format depends on LangChain version
+                if isinstance(response, dict):
+                    if "output" in response:
+                        response_text = response["output"]
+                    elif "messages" in response and len(response["messages"]) > 0:
+                        # Get the last message which should be the AI response
+                        last_message = response["messages"][-1]
+                        response_text = last_message.content if hasattr(last_message, "content") else str(last_message)
+                    else:
+                        response_text = str(response)
                 else:
                     response_text = str(response)
-            else:
-                response_text = str(response)
+                
+                duration = time.time() - start_time
+                logger.info(
+                    f"[AGENT] response generated in {duration:.3f}s "
+                    f"({callback.steps} steps, {callback.prompt_tokens}+{callback.completion_tokens} tokens): "
+                    f"{response_text[:200]}"
+                )
+                
+                if session is not None:
+                    await conversation_memory.arecord_turn(session, req.message, response_text)
             
-            duration = time.time() - start_time
-            logger.info(f"[AGENT] response generated in {duration:.3f}s: {response_text[:200]}")
+            if query_embedding is not None:
+                chat_response_cache.put(req.collection, query_embedding, req.message, response_text, retrieved, answered_at)
             
-            return ChatResponse(response=response_text)
+            return ChatResponse(response=response_text, session_id=req.session_id)
             
         except Exception as e:
             raise HTTPException(
@@ -67,3 +101,179 @@ class ChatController:
                 detail=f"Error processing chat request: {str(e)}"
             )
 
+
+    def stream_chat(self, req: ChatRequest) -> AsyncIterator[str]:
+        """
+        Handle a streaming chat request using the agent.
+        
+        Validation happens up front so an empty message still gets a plain
+        400 response instead of an event stream.
+        
+        Args:
+            req: ChatRequest containing the user message and the collection to search
+            
+        Returns:
+            Async iterator of server-sent event strings
+            
+        Raises:
+            HTTPException: If message is empty
+        """
+        if not req.message.strip():
+            raise HTTPException(status_code=400, detail="Message cannot be empty")
+        
+        return self._stream_events(req)
+    
+    async def _stream_events(self, req: ChatRequest) -> AsyncIterator[str]:
+        """
+        Run the agent and translate its event stream into SSE messages.
+        
+        Emits tool_start/tool_end around tool calls, token for every piece of
+        LLM output as it arrives, then done with the final answer (or error).
+        """
+        start_time = time.time()
+        first_token_time = None
+        response_text = ""
+        callback = AgentMetricsCallback()
+        
+        try:
+            query_embedding, cached, answered_at = await self._cache_lookup(req)
+            if cached is not None:
+                logger.info(f"[CHAT CACHE] hit in {time.time() - start_time:.3f}s for: {req.message[:100]}")
+                yield self._sse("token", {"content": cached.answer})
+                yield self._sse("done", {"response": cached.answer, "cached": True})
+                return
+            
+            agent = get_agent()
+            current_collection.set(req.collection)
+            retrieved = set()
+            retrieved_documents.set(retrieved)
+            
+            async with conversation_memory.turn(req.session_id) as session:
+                messages = conversation_memory.context_messages(session, req.message)
+                
+                logger.info(f"[AGENT] streaming with message: {req.message[:100]} ({len(messages) - 1} history messages)")
+                
+                events = agent.astream_events({"messages": messages}, config={"callbacks": [callback]}, version="v2")
+                async for event in events:
+                    kind = event["event"]
+                    
+                    if kind == "on_chat_model_start":
+                        # Each LLM turn starts a new answer; only the last one is final
+                        response_text = ""
+                    elif kind == "on_chat_model_stream":
+                        content = event["data"]["chunk"].content
+                        if isinstance(content, str) and content:
+                            if first_token_time is None:
+                                first_token_time = time.time()
+                                STAGE_SECONDS.labels("chat", "first_token").observe(first_token_time - start_time)
+                            response_text += content
+                            yield self._sse("token", {"content": content})
+                    elif kind == "on_tool_start":
+                        yield self._sse("tool_start", {
+                            "name": event["name"],
+                            "input": event["data"].get("input")
+                        })
+                    elif kind == "on_tool_end":
+                        output = event["data"].get("output")
+                        yield self._sse("tool_end", {
+                            "name": event["name"],
+                            "output": getattr(output, "content", str(output))
+                        })
+                
+                duration = time.time() - start_time
+                ttft = (first_token_time - start_time) if first_token_time else duration
+                STAGE_SECONDS.labels("chat", "agent").observe(duration)
+                AGENT_STEPS.observe(callback.steps)
+                logger.info(
+                    f"[AGENT] stream finished in {duration:.3f}s (first token {ttft:.3f}s, {callback.steps} steps, "
+                    f"{callback.prompt_tokens}+{callback.completion_tokens} tokens): {response_text[:200]}"
+                )
+                
+                if session is not None:
+                    await conversation_memory.arecord_turn(session, req.message, response_text)
+            
+            if query_embedding is not None:
+                chat_response_cache.put(req.collection, query_embedding, req.message, response_text, retrieved, answered_at)
+            
+            yield self._sse("done", {"response": response_text, "session_id": req.session_id})
+            
+        except Exception as e:
+            logger.error(f"[AGENT] stream failed: {str(e)}")
+            yield self._sse("error", {"detail": f"Error processing chat request: {str(e)}"})
+    
+    async def get_session(self, session_id: str) -> ChatSessionResponse:
+        """
+        Get the stored state of a chat session.
+        
+        Args:
+            session_id: Session ID
+            
+        Returns:
+            ChatSessionResponse with the summary and the turns kept verbatim
+            
+        Raises:
+            HTTPException: If the session does not exist
+        """
+        session = await conversation_memory.aload(session_id)
+        if session is None:
+            raise HTTPException(status_code=404, detail=f"Session {session_id} not found")
+        return ChatSessionResponse(
+            session_id=session.session_id,
+            summary=session.summary,
+            messages=[ChatMessage(role=message.type, content=str(message.content)) for message in session.messages],
+            history_tokens=count_tokens_approximately(session.messages),
+            created_at=session.created_at,
+            updated_at=session.updated_at
+        )
+    
+    async def delete_session(self, session_id: str) -> dict:
+        """
+        Delete a chat session and its history.
+        
+        Args:
+            session_id: Session ID
+            
+        Returns:
+            Dict confirming the deletion
+            
+        Raises:
+            HTTPException: If the session does not exist
+        """
+        if not await conversation_memory.adelete(session_id):
+            raise HTTPException(status_code=404, detail=f"Session {session_id} not found")
+        return {"session_id": session_id, "deleted": True}
+    
+    @staticmethod
+    async def _cache_lookup(
+        req: ChatRequest
+    ) -> Tuple[Optional[List[float]], Optional[CachedAnswer], Optional[datetime]]:
+        """
+        Embed the message and look for a cached answer.
+        
+        On a miss the database clock is read as well, before the agent
+        retrieves anything, to stamp the answer that will be cached.
+        Cache failures are logged and treated as a miss without an embedding,
+        so they never fail the request (and nothing gets cached for it).
+        
+        Returns:
+            Tuple of the message embedding, the cached answer and the answer
+            timestamp, any of which may be None
+        """
+        # Answers within a session depend on its history, so sessions bypass the cache
+        if not CHAT_CACHE_ENABLED or req.session_id is not None:
+            return None, None, None
+        try:
+            with stage_timer("chat", "cache_lookup"):
+                query_embedding = await get_embedding_service().acreate_embedding(req.message)
+                cached = await chat_response_cache.alookup(req.collection, query_embedding)
+                if cached is not None:
+                    return query_embedding, cached, None
+                return query_embedding, None, await chat_response_cache.aclock()
+        except Exception as e:
+            logger.warning(f"[CHAT CACHE] lookup failed: {str(e)}")
+            return None, None, None
+    
+    @staticmethod
+    def _sse(event: str, data: dict) -> str:
+        """Format one server-sent event."""
+        return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
@@ -0,0 +1,101 @@
+from typing import List
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from schemas.schemas import CollectionCreateRequest, CollectionResponse
+from services.collection_service import CollectionService
+
+
+class CollectionController:
+    def __init__(self, collection_service: CollectionService):
+        """
+        Initialize the collection controller with a service instance.
+        
+        Args:
+            collection_service: Instance of CollectionService
+        """
+        self.collection_service = collection_service
+    
+    async def create_collection(self, req: CollectionCreateRequest, db: AsyncSession) -> CollectionResponse:
+        """
+        Create a collection with its own chunk partition and ANN index.
+        
+        Args:
+            req: CollectionCreateRequest with the name and index quantization
+            db: Async database session
+            
+        Returns:
+            CollectionResponse describing the collection
+            
+        Raises:
+            HTTPException: If the name or quantization is invalid, or the collection already exists
+        """
+        try:
+            created = await self.collection_service.acreate(req.name, req.quantization)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        
+        if not created:
+            raise HTTPException(status_code=409, detail=f"Collection {req.name} already exists")
+        
+        return await self.get_collection(req.name, db)
+    
+    async def list_collections(self, db: AsyncSession) -> List[CollectionResponse]:
+        """
+        List all collections.
+        
+        Args:
+            db: Async database session
+            
+        Returns:
+            List of CollectionResponse ordered by name
+        """
+        return [self._response(collection) for collection in await self.collection_service.alist(db)]
+    
+    async def get_collection(self, name: str, db: AsyncSession) -> CollectionResponse:
+        """
+        Get a collection, failing with 404 if it does not exist.
+        
+        Args:
+            name: Collection name
+            db: Async database session
+            
+        Returns:
+            CollectionResponse describing the collection
+            
+        Raises:
+            HTTPException: If the collection does not exist
+        """
+        collection = await self.collection_service.aget(db, name)
+        if collection is None:
+            raise HTTPException(status_code=404, detail=f"Collection {name} not found")
+        return self._response(collection)
+    
+    async def drop_collection(self, name: str) -> dict:
+        """
+        Drop a collection with all its documents and chunks.
+        
+        Args:
+            name: Collection name
+            
+        Returns:
+            Confirmation message
+            
+        Raises:
+            HTTPException: If the collection is the default one or does not exist
+        """
+        try:
+            dropped = await self.collection_service.adrop(name)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        
+        if not dropped:
+            raise HTTPException(status_code=404, detail=f"Collection {name} not found")
+        return {"message": f"Collection {name} dropped"}
+    
+    @staticmethod
+    def _response(collection) -> CollectionResponse:
+        return CollectionResponse(
+            name=collection.name,
+            quantization=collection.quantization,
+            created_at=collection.created_at
+        )
@@ -0,0 +1,87 @@
+from fastapi import HTTPException
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from schemas.schemas import UpsertDocumentRequest, UpsertDocumentResponse
+from services.embedding_service import EmbeddingService
+from services.store_embedding_service import StoreEmbeddingService
+from services.embedding_batcher import EmbeddingQueueFull
+from services.chunking import resolve_strategy
+from services.collection_service import collection_service
+from services.response_cache import chat_response_cache
+from database.models import DEFAULT_COLLECTION
+
+
+class DocumentController:
+    def __init__(self, embedding_service: EmbeddingService):
+        """
+        Initialize the document controller with a service instance.
+        
+        Args:
+            embedding_service: Instance of EmbeddingService
+        """
+        self.store_service = StoreEmbeddingService(embedding_service)
+    
+    async def upsert_document(
+        self,
+        external_id: str,
+        req: UpsertDocumentRequest,
+        db: AsyncSession,
+        collection: str = DEFAULT_COLLECTION
+    ) -> UpsertDocumentResponse:
+        """
+        Create or incrementally update a document identified by an external ID.
+        
+        Args:
+            external_id: Caller-supplied document ID
+            req: UpsertDocumentRequest containing the full text, metadata and chunking parameters
+            db: Async database session
+            collection: Collection the document belongs to
+            
+        Returns:
+            UpsertDocumentResponse describing which chunks were added, removed or kept
+            
+        Raises:
+            HTTPException: If text is empty, the strategy or collection is unknown, the
+                document is being created concurrently, or the embedding queue is full
+        """
+        if not req.text.strip():
+            raise HTTPException(status_code=400, detail="Text cannot be empty")
+        
+        try:
+            strategy = resolve_strategy(req.strategy)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        
+        if await collection_service.aquantization(collection, db) is None:
+            raise HTTPException(status_code=404, detail=f"Collection {collection} not found")
+        
+        try:
+            result = await self.store_service.aupsert_document(
+                db=db,
+                external_id=external_id,
+                text=req.text,
+                chunk_size=req.chunk_size,
+                overlap=req.overlap,
+                strategy=strategy,
+                collection=collection,
+                metadata=req.metadata
+            )
+        except IntegrityError:
+            raise HTTPException(status_code=409, detail=f"Document {external_id} is being created concurrently")
+        except EmbeddingQueueFull as e:
+            raise HTTPException(status_code=503, detail=str(e))
+        
+        if result.status == "updated":
+            # Answers built from the old version must not be served again
+            chat_response_cache.invalidate_documents([result.document_id])
+        
+        return UpsertDocumentResponse(
+            document_id=result.document_id,
+            external_id=external_id,
+            status=result.status,
+            chunks_count=result.chunks_count,
+            chunks_added=result.chunks_added,
+            chunks_removed=result.chunks_removed,
+            chunks_unchanged=result.chunks_unchanged,
+            embeddings_reused=result.embeddings_reused
+        )
@@ -1,10 +1,20 @@
+import json
+from typing import AsyncIterator, Dict, Optional
 from fastapi import HTTPException
-from sqlalchemy.orm import Session
-from sqlalchemy import func
-from schemas.schemas import EmbedRequest, EmbedResponse, StoreDocumentRequest, StoreDocumentResponse
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+from schemas.schemas import (
+    EmbedRequest, EmbedResponse, StoreDocumentRequest, StoreDocumentResponse,
+    BulkDocument, BulkStoreRequest, BulkStoreResponse
+)
 from services.embedding_service import EmbeddingService
 from services.store_embedding_service import StoreEmbeddingService
-from database.models import DocumentChunk
+from services.model_registry import get_embedding_service
+from services.embedding_batcher import EmbeddingQueueFull
+from services.ingestion_pipeline import IngestionPipeline, IngestionResult
+from services.chunking import resolve_strategy
+from services.collection_service import collection_service
+from database.models import DEFAULT_COLLECTION
 
 
 class EmbeddingController:
@@ -17,8 +27,9 @@ class EmbeddingController:
         """
         self.embedding_service = embedding_service
         self.store_service = StoreEmbeddingService(embedding_service)
+        self.ingestion_pipeline = IngestionPipeline(self.store_service)
     
-    def embed_text(self, req: EmbedRequest) -> EmbedResponse:
+    async def embed_text(self, req: EmbedRequest) -> EmbedResponse:
         """
         Handle the embedding request.
         
@@ -29,54 +40,196 @@ class EmbeddingController:
             EmbedResponse with embedding and dimensions
             
         Raises:
-            HTTPException: If text is empty
+            HTTPException: If text is empty, the model is unknown or the embedding queue is full
         """
         if not req.text.strip():
             raise HTTPException(status_code=400, detail="Text cannot be empty")
         
-        embedding = self.embedding_service.create_embedding(req.text)
+        embedding_service = self.embedding_service
+        if req.model:
+            try:
+                embedding_service = get_embedding_service(req.model)
+            except KeyError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+        
+        try:
+            embedding = await embedding_service.acreate_embedding(req.text)
+        except EmbeddingQueueFull as e:
+            raise HTTPException(status_code=503, detail=str(e))
         
         return EmbedResponse(
             embedding=embedding,
             dimensions=len(embedding)
         )
     
-    def store_document(
+    async def store_document(
         self, 
         req: StoreDocumentRequest, 
-        db: Session
+        db: AsyncSession
     ) -> StoreDocumentResponse:
         """
         Store a document with chunked embeddings.
         
         Args:
             req: StoreDocumentRequest containing text and chunking parameters
-            db: Database session
+            db: Async database session
             
         Returns:
             StoreDocumentResponse with document ID and chunk count
             
         Raises:
-            HTTPException: If text is empty
+            HTTPException: If text is empty, the strategy or collection is unknown,
+                or the embedding queue is full
         """
         if not req.text.strip():
             raise HTTPException(status_code=400, detail="Text cannot be empty")
         
-        document = self.store_service.store_document_with_chunks(
-            db=db,
-            text=req.text,
-            chunk_size=req.chunk_size,
-            overlap=req.overlap
-        )
+        try:
+            strategy = resolve_strategy(req.strategy)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        
+        # A short-lived session: the request's would sit idle in a transaction while the text is embedded
+        await self._check_collection(req.collection)
         
-        # Query chunks count from database
-        chunks_count = db.query(func.count(DocumentChunk.id)).filter(
-            DocumentChunk.document_id == document.id
-        ).scalar()
+        try:
+            document, chunks_count = await self.store_service.astore_document_with_chunks(
+                db=db,
+                text=req.text,
+                chunk_size=req.chunk_size,
+                overlap=req.overlap,
+                strategy=strategy,
+                collection=req.collection,
+                metadata=req.metadata
+            )
+        except EmbeddingQueueFull as e:
+            raise HTTPException(status_code=503, detail=str(e))
         
         return StoreDocumentResponse(
             document_id=document.id,
             chunks_count=chunks_count,
             message=f"Document stored successfully with {chunks_count} chunks"
         )
-
+    
+    async def store_documents_bulk(self, req: BulkStoreRequest) -> BulkStoreResponse:
+        """
+        Store many documents through the bulk ingestion pipeline.
+        
+        Args:
+            req: BulkStoreRequest containing the documents and default chunking parameters
+            
+        Returns:
+            BulkStoreResponse with document IDs, chunk count and throughput
+            
+        Raises:
+            HTTPException: If no documents are given, the collection is unknown or the embedding queue is full
+        """
+        if not req.documents:
+            raise HTTPException(status_code=400, detail="Documents cannot be empty")
+        
+        await self._check_collection(req.collection)
+        
+        documents = [doc.model_dump(exclude_none=True) for doc in req.documents]
+        return await self._ingest(documents, req.chunk_size, req.overlap, req.strategy, req.collection)
+    
+    async def store_documents_jsonl(
+        self,
+        lines: AsyncIterator[bytes],
+        chunk_size: int = 500,
+        overlap: int = 50,
+        strategy: Optional[str] = None,
+        collection: str = DEFAULT_COLLECTION
+    ) -> BulkStoreResponse:
+        """
+        Store documents streamed as JSON lines, one {"text": ...} object per line.
+        
+        Args:
+            lines: Async iterator over the raw request body
+            chunk_size: Default maximum size of each chunk
+            overlap: Default overlap between chunks
+            strategy: Default chunking strategy
+            collection: Collection every document is stored in
+            
+        Returns:
+            BulkStoreResponse with document IDs, chunk count and throughput
+            
+        Raises:
+            HTTPException: If a line is not a valid document object, the collection is unknown or the embedding
+                queue is full
+        """
+        await self._check_collection(collection)
+        return await self._ingest(self._parse_jsonl(lines), chunk_size, overlap, strategy, collection)
+    
+    @staticmethod
+    async def _parse_jsonl(body: AsyncIterator[bytes]) -> AsyncIterator[Dict]:
+        """Yield one document per JSON line without buffering the whole body, validated like the list payload."""
+        buffer = b""
+        number = 0
+        async for chunk in body:
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                number += 1
+                if line.strip():
+                    yield EmbeddingController._parse_document(line, number)
+        if buffer.strip():
+            yield EmbeddingController._parse_document(buffer, number + 1)
+    
+    @staticmethod
+    def _parse_document(line: bytes, number: int) -> Dict:
+        """
+        Parse one JSON line into a document dictionary.
+        
+        Raises:
+            ValueError: If the line is not an object matching BulkDocument (JSONDecodeError for invalid JSON)
+        """
+        try:
+            document = BulkDocument.model_validate(json.loads(line))
+        except ValidationError as e:
+            error = e.errors()[0]
+            field = ".".join(str(part) for part in error["loc"])
+            raise ValueError(f"Invalid document on line {number}: {field + ': ' if field else ''}{error['msg']}")
+        return document.model_dump(exclude_none=True)
+    
+    @staticmethod
+    async def _check_collection(collection: str):
+        """Fail with 404 before any embedding work if the collection does not exist."""
+        if await collection_service.aquantization(collection) is None:
+            raise HTTPException(status_code=404, detail=f"Collection {collection} not found")
+    
+    async def _ingest(
+        self,
+        documents,
+        chunk_size: int,
+        overlap: int,
+        strategy: Optional[str],
+        collection: str
+    ) -> BulkStoreResponse:
+        try:
+            result = await self.ingestion_pipeline.ingest(
+                documents,
+                chunk_size=chunk_size,
+                overlap=overlap,
+                strategy=resolve_strategy(strategy),
+                collection=collection
+            )
+        except json.JSONDecodeError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid JSON line: {str(e)}")
+        except ValueError as e:
+            # Invalid document line, or an unknown chunking strategy on an individual document
+            raise HTTPException(status_code=400, detail=str(e))
+        except EmbeddingQueueFull as e:
+            raise HTTPException(status_code=503, detail=str(e))
+        
+        return self._bulk_response(result)
+    
+    @staticmethod
+    def _bulk_response(result: IngestionResult) -> BulkStoreResponse:
+        return BulkStoreResponse(
+            document_ids=result.document_ids,
+            documents_count=len(result.document_ids),
+            chunks_count=result.chunks_count,
+            duration_seconds=result.duration,
+            docs_per_sec=result.docs_per_sec,
+            chunks_per_sec=result.chunks_per_sec
+        )
@@ -1,5 +1,7 @@
-from .database import Base, engine, get_db
-from .models import Document, DocumentChunk
-
-__all__ = ["Base", "engine", "get_db", "Document", "DocumentChunk"]
+from .database import Base, engine, async_engine, get_db, get_async_db, read_only_connection, pool_stats
+from .models import Collection, Document, DocumentChunk
 
+__all__ = [
+    "Base", "engine", "async_engine", "get_db", "get_async_db", "read_only_connection", "pool_stats",
+    "Collection", "Document", "DocumentChunk",
+]
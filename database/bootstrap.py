@@ -0,0 +1,350 @@
+import argparse
+import os
+import re
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from .database import Base, engine
+from .models import (
+    EMBEDDING_DIM, TEXT_SEARCH_CONFIG, VECTOR_QUANTIZATION, QUANTIZED_INDEX_EXPRESSIONS, DEFAULT_COLLECTION
+)
+from utils.logger import logger
+
+# ANN index settings for document_chunks.embedding (one index per collection partition)
+VECTOR_INDEX_TYPE = os.getenv("VECTOR_INDEX_TYPE", "hnsw")  # hnsw | ivfflat | none
+HNSW_M = int(os.getenv("HNSW_M", "16"))
+HNSW_EF_CONSTRUCTION = int(os.getenv("HNSW_EF_CONSTRUCTION", "64"))
+IVFFLAT_LISTS = int(os.getenv("IVFFLAT_LISTS", "100"))
+
+# Idempotent upgrades for databases created from an older schema
+UPGRADE_STATEMENTS = [
+    "ALTER TABLE documents ADD COLUMN IF NOT EXISTS external_id VARCHAR",
+    "ALTER TABLE documents ADD COLUMN IF NOT EXISTS content_hash VARCHAR(64)",
+    "ALTER TABLE documents ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP NOT NULL "
+    "DEFAULT timezone('utc', now())",
+    f"ALTER TABLE documents ADD COLUMN IF NOT EXISTS collection VARCHAR(48) NOT NULL DEFAULT '{DEFAULT_COLLECTION}' "
+    "REFERENCES collections(name)",
+    "CREATE INDEX IF NOT EXISTS ix_documents_collection ON documents(collection)",
+    # External IDs used to be unique globally; they are now unique per collection
+    "ALTER TABLE documents DROP CONSTRAINT IF EXISTS documents_external_id_key",
+    "DROP INDEX IF EXISTS documents_external_id_key",
+    "CREATE UNIQUE INDEX IF NOT EXISTS uq_documents_collection_external_id ON documents(collection, external_id)",
+    f"ALTER TABLE document_chunks ADD COLUMN IF NOT EXISTS collection VARCHAR(48) NOT NULL DEFAULT '{DEFAULT_COLLECTION}'",
+    "ALTER TABLE document_chunks ADD COLUMN IF NOT EXISTS content_hash VARCHAR(64)",
+    "CREATE INDEX IF NOT EXISTS ix_document_chunks_content_hash ON document_chunks(content_hash)",
+    "ALTER TABLE document_chunks ADD COLUMN IF NOT EXISTS text_search tsvector "
+    f"GENERATED ALWAYS AS (to_tsvector('{TEXT_SEARCH_CONFIG}', text)) STORED",
+    "CREATE INDEX IF NOT EXISTS idx_document_chunks_text_search ON document_chunks USING gin (text_search)",
+    "ALTER TABLE document_chunks ADD COLUMN IF NOT EXISTS chunk_index INTEGER",
+    "CREATE INDEX IF NOT EXISTS idx_document_chunks_position ON document_chunks(document_id, chunk_index)",
+    # Empty once old chunks are numbered, so the startup check below is an index probe
+    "CREATE INDEX IF NOT EXISTS idx_document_chunks_unnumbered ON document_chunks(document_id) "
+    "WHERE chunk_index IS NULL",
+    "ALTER TABLE documents ADD COLUMN IF NOT EXISTS metadata JSONB NOT NULL DEFAULT '{}'::jsonb",
+    "CREATE INDEX IF NOT EXISTS idx_documents_metadata ON documents USING gin (metadata jsonb_path_ops)",
+    "ALTER TABLE document_chunks ADD COLUMN IF NOT EXISTS metadata JSONB NOT NULL DEFAULT '{}'::jsonb",
+    "CREATE INDEX IF NOT EXISTS idx_document_chunks_metadata ON document_chunks USING gin (metadata jsonb_path_ops)",
+]
+
+# Number chunks stored before chunk_index existed by where their text first
+# occurs in the document. This is only an approximation (a chunk whose text
+# also occurs earlier, or was normalised by the chunker, may be misplaced), so
+# it touches only rows still without an index: chunks stored since then carry
+# the position the chunker gave them.
+CHUNK_INDEX_BACKFILL_SQL = """
+    UPDATE document_chunks c SET chunk_index = p.position
+    FROM (
+        SELECT dc.id, row_number() OVER (
+            PARTITION BY dc.document_id ORDER BY NULLIF(strpos(d.text, dc.text), 0) NULLS LAST, dc.id
+        ) - 1 AS position
+        FROM document_chunks dc
+        JOIN documents d ON d.id = dc.document_id
+        WHERE dc.document_id IN (SELECT document_id FROM document_chunks WHERE chunk_index IS NULL)
+    ) p
+    WHERE c.id = p.id AND c.chunk_index IS NULL
+"""
+
+
+# Collection names become part of partition and index names
+COLLECTION_NAME_PATTERN = re.compile(r"^[a-z][a-z0-9_]{0,31}$")
+
+# Columns copied when moving chunks from a pre-partitioning table
+CHUNK_COLUMNS = "id, collection, document_id, embedding, text, chunk_index, content_hash, metadata"
+
+
+def validate_collection_name(name: str) -> str:
+    """
+    Check that a collection name is safe to use in partition and index names.
+
+    Raises:
+        ValueError: If the name is not 1-32 lowercase letters, digits or underscores
+    """
+    if not COLLECTION_NAME_PATTERN.match(name or ""):
+        raise ValueError(
+            f"Invalid collection name: {name!r} (use 1-32 lowercase letters, digits or underscores)"
+        )
+    return name
+
+
+def partition_name(collection: str) -> str:
+    """Name of the document_chunks partition holding a collection."""
+    return f"document_chunks_{validate_collection_name(collection)}"
+
+
+def vector_index_name(quantization: str = VECTOR_QUANTIZATION, collection: str = DEFAULT_COLLECTION) -> str:
+    """Name of a collection's ANN index for a quantization mode, so each mode has its own index."""
+    name = f"idx_chunks_{validate_collection_name(collection)}_embedding"
+    if quantization == "none":
+        return name
+    return f"{name}_{quantization}"
+
+
+def vector_index_ddl(
+    index_type: str = VECTOR_INDEX_TYPE,
+    quantization: str = VECTOR_QUANTIZATION,
+    collection: str = DEFAULT_COLLECTION
+) -> str:
+    """
+    Build the CREATE INDEX statement for a collection partition's ANN index.
+
+    Args:
+        index_type: "hnsw" or "ivfflat"
+        quantization: "none", "halfvec" or "binary"
+        collection: Collection whose partition is indexed
+
+    Returns:
+        SQL statement creating the index if it does not exist
+    """
+    if quantization not in QUANTIZED_INDEX_EXPRESSIONS:
+        raise ValueError(f"Unsupported vector quantization: {quantization}")
+    expression, operator_class = QUANTIZED_INDEX_EXPRESSIONS[quantization]
+
+    if index_type == "hnsw":
+        options = f"m = {HNSW_M}, ef_construction = {HNSW_EF_CONSTRUCTION}"
+    elif index_type == "ivfflat":
+        options = f"lists = {IVFFLAT_LISTS}"
+    else:
+        raise ValueError(f"Unsupported vector index type: {index_type}")
+
+    return (
+        f"CREATE INDEX IF NOT EXISTS {vector_index_name(quantization, collection)} ON {partition_name(collection)} "
+        f"USING {index_type} ({expression} {operator_class}) WITH ({options})"
+    )
+
+
+def create_vector_index(
+    bind: Engine = engine,
+    index_type: str = VECTOR_INDEX_TYPE,
+    rebuild: bool = False,
+    quantization: str = VECTOR_QUANTIZATION,
+    collection: str = DEFAULT_COLLECTION
+):
+    """
+    Create (or rebuild) the ANN index on a collection partition's embeddings.
+
+    IVFFlat picks its list centroids from the rows present at build time,
+    so it should be rebuilt once the table holds a representative sample.
+    Quantized modes index a halfvec or bit expression of the float32
+    column rather than the column itself.
+
+    Args:
+        bind: Engine to run the DDL on
+        index_type: "hnsw", "ivfflat" or "none"
+        rebuild: Drop an existing index before creating it
+        quantization: "none", "halfvec" or "binary"
+        collection: Collection whose partition is indexed
+    """
+    index_name = vector_index_name(quantization, collection)
+    with bind.begin() as conn:
+        if rebuild:
+            conn.execute(text(f"DROP INDEX IF EXISTS {index_name}"))
+        if index_type == "none":
+            return
+        logger.info(f"[DB] ensuring {index_type} index {index_name}")
+        conn.execute(text(vector_index_ddl(index_type, quantization, collection)))
+
+
+def create_collection_partition(conn, collection: str):
+    """Create the document_chunks partition for a collection if it does not exist."""
+    conn.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {partition_name(collection)} "
+        f"PARTITION OF document_chunks FOR VALUES IN ('{collection}')"
+    ))
+
+
+def create_collection(
+    bind: Engine = engine,
+    name: str = DEFAULT_COLLECTION,
+    quantization: str = VECTOR_QUANTIZATION,
+    index_type: str = VECTOR_INDEX_TYPE
+) -> bool:
+    """
+    Register a collection and create its partition and ANN index.
+
+    Args:
+        bind: Engine to run the DDL on
+        name: Collection name
+        quantization: Quantization of the partition's ANN index
+        index_type: "hnsw", "ivfflat" or "none"
+
+    Returns:
+        True if the collection was created, False if it already existed
+
+    Raises:
+        ValueError: If the name or quantization is invalid
+    """
+    validate_collection_name(name)
+    if quantization not in QUANTIZED_INDEX_EXPRESSIONS:
+        raise ValueError(f"Unsupported vector quantization: {quantization}")
+
+    with bind.begin() as conn:
+        created = conn.execute(
+            text("INSERT INTO collections (name, quantization, created_at) "
+                 "VALUES (:name, :quantization, now()) ON CONFLICT (name) DO NOTHING"),
+            {"name": name, "quantization": quantization}
+        ).rowcount > 0
+        create_collection_partition(conn, name)
+
+    if created:
+        create_vector_index(bind, index_type=index_type, quantization=quantization, collection=name)
+    return created
+
+
+def drop_collection(bind: Engine = engine, name: str = DEFAULT_COLLECTION) -> bool:
+    """
+    Delete a collection with all its documents.
+
+    The chunks go with their partition (a DROP TABLE instead of a cascading
+    DELETE over the whole chunk table); only the collection's document rows
+    are deleted row by row.
+
+    Args:
+        bind: Engine to run the DDL on
+        name: Collection name
+
+    Returns:
+        True if the collection existed
+    """
+    with bind.begin() as conn:
+        exists = conn.execute(text("SELECT 1 FROM collections WHERE name = :name FOR UPDATE"), {"name": name}).first()
+        if exists is None:
+            return False
+        logger.info(f"[DB] dropping collection {name}")
+        conn.execute(text(f"DROP TABLE IF EXISTS {partition_name(name)}"))
+        conn.execute(text("DELETE FROM documents WHERE collection = :name"), {"name": name})
+        conn.execute(text("DELETE FROM collections WHERE name = :name"), {"name": name})
+    return True
+
+
+def _detach_unpartitioned_chunks(conn) -> bool:
+    """
+    Move a pre-partitioning document_chunks table out of the way.
+
+    Returns:
+        True if an ordinary (unpartitioned) table was found and renamed
+    """
+    kind = conn.execute(text("SELECT relkind FROM pg_class WHERE oid = to_regclass('document_chunks')")).scalar()
+    if kind != "r":
+        return False
+    logger.info("[DB] converting document_chunks to a table partitioned by collection")
+    conn.execute(text("ALTER TABLE document_chunks RENAME TO document_chunks_unpartitioned"))
+    # Index names are schema-wide, so free them for the partitioned table
+    conn.execute(text("ALTER TABLE document_chunks_unpartitioned DROP CONSTRAINT IF EXISTS document_chunks_pkey"))
+    indexes = conn.execute(text(
+        "SELECT indexrelid::regclass::text FROM pg_index "
+        "WHERE indrelid = 'document_chunks_unpartitioned'::regclass"
+    )).scalars().all()
+    for index in indexes:
+        conn.execute(text(f"DROP INDEX IF EXISTS {index}"))
+    return True
+
+
+def _backfill_chunk_indexes(conn):
+    """Number chunks stored before chunk_index existed; only an index probe once none are left."""
+    if not conn.execute(text("SELECT EXISTS (SELECT 1 FROM document_chunks WHERE chunk_index IS NULL)")).scalar():
+        return
+    count = conn.execute(text(CHUNK_INDEX_BACKFILL_SQL)).rowcount
+    logger.info(f"[DB] numbered {count} chunks stored without a chunk index")
+
+
+def init_db(
+    bind: Engine = engine,
+    index_type: str = VECTOR_INDEX_TYPE,
+    rebuild_index: bool = False,
+    quantization: str = VECTOR_QUANTIZATION
+):
+    """
+    Idempotently bring the database schema up to date.
+
+    Creates the pgvector extension and tables, upgrades an untyped
+    embedding column to vector(EMBEDDING_DIM), adds columns introduced
+    since the initial schema, moves chunks from an unpartitioned table into
+    per-collection partitions, and creates each partition's ANN index.
+
+    Args:
+        bind: Engine to run the DDL on
+        index_type: "hnsw", "ivfflat" or "none"
+        rebuild_index: Drop and recreate the ANN index
+        quantization: Quantization of the default collection's ANN index when it is first created
+    """
+    with bind.begin() as conn:
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
+
+    Base.metadata.create_all(bind=bind)
+
+    with bind.begin() as conn:
+        conn.execute(
+            text("INSERT INTO collections (name, quantization, created_at) "
+                 "VALUES (:name, :quantization, now()) ON CONFLICT (name) DO NOTHING"),
+            {"name": DEFAULT_COLLECTION, "quantization": quantization}
+        )
+
+        column_type = conn.execute(text("""
+            SELECT format_type(atttypid, atttypmod)
+            FROM pg_attribute
+            WHERE attrelid = 'document_chunks'::regclass AND attname = 'embedding'
+        """)).scalar()
+        if column_type == "vector":
+            logger.info(f"[DB] converting document_chunks.embedding to vector({EMBEDDING_DIM})")
+            conn.execute(text(
+                f"ALTER TABLE document_chunks ALTER COLUMN embedding TYPE vector({EMBEDDING_DIM})"
+            ))
+
+        # Columns added after the initial schema (create_all skips existing tables)
+        for statement in UPGRADE_STATEMENTS:
+            conn.execute(text(statement))
+        _backfill_chunk_indexes(conn)
+
+        migrating = _detach_unpartitioned_chunks(conn)
+
+    if migrating:
+        Base.metadata.create_all(bind=bind)
+
+    with bind.begin() as conn:
+        collections = conn.execute(text("SELECT name, quantization FROM collections")).all()
+        for collection in collections:
+            create_collection_partition(conn, collection.name)
+        if migrating:
+            conn.execute(text(
+                f"INSERT INTO document_chunks ({CHUNK_COLUMNS}) "
+                f"SELECT {CHUNK_COLUMNS} FROM document_chunks_unpartitioned"
+            ))
+            conn.execute(text("DROP TABLE document_chunks_unpartitioned"))
+
+    for collection in collections:
+        create_vector_index(
+            bind,
+            index_type=index_type,
+            rebuild=rebuild_index,
+            quantization=collection.quantization,
+            collection=collection.name
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bootstrap the database schema and indexes")
+    parser.add_argument("--index-type", default=VECTOR_INDEX_TYPE, choices=["hnsw", "ivfflat", "none"])
+    parser.add_argument("--rebuild-index", action="store_true", help="Drop and recreate the ANN index")
+    parser.add_argument("--quantization", default=VECTOR_QUANTIZATION, choices=sorted(QUANTIZED_INDEX_EXPRESSIONS))
+    args = parser.parse_args()
+
+    init_db(index_type=args.index_type, rebuild_index=args.rebuild_index, quantization=args.quantization)
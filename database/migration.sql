@@ -1,21 +1,57 @@
 -- Enable pgvector extension
 CREATE EXTENSION IF NOT EXISTS vector;
 
+-- Create collections table (one per tenant / namespace)
+CREATE TABLE collections (
+    name VARCHAR(48) PRIMARY KEY,
+    quantization VARCHAR(16) NOT NULL DEFAULT 'none',
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+INSERT INTO collections (name) VALUES ('default');
+
 -- Create documents table
 CREATE TABLE documents (
     id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    collection VARCHAR(48) NOT NULL DEFAULT 'default' REFERENCES collections(name),
+    external_id VARCHAR,
     text TEXT NOT NULL,
-    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+    content_hash VARCHAR(64),
+    metadata JSONB NOT NULL DEFAULT '{}'::jsonb,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT uq_documents_collection_external_id UNIQUE (collection, external_id)
 );
 
--- Create document_chunks table
+-- Create document_chunks table, partitioned by collection
 CREATE TABLE document_chunks (
-    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    id UUID NOT NULL DEFAULT gen_random_uuid(),
+    collection VARCHAR(48) NOT NULL DEFAULT 'default',
     document_id UUID NOT NULL REFERENCES documents(id) ON DELETE CASCADE,
-    embedding vector NOT NULL,
-    text TEXT NOT NULL
-);
+    embedding vector(768) NOT NULL,
+    text TEXT NOT NULL,
+    chunk_index INTEGER,
+    content_hash VARCHAR(64),
+    metadata JSONB NOT NULL DEFAULT '{}'::jsonb,
+    text_search tsvector GENERATED ALWAYS AS (to_tsvector('simple', text)) STORED,
+    PRIMARY KEY (id, collection)
+) PARTITION BY LIST (collection);
 
--- Create indexes
+-- One partition per collection (database/bootstrap.py creates them for new collections)
+CREATE TABLE document_chunks_default PARTITION OF document_chunks FOR VALUES IN ('default');
+
+-- Create indexes (indexes on document_chunks cascade to every partition)
 CREATE INDEX idx_documents_created_at ON documents(created_at);
+CREATE INDEX ix_documents_collection ON documents(collection);
 CREATE INDEX idx_document_chunks_document_id ON document_chunks(document_id);
+CREATE INDEX idx_document_chunks_position ON document_chunks(document_id, chunk_index);
+CREATE INDEX ix_document_chunks_content_hash ON document_chunks(content_hash);
+CREATE INDEX idx_document_chunks_text_search ON document_chunks USING gin (text_search);
+-- Metadata filters (@> containment and @@ jsonpath predicates)
+CREATE INDEX idx_documents_metadata ON documents USING gin (metadata jsonb_path_ops);
+CREATE INDEX idx_document_chunks_metadata ON document_chunks USING gin (metadata jsonb_path_ops);
+
+-- Approximate nearest neighbour index for cosine search, per partition
+-- (use database/bootstrap.py to switch to ivfflat, quantize, or change build parameters)
+CREATE INDEX idx_chunks_default_embedding ON document_chunks_default
+    USING hnsw (embedding vector_cosine_ops) WITH (m = 16, ef_construction = 64);
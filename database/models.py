@@ -1,31 +1,124 @@
-from sqlalchemy import Column, String, ForeignKey, DateTime, Text
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, ForeignKey, DateTime, Text, Integer, Computed, Index, UniqueConstraint, func, text
+from sqlalchemy.dialects.postgresql import UUID, TSVECTOR, JSONB
 from sqlalchemy.orm import relationship
 from pgvector.sqlalchemy import Vector
 from datetime import datetime
 import uuid
+import os
 from .database import Base
 
+# Dimension of the stored embeddings (granite-embedding-278m produces 768)
+EMBEDDING_DIM = int(os.getenv("EMBEDDING_DIM", "768"))
+
+# How the ANN index stores vectors: "none" (float32), "halfvec" (float16) or
+# "binary" (1 bit per dimension, Hamming distance). The float32 column is
+# always kept so quantized candidates can be re-ranked at full precision.
+VECTOR_QUANTIZATION = os.getenv("VECTOR_QUANTIZATION", "none")
+
+# Indexed expression and operator class for each quantization mode
+QUANTIZED_INDEX_EXPRESSIONS = {
+    "none": ("embedding", "vector_cosine_ops"),
+    "halfvec": (f"(embedding::halfvec({EMBEDDING_DIM}))", "halfvec_cosine_ops"),
+    "binary": (f"(binary_quantize(embedding)::bit({EMBEDDING_DIM}))", "bit_hamming_ops"),
+}
+
+# Postgres text search configuration for chunk full-text search ("simple" suits multilingual text)
+TEXT_SEARCH_CONFIG = os.getenv("TEXT_SEARCH_CONFIG", "simple")
+
+# Collection used when a request does not name one
+DEFAULT_COLLECTION = os.getenv("DEFAULT_COLLECTION", "default")
+
+
+def utc_now():
+    """
+    The database clock as naive UTC, for document timestamps.
+
+    Cached chat answers are checked against documents.updated_at, so writers
+    and readers must share one clock. clock_timestamp() rather than now(),
+    which is frozen when the transaction starts: an upsert embeds inside its
+    transaction, and its timestamp should be as close to the commit as possible.
+    """
+    return func.timezone("utc", func.clock_timestamp())
+
+
+class Collection(Base):
+    """A tenant namespace; each collection owns one partition of document_chunks."""
+    __tablename__ = "collections"
+
+    name = Column(String(48), primary_key=True)  # lowercase letters, digits and underscores
+    quantization = Column(String(16), nullable=False, default=VECTOR_QUANTIZATION)  # ANN index of its partition
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
 
 class Document(Base):
     __tablename__ = "documents"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    collection = Column(String(48), ForeignKey("collections.name"), nullable=False, default=DEFAULT_COLLECTION, index=True)
+    external_id = Column(String, nullable=True)  # caller-supplied ID used for upserts, unique per collection
     text = Column(Text, nullable=False)  # Using Text for longer queries
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    content_hash = Column(String(64), nullable=True)  # sha256 of text, chunking parameters and embedding model
+    # Caller-supplied attributes (source, tags, dates...); "metadata" is reserved on declarative classes
+    metadata_ = Column("metadata", JSONB, nullable=False, default=dict, server_default="{}")
+    created_at = Column(DateTime, default=utc_now(), nullable=False)
+    updated_at = Column(DateTime, default=utc_now(), nullable=False)
 
     # Relationship to chunks
     chunks = relationship("DocumentChunk", back_populates="document", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        UniqueConstraint("collection", "external_id", name="uq_documents_collection_external_id"),
+        Index("idx_documents_metadata", metadata_, postgresql_using="gin", postgresql_ops={"metadata": "jsonb_path_ops"}),
+    )
+
 
 class DocumentChunk(Base):
+    """
+    Chunk of a document with its embedding.
+
+    The table is LIST-partitioned by collection (one partition per
+    collection, created by database/bootstrap.py), so the partition key is
+    part of the primary key.
+    """
     __tablename__ = "document_chunks"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    collection = Column(String(48), primary_key=True, default=DEFAULT_COLLECTION)
     document_id = Column(UUID(as_uuid=True), ForeignKey("documents.id", ondelete="CASCADE"), nullable=False, index=True)
-    embedding = Column(Vector, nullable=False)  # pgvector vector type for embeddings
+    # ANN indexes are created per partition by database/bootstrap.py (hnsw or ivfflat)
+    embedding = Column(Vector(EMBEDDING_DIM), nullable=False)  # pgvector vector type for embeddings
     text = Column(Text, nullable=False)
+    chunk_index = Column(Integer, nullable=True)  # position of the chunk within its document
+    content_hash = Column(String(64), nullable=True, index=True)  # sha256 of text and embedding model, used to reuse vectors
+    # Copy of the document's metadata, so filters run in the same scan as the ANN index
+    metadata_ = Column("metadata", JSONB, nullable=False, default=dict, server_default="{}")
+    text_search = Column(TSVECTOR, Computed(f"to_tsvector('{TEXT_SEARCH_CONFIG}', text)", persisted=True))
 
     # Relationship to document
     document = relationship("Document", back_populates="chunks")
 
+    __table_args__ = (
+        Index("idx_document_chunks_text_search", "text_search", postgresql_using="gin"),
+        Index("idx_document_chunks_position", "document_id", "chunk_index"),
+        Index(
+            "idx_document_chunks_metadata", metadata_, postgresql_using="gin", postgresql_ops={"metadata": "jsonb_path_ops"}
+        ),
+        {"postgresql_partition_by": "LIST (collection)"},
+    )
+
+
+
+class ChatSession(Base):
+    """
+    Compact conversation state of a chat session.
+
+    Holds the running summary of older turns and the most recent turns
+    verbatim (serialized LangChain messages); tool calls are not kept.
+    """
+    __tablename__ = "chat_sessions"
+
+    id = Column(String(128), primary_key=True)  # caller-supplied session ID
+    summary = Column(Text, nullable=False, default="")
+    messages = Column(JSONB, nullable=False, default=list, server_default=text("'[]'::jsonb"))
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
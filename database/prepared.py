@@ -0,0 +1,95 @@
+import re
+from typing import List, Sequence, Union
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession, AsyncConnection
+from .database import DB_PGBOUNCER
+
+
+def to_vector_literal(embedding: Sequence[float]) -> str:
+    """
+    Format an embedding as a pgvector input string.
+
+    Args:
+        embedding: Vector values
+
+    Returns:
+        String such as "[0.1,0.2,0.3]"
+    """
+    return "[" + ",".join(map(str, embedding)) + "]"
+
+
+class PreparedStatement:
+    """
+    Server-side prepared statement that is PREPAREd lazily once per pooled connection.
+
+    The SQL uses positional $1..$n placeholders with the types given in
+    ``arg_types``; the prepared names are tracked in the pooled connection's
+    ``info`` dict, which lives as long as the underlying DBAPI connection.
+    On asyncpg the same SQL is sent as-is and the driver's own statement
+    cache keeps it prepared.
+
+    Behind PgBouncer (DB_PGBOUNCER) a pooled connection may reach a different
+    server connection on every transaction, so the sync path sends the SQL
+    unprepared with its placeholders rewritten to named parameters.
+
+    Both paths accept an ORM session or a Core connection.
+    """
+
+    def __init__(self, name: str, sql: str, arg_types: List[str]):
+        """
+        Initialize the prepared statement.
+
+        Args:
+            name: Statement name, unique per process
+            sql: Statement body with $1..$n placeholders
+            arg_types: Postgres types of the placeholders, in order
+        """
+        self.name = name
+        self.sql = sql
+        self.arg_types = arg_types
+        # Same statement in pyformat for the unprepared psycopg2 path; every
+        # placeholder carries an explicit cast, so the types are kept
+        self.pyformat_sql = re.sub(r"\$(\d+)", r"%(p\1)s", sql.replace("%", "%%"))
+
+    def execute(self, db: Union[Session, Connection], *args):
+        """
+        Execute the statement, preparing it on this connection first if needed.
+
+        Args:
+            db: Database session or connection
+            *args: Positional parameter values matching arg_types
+
+        Returns:
+            SQLAlchemy CursorResult
+        """
+        connection = db.connection() if isinstance(db, Session) else db
+        if DB_PGBOUNCER:
+            return connection.exec_driver_sql(
+                self.pyformat_sql, {f"p{position}": value for position, value in enumerate(args, 1)}
+            )
+
+        prepared = connection.info.setdefault("prepared_statements", set())
+
+        if self.name not in prepared:
+            connection.exec_driver_sql(
+                f"PREPARE {self.name} ({', '.join(self.arg_types)}) AS {self.sql}"
+            )
+            prepared.add(self.name)
+
+        placeholders = ", ".join(["%s"] * len(args))
+        return connection.exec_driver_sql(f"EXECUTE {self.name} ({placeholders})", tuple(args))
+
+    async def aexecute(self, db: Union[AsyncSession, AsyncConnection], *args):
+        """
+        Execute the statement on an asyncpg session or connection.
+
+        Args:
+            db: Async database session or connection
+            *args: Positional parameter values matching arg_types (vectors as lists)
+
+        Returns:
+            SQLAlchemy CursorResult
+        """
+        connection = await db.connection() if isinstance(db, AsyncSession) else db
+        return await connection.exec_driver_sql(self.sql, tuple(args))
@@ -1,17 +1,64 @@
+from contextlib import asynccontextmanager
+import os
+import threading
 from fastapi import FastAPI
 import uvicorn
 from routes import router
 from middleware.logging_middleware import LoggingMiddleware
+from middleware.metrics_middleware import MetricsMiddleware
+from database.bootstrap import init_db
+from agent.llm import get_token_counter
+from services.model_registry import model_registry
+from services.reranker_service import get_reranker_service, shutdown_reranker
+from services.search_backends import SEARCH_BACKEND, PgVectorBackend
+from services.search_options import SEARCH_RERANK
+from utils.logger import logger
+from utils.tracing import setup_tracing, shutdown_tracing
+
+# Run idempotent schema/index bootstrap on startup
+DB_AUTO_MIGRATE = os.getenv("DB_AUTO_MIGRATE", "true").lower() == "true"
+# Load embedding models in the background so the app starts serving immediately
+MODEL_WARMUP = os.getenv("MODEL_WARMUP", "true").lower() == "true"
+
+
+# ---------------------------
+# Lifespan
+# ---------------------------
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    setup_tracing()
+    if DB_AUTO_MIGRATE:
+        try:
+            init_db()
+        except Exception as e:
+            logger.error(f"[DB] bootstrap failed: {str(e)}")
+    if SEARCH_BACKEND == "pgvector":
+        try:
+            PgVectorBackend.check_server()
+        except Exception as e:
+            logger.error(f"[DB] pgvector version check failed: {str(e)}")
+    if MODEL_WARMUP:
+        model_registry.warm_up()
+        if SEARCH_RERANK:
+            threading.Thread(target=get_reranker_service().load, name="reranker-warmup", daemon=True).start()
+        # The tokenizer sizing agent search results may need to download its data
+        threading.Thread(target=get_token_counter, name="tokenizer-warmup", daemon=True).start()
+    yield
+    model_registry.shutdown()
+    shutdown_reranker()
+    shutdown_tracing()
+
 
 # ---------------------------
 # FastAPI app
 # ---------------------------
-app = FastAPI(title="Local GGUF Embedding Service")
+app = FastAPI(title="Local GGUF Embedding Service", lifespan=lifespan)
 
 # ---------------------------
 # Add middleware
 # ---------------------------
 app.add_middleware(LoggingMiddleware)
+app.add_middleware(MetricsMiddleware)
 
 # ---------------------------
 # Include routes
@@ -20,4 +67,4 @@ app.include_router(router)
 
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -1,4 +1,4 @@
 from .logging_middleware import LoggingMiddleware
+from .metrics_middleware import MetricsMiddleware
 
-__all__ = ["LoggingMiddleware"]
-
+__all__ = ["LoggingMiddleware", "MetricsMiddleware"]
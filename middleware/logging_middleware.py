@@ -1,47 +1,64 @@
 import time
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.responses import StreamingResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from utils.logger import logger
-import json
 
 
-class LoggingMiddleware(BaseHTTPMiddleware):
+class LoggingMiddleware:
     """
     Middleware to log HTTP requests and responses.
+    
+    Implemented as plain ASGI middleware so response bodies (including
+    server-sent event streams) pass straight through without buffering;
+    the response is logged once its last body chunk has been sent.
     """
     
-    async def dispatch(self, request: Request, call_next):
+    def __init__(self, app: ASGIApp):
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
         start_time = time.time()
+        method = scope["method"]
+        path = scope["path"]
+        client = scope.get("client")
+        status_code = 500
         
         # Log request
         logger.info(
-            f"Request: {request.method} {request.url.path} - "
-            f"Client: {request.client.host if request.client else 'unknown'}"
+            f"Request: {method} {path} - "
+            f"Client: {client[0] if client else 'unknown'}"
         )
         
-        try:
-            # Process request
-            response = await call_next(request)
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
             
-            # Calculate duration
-            duration = time.time() - start_time
+            await send(message)
             
-            # Log response
-            logger.info(
-                f"Response: {request.method} {request.url.path} - "
-                f"Status: {response.status_code} - "
-                f"Duration: {duration:.3f}s"
-            )
-            
-            return response
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                # Calculate duration
+                duration = time.time() - start_time
+                
+                # Log response
+                logger.info(
+                    f"Response: {method} {path} - "
+                    f"Status: {status_code} - "
+                    f"Duration: {duration:.3f}s"
+                )
+        
+        try:
+            # Process request
+            await self.app(scope, receive, send_wrapper)
             
         except Exception as e:
             duration = time.time() - start_time
             logger.error(
-                f"Error: {request.method} {request.url.path} - "
+                f"Error: {method} {path} - "
                 f"Error: {str(e)} - "
                 f"Duration: {duration:.3f}s"
             )
             raise
-
@@ -0,0 +1,56 @@
+import time
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from utils.metrics import HTTP_REQUEST_SECONDS
+from utils.tracing import start_span
+
+
+class MetricsMiddleware:
+    """
+    Middleware to record HTTP request latency and open the request's root span.
+    
+    Requests are labelled by route template (e.g. /documents/{external_id})
+    rather than raw path, so the label set stays bounded; requests that match
+    no route are grouped under "unmatched". Streaming responses are timed
+    until their last body chunk has been sent.
+    """
+    
+    def __init__(self, app: ASGIApp):
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["path"] == "/metrics":
+            await self.app(scope, receive, send)
+            return
+        
+        start_time = time.perf_counter()
+        method = scope["method"]
+        status_code = 500
+        recorded = False
+        
+        def record():
+            nonlocal recorded
+            if recorded:
+                return
+            recorded = True
+            route = scope.get("route")
+            route_path = getattr(route, "path", "unmatched")
+            HTTP_REQUEST_SECONDS.labels(method, route_path, str(status_code)).observe(time.perf_counter() - start_time)
+            if span is not None:
+                span.update_name(f"{method} {route_path}")
+                span.set_attribute("http.status_code", status_code)
+        
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            
+            await send(message)
+            
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                record()
+        
+        with start_span(f"{method} {scope['path']}", {"http.method": method}) as span:
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                record()
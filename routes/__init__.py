@@ -1,11 +1,19 @@
 from fastapi import APIRouter
 from .embedding_routes import router as embedding_router
 from .chat_routes import router as chat_router
+from .document_routes import router as document_router
+from .health_routes import router as health_router
+from .collection_routes import router as collection_router
+from .metrics_routes import router as metrics_router
 
 # Combine all routers
 router = APIRouter()
 router.include_router(embedding_router)
+router.include_router(document_router)
+router.include_router(collection_router)
 router.include_router(chat_router)
+router.include_router(health_router)
+router.include_router(metrics_router)
 
 __all__ = ["router"]
 
@@ -1,6 +1,8 @@
 from fastapi import APIRouter
-from schemas.schemas import ChatRequest, ChatResponse
+from fastapi.responses import StreamingResponse
+from schemas.schemas import ChatCacheStats, ChatRequest, ChatResponse, ChatSessionResponse
 from controllers.chat_controller import ChatController
+from services.response_cache import chat_response_cache
 
 # Initialize controller
 chat_controller = ChatController()
@@ -10,7 +12,7 @@ router = APIRouter(tags=["chat"])
 
 
 @router.post("/chat", response_model=ChatResponse)
-def chat(req: ChatRequest):
+async def chat(req: ChatRequest):
     """
     Endpoint to chat with the agent.
     The agent can use semantic search to find relevant information from stored documents.
@@ -21,5 +23,65 @@ def chat(req: ChatRequest):
     Returns:
         ChatResponse with the agent's response
     """
-    return chat_controller.chat(req)
+    return await chat_controller.chat(req)
 
+
+
+@router.post("/chat/stream")
+async def chat_stream(req: ChatRequest):
+    """
+    Endpoint to chat with the agent, streaming the answer as server-sent events.
+    
+    Emits `tool_start` / `tool_end` events around tool calls, `token` events as
+    the LLM produces output, and a final `done` event with the full response.
+    
+    Args:
+        req: ChatRequest containing the user message
+        
+    Returns:
+        text/event-stream response
+    """
+    return StreamingResponse(
+        chat_controller.stream_chat(req),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/chat/sessions/{session_id}", response_model=ChatSessionResponse)
+async def get_chat_session(session_id: str):
+    """
+    Endpoint to inspect a chat session.
+    
+    Args:
+        session_id: Session ID used in chat requests
+        
+    Returns:
+        ChatSessionResponse with the running summary and the turns kept verbatim
+    """
+    return await chat_controller.get_session(session_id)
+
+
+@router.delete("/chat/sessions/{session_id}")
+async def delete_chat_session(session_id: str):
+    """
+    Endpoint to delete a chat session and its history.
+    
+    Args:
+        session_id: Session ID used in chat requests
+        
+    Returns:
+        Confirmation message
+    """
+    return await chat_controller.delete_session(session_id)
+
+
+@router.get("/chat/cache", response_model=ChatCacheStats)
+def chat_cache_stats():
+    """
+    Endpoint to inspect the semantic answer cache.
+    
+    Returns:
+        ChatCacheStats with hit/miss/invalidation/eviction counters, hit rate and current size
+    """
+    return ChatCacheStats(**chat_response_cache.stats())
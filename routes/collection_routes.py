@@ -0,0 +1,61 @@
+from typing import List
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from schemas.schemas import CollectionCreateRequest, CollectionResponse
+from controllers.collection_controller import CollectionController
+from services.collection_service import collection_service
+from database.database import get_async_db
+
+# Initialize controller with the shared collection service
+collection_controller = CollectionController(collection_service)
+
+# Create router
+router = APIRouter(tags=["collections"])
+
+
+@router.post("/collections", response_model=CollectionResponse, status_code=201)
+async def create_collection(
+    req: CollectionCreateRequest,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Endpoint to create a collection.
+    Each collection gets its own chunk partition and ANN index.
+    
+    Args:
+        req: CollectionCreateRequest with the name and index quantization
+        db: Database session
+        
+    Returns:
+        CollectionResponse describing the new collection
+    """
+    return await collection_controller.create_collection(req, db)
+
+
+@router.get("/collections", response_model=List[CollectionResponse])
+async def list_collections(db: AsyncSession = Depends(get_async_db)):
+    """
+    Endpoint to list collections.
+    
+    Args:
+        db: Database session
+        
+    Returns:
+        List of CollectionResponse ordered by name
+    """
+    return await collection_controller.list_collections(db)
+
+
+@router.delete("/collections/{name}")
+async def drop_collection(name: str):
+    """
+    Endpoint to drop a collection with all its documents.
+    The collection's chunk partition is dropped as a whole.
+    
+    Args:
+        name: Collection name
+        
+    Returns:
+        Confirmation message
+    """
+    return await collection_controller.drop_collection(name)
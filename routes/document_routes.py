@@ -0,0 +1,36 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from schemas.schemas import UpsertDocumentRequest, UpsertDocumentResponse
+from controllers.document_controller import DocumentController
+from services.model_registry import get_embedding_service
+from database.database import get_async_db
+from database.models import DEFAULT_COLLECTION
+
+# Initialize controller with the shared (lazily loaded) embedding model
+document_controller = DocumentController(get_embedding_service())
+
+# Create router
+router = APIRouter(tags=["documents"])
+
+
+@router.put("/documents/{external_id}", response_model=UpsertDocumentResponse)
+async def upsert_document(
+    external_id: str,
+    req: UpsertDocumentRequest,
+    collection: str = DEFAULT_COLLECTION,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Endpoint to create or update a document by external ID.
+    Only chunks whose text changed are re-embedded and rewritten.
+    
+    Args:
+        external_id: Caller-supplied document ID
+        req: UpsertDocumentRequest containing the full text and chunking parameters
+        collection: Collection the document belongs to (external IDs are unique per collection)
+        db: Database session
+        
+    Returns:
+        UpsertDocumentResponse describing which chunks were added, removed or kept
+    """
+    return await document_controller.upsert_document(external_id, req, db, collection)
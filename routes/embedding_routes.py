@@ -1,20 +1,26 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from schemas.schemas import EmbedRequest, EmbedResponse, StoreDocumentRequest, StoreDocumentResponse
+from typing import Optional
+from fastapi import APIRouter, Depends, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from schemas.schemas import (
+    EmbedRequest, EmbedResponse, EmbeddingCacheStats, EmbeddingQueueStats,
+    StoreDocumentRequest, StoreDocumentResponse,
+    BulkStoreRequest, BulkStoreResponse
+)
 from controllers.embedding_controller import EmbeddingController
-from services.embedding_service import EmbeddingService
-from database.database import get_db
+from services.model_registry import get_embedding_service
+from services.embedding_cache import embedding_cache
+from database.database import get_async_db
+from database.models import DEFAULT_COLLECTION
 
-# Initialize service and controller
-embedding_service = EmbeddingService()
-embedding_controller = EmbeddingController(embedding_service)
+# Initialize controller with the shared (lazily loaded) embedding model
+embedding_controller = EmbeddingController(get_embedding_service())
 
 # Create router
 router = APIRouter(tags=["embeddings"])
 
 
 @router.post("/embed", response_model=EmbedResponse)
-def embed_text(req: EmbedRequest):
+async def embed_text(req: EmbedRequest):
     """
     Endpoint to create embeddings for text.
     
@@ -24,13 +30,36 @@ def embed_text(req: EmbedRequest):
     Returns:
         EmbedResponse with embedding vector and dimensions
     """
-    return embedding_controller.embed_text(req)
+    return await embedding_controller.embed_text(req)
+
+
+@router.get("/embed/cache", response_model=EmbeddingCacheStats)
+def embedding_cache_stats():
+    """
+    Endpoint to inspect the embedding cache.
+    
+    Returns:
+        EmbeddingCacheStats with hit/miss/eviction counters and current size
+    """
+    return EmbeddingCacheStats(**embedding_cache.stats())
+
+
+@router.get("/embed/queue", response_model=EmbeddingQueueStats)
+def embedding_queue_stats():
+    """
+    Endpoint to inspect embedding backpressure.
+    
+    Returns:
+        EmbeddingQueueStats with queued requests and, when worker processes
+        are enabled, per-worker in-flight batches and total queue depth
+    """
+    return EmbeddingQueueStats(**embedding_controller.embedding_service.queue_stats())
 
 
 @router.post("/store", response_model=StoreDocumentResponse)
-def store_document(
+async def store_document(
     req: StoreDocumentRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Endpoint to store a document with chunked embeddings.
@@ -42,5 +71,46 @@ def store_document(
     Returns:
         StoreDocumentResponse with document ID and chunk count
     """
-    return embedding_controller.store_document(req, db)
+    return await embedding_controller.store_document(req, db)
 
+
+
+@router.post("/store/bulk", response_model=BulkStoreResponse)
+async def store_documents_bulk(req: BulkStoreRequest):
+    """
+    Endpoint to store many documents at once.
+    
+    Args:
+        req: BulkStoreRequest containing the documents and default chunking parameters
+        
+    Returns:
+        BulkStoreResponse with document IDs, chunk count and docs/chunks per second
+    """
+    return await embedding_controller.store_documents_bulk(req)
+
+
+@router.post("/store/bulk/jsonl", response_model=BulkStoreResponse)
+async def store_documents_jsonl(
+    request: Request,
+    chunk_size: int = 500,
+    overlap: int = 50,
+    strategy: Optional[str] = None,
+    collection: str = DEFAULT_COLLECTION
+):
+    """
+    Endpoint to store documents uploaded as JSON lines ({"text": ...} per line).
+    The body is streamed through the ingestion pipeline as it arrives.
+    
+    Args:
+        request: Raw request whose body is the JSONL payload
+        chunk_size: Default maximum size of each chunk
+        overlap: Default overlap between chunks
+        strategy: Default chunking strategy
+        collection: Collection every document is stored in
+        
+    Returns:
+        BulkStoreResponse with document IDs, chunk count and docs/chunks per second
+    """
+    return await embedding_controller.store_documents_jsonl(
+        request.stream(), chunk_size, overlap, strategy, collection
+    )
@@ -0,0 +1,44 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from schemas.schemas import ReadinessResponse, DatabasePoolStats
+from services.model_registry import model_registry
+from database.database import pool_stats
+
+# Create router
+router = APIRouter(tags=["health"])
+
+
+@router.get("/health")
+def health():
+    """
+    Liveness endpoint. Returns as soon as the app can serve requests.
+    """
+    return {"status": "ok"}
+
+
+@router.get("/ready", response_model=ReadinessResponse)
+def ready():
+    """
+    Readiness endpoint. Returns 503 until every configured embedding model is loaded.
+    
+    Returns:
+        ReadinessResponse with the load state of each model
+    """
+    ready = model_registry.is_ready()
+    body = ReadinessResponse(
+        status="ready" if ready else "loading",
+        models=model_registry.status()
+    )
+    return JSONResponse(status_code=200 if ready else 503, content=body.model_dump())
+
+
+@router.get("/db/pool", response_model=DatabasePoolStats, response_model_by_alias=True)
+def database_pool_stats():
+    """
+    Endpoint to inspect the database connection pools.
+    
+    Returns:
+        DatabasePoolStats with size, checked-out, idle and overflow connections
+        of the sync and async engines
+    """
+    return DatabasePoolStats.model_validate(pool_stats())
@@ -0,0 +1,17 @@
+from fastapi import APIRouter
+from fastapi.responses import Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
+# Create router
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics", include_in_schema=False)
+def metrics():
+    """
+    Prometheus scrape endpoint.
+    
+    Returns:
+        Every registered metric in the Prometheus text exposition format
+    """
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
@@ -1,9 +1,12 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from uuid import UUID
+from datetime import datetime
+from typing import Any, List, Optional
 
 
 class EmbedRequest(BaseModel):
     text: str
+    model: Optional[str] = None  # named embedding model, defaults to the default model
 
 
 class EmbedResponse(BaseModel):
@@ -11,10 +14,31 @@ class EmbedResponse(BaseModel):
     dimensions: int
 
 
+class EmbeddingCacheStats(BaseModel):
+    hits: int
+    disk_hits: int
+    misses: int
+    evictions: int
+    size: int
+    max_entries: int
+
+
+class EmbeddingQueueStats(BaseModel):
+    pending_requests: int
+    workers: int = 0
+    max_inflight: int = 0
+    inflight_per_worker: list[int] = []
+    waiting: int = 0
+    queue_depth: int = 0
+
+
 class StoreDocumentRequest(BaseModel):
     text: str
-    chunk_size: int = 500
+    chunk_size: int = 500  # tokens (characters for the "characters" strategy)
     overlap: int = 50
+    strategy: Optional[str] = None  # recursive | sentence | paragraph | characters
+    collection: str = "default"
+    metadata: dict[str, Any] = {}  # filterable attributes, e.g. {"source": "wiki", "tags": ["faq"]}
 
 
 class StoreDocumentResponse(BaseModel):
@@ -23,10 +47,112 @@ class StoreDocumentResponse(BaseModel):
     message: str
 
 
+class BulkDocument(BaseModel):
+    text: str
+    chunk_size: Optional[int] = None
+    overlap: Optional[int] = None
+    strategy: Optional[str] = None
+    metadata: Optional[dict[str, Any]] = None
+
+
+class BulkStoreRequest(BaseModel):
+    documents: list[BulkDocument]
+    chunk_size: int = 500
+    overlap: int = 50
+    strategy: Optional[str] = None
+    collection: str = "default"
+
+
+class BulkStoreResponse(BaseModel):
+    document_ids: list[UUID]
+    documents_count: int
+    chunks_count: int
+    duration_seconds: float
+    docs_per_sec: float
+    chunks_per_sec: float
+
+
+class UpsertDocumentRequest(BaseModel):
+    text: str
+    chunk_size: int = 500
+    overlap: int = 50
+    strategy: Optional[str] = None
+    metadata: Optional[dict[str, Any]] = None  # replaces the stored metadata; omitted keeps it
+
+
+class UpsertDocumentResponse(BaseModel):
+    document_id: UUID
+    external_id: str
+    status: str  # created | updated | unchanged
+    chunks_count: int
+    chunks_added: int
+    chunks_removed: int
+    chunks_unchanged: int
+    embeddings_reused: int
+
+
 class ChatRequest(BaseModel):
     message: str
+    collection: str = "default"  # collection searched by the agent's tools
+    # Server-side conversation to continue; omit for a stateless single turn
+    session_id: Optional[str] = Field(default=None, min_length=1, max_length=128)
 
 
 class ChatResponse(BaseModel):
     response: str
+    cached: bool = False  # served from the semantic answer cache
+    session_id: Optional[str] = None
+
+
+class ChatMessage(BaseModel):
+    role: str  # "human" or "ai"
+    content: str
+
+
+class ChatSessionResponse(BaseModel):
+    session_id: str
+    summary: str  # running summary of the turns no longer kept verbatim
+    messages: List[ChatMessage]
+    history_tokens: int  # approximate tokens of the verbatim turns
+    created_at: datetime
+    updated_at: datetime
+
+
+class ChatCacheStats(BaseModel):
+    hits: int
+    misses: int
+    hit_rate: float
+    invalidations: int
+    evictions: int
+    size: int
+    max_entries: int
+
+
+
+class CollectionCreateRequest(BaseModel):
+    name: str  # lowercase letters, digits and underscores
+    quantization: str = "none"  # none | halfvec | binary
+
+
+class CollectionResponse(BaseModel):
+    name: str
+    quantization: str
+    created_at: datetime
+
+
+class PoolStats(BaseModel):
+    size: int
+    checked_out: int
+    checked_in: int
+    overflow: int
+    max_overflow: int
+
+
+class DatabasePoolStats(BaseModel):
+    sync: PoolStats
+    async_: PoolStats = Field(alias="async")
+
 
+class ReadinessResponse(BaseModel):
+    status: str
+    models: dict[str, str]
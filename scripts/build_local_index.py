@@ -0,0 +1,77 @@
+"""
+Export stored chunks and embeddings from Postgres into a local numpy index.
+
+Each collection is exported to its own directory under --path, the layout
+the local search backend reads. Rows already in the index are skipped, so
+re-running appends only new chunks.
+
+Usage:
+    python -m scripts.build_local_index --path data/local_index --dtype float16
+    python -m scripts.build_local_index --collection support
+"""
+import argparse
+import os
+import time
+from sqlalchemy import select
+from database.database import SessionLocal
+from database.models import Document, DocumentChunk, DEFAULT_COLLECTION
+from database.bootstrap import validate_collection_name
+from services.local_vector_index import LocalVectorIndex, LOCAL_INDEX_DTYPE, LOCAL_INDEX_PATH
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--path", default=LOCAL_INDEX_PATH)
+    parser.add_argument("--dtype", default=LOCAL_INDEX_DTYPE, choices=["float32", "float16"])
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--collection", default=DEFAULT_COLLECTION)
+    args = parser.parse_args()
+
+    path = os.path.join(args.path, validate_collection_name(args.collection))
+    index = LocalVectorIndex(path, dtype=args.dtype)
+    known = index.chunk_ids()
+    start = time.perf_counter()
+    added = 0
+
+    db = SessionLocal()
+    try:
+        rows = db.execute(
+            select(
+                DocumentChunk.id,
+                DocumentChunk.text,
+                DocumentChunk.chunk_index,
+                DocumentChunk.document_id,
+                DocumentChunk.metadata_,
+                DocumentChunk.embedding,
+                Document.created_at
+            )
+            .join(Document, DocumentChunk.document_id == Document.id)
+            .where(DocumentChunk.collection == args.collection)
+            .order_by(DocumentChunk.document_id, DocumentChunk.chunk_index)
+            .execution_options(yield_per=args.batch_size)
+        )
+        for batch in rows.partitions():
+            batch = [row for row in batch if str(row.id) not in known]
+            index.append(
+                [row.embedding for row in batch],
+                [
+                    {
+                        "chunk_id": str(row.id),
+                        "chunk_text": row.text,
+                        "chunk_index": row.chunk_index,
+                        "document_id": str(row.document_id),
+                        "metadata": row.metadata_,
+                        "created_at": row.created_at.isoformat() if row.created_at else None,
+                    }
+                    for row in batch
+                ]
+            )
+            added += len(batch)
+    finally:
+        db.close()
+
+    print(f"added={added} total={len(index)} duration={time.perf_counter() - start:.2f}s path={path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Bulk-ingest a JSONL corpus (one {"text": ...} object per line).
+
+With --local-index the chunks are embedded into an in-process numpy index
+instead of Postgres (for deployments without a database); each collection
+gets its own directory under that path.
+
+Usage:
+    python -m scripts.ingest corpus.jsonl --chunk-size 500 --overlap 50
+    python -m scripts.ingest corpus.jsonl --collection support
+    python -m scripts.ingest corpus.jsonl --local-index data/local_index
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+import uuid
+from datetime import datetime
+from services.ingestion_pipeline import IngestionPipeline, INGEST_BATCH_SIZE
+from services.model_registry import get_embedding_service
+from services.store_embedding_service import StoreEmbeddingService
+from services.chunking import CHUNKING_STRATEGIES, CHUNKING_STRATEGY
+from services.local_vector_index import LocalVectorIndex, LOCAL_INDEX_DTYPE
+from database.bootstrap import create_collection, validate_collection_name
+from database.models import DEFAULT_COLLECTION
+
+
+def read_jsonl(path: str):
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+async def run(args):
+    pipeline = IngestionPipeline(
+        StoreEmbeddingService(get_embedding_service(args.model)),
+        batch_size=args.batch_size
+    )
+    result = await pipeline.ingest(
+        read_jsonl(args.path), chunk_size=args.chunk_size, overlap=args.overlap, strategy=args.strategy,
+        collection=args.collection
+    )
+    print(
+        f"documents={len(result.document_ids)} chunks={result.chunks_count} "
+        f"duration={result.duration:.2f}s docs/sec={result.docs_per_sec:.1f} "
+        f"chunks/sec={result.chunks_per_sec:.1f}"
+    )
+
+
+def run_local(args):
+    store_service = StoreEmbeddingService(get_embedding_service(args.model))
+    path = os.path.join(args.local_index, validate_collection_name(args.collection))
+    index = LocalVectorIndex(path, dtype=args.dtype)
+    start = time.perf_counter()
+    documents = 0
+    pending = []
+
+    def flush():
+        embeddings = store_service.embedding_service.create_embeddings([chunk["chunk_text"] for chunk in pending])
+        index.append(embeddings, pending)
+        pending.clear()
+
+    for document in read_jsonl(args.path):
+        text = document.get("text", "")
+        if not text.strip():
+            continue
+        document_id = str(uuid.uuid4())
+        created_at = datetime.utcnow().isoformat()
+        chunks = store_service.chunk_text(text, args.chunk_size, args.overlap, args.strategy)
+        pending.extend(
+            {
+                "chunk_id": str(uuid.uuid4()),
+                "chunk_text": chunk,
+                "chunk_index": chunk_index,
+                "document_id": document_id,
+                "metadata": document.get("metadata") or {},
+                "created_at": created_at,
+            }
+            for chunk_index, chunk in enumerate(chunks)
+        )
+        documents += 1
+        if len(pending) >= args.batch_size:
+            flush()
+    if pending:
+        flush()
+
+    duration = time.perf_counter() - start
+    print(f"documents={documents} chunks={len(index)} duration={duration:.2f}s path={path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", help="JSONL file with one document per line")
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--overlap", type=int, default=50)
+    parser.add_argument("--strategy", default=CHUNKING_STRATEGY, choices=sorted(CHUNKING_STRATEGIES))
+    parser.add_argument("--batch-size", type=int, default=INGEST_BATCH_SIZE, help="Chunks embedded per batch")
+    parser.add_argument("--collection", default=DEFAULT_COLLECTION, help="Collection to ingest into (created if missing)")
+    parser.add_argument("--model", default=None, help="Named embedding model (defaults to the default model)")
+    parser.add_argument("--local-index", default=None, help="Write to a local numpy index at this path instead of Postgres")
+    parser.add_argument("--dtype", default=LOCAL_INDEX_DTYPE, choices=["float32", "float16"], help="Local index element type")
+    args = parser.parse_args()
+    if args.local_index:
+        run_local(args)
+    else:
+        create_collection(name=args.collection)  # no-op if it already exists
+        asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+import os
+import re
+from collections import deque
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Pattern, Tuple
+
+# Default chunking strategy for stored documents
+CHUNKING_STRATEGY = os.getenv("CHUNKING_STRATEGY", "recursive")
+
+# Tokens the embedding model adds around each input (BOS/EOS or CLS/SEP)
+RESERVED_TOKENS = 2
+
+# Boundaries, each found in a single left-to-right regex pass
+PARAGRAPH_BREAK = re.compile(r"\n[ \t]*\n\s*")
+SENTENCE_BREAK = re.compile(r"(?<=[.!?])\s+|(?<=[。！？])\s*|\n+")
+WORD_BREAK = re.compile(r"\s+")
+
+
+def approx_token_count(text: str) -> int:
+    """
+    Rough token estimate (about four characters per token) for when no tokenizer is available.
+
+    Args:
+        text: Text to measure
+
+    Returns:
+        Estimated number of tokens
+    """
+    return max(1, (len(text) + 3) // 4)
+
+
+def split_on(text: str, pattern: Pattern) -> Iterator[str]:
+    """
+    Lazily split text at pattern matches, keeping each separator on the preceding piece.
+
+    Joining the pieces reproduces the original text exactly.
+
+    Args:
+        text: Text to split
+        pattern: Compiled boundary pattern
+
+    Yields:
+        Non-blank pieces in order
+    """
+    start = 0
+    for match in pattern.finditer(text):
+        end = match.end()
+        if end > start:
+            piece = text[start:end]
+            if piece.strip():
+                yield piece
+            start = end
+    if start < len(text) and text[start:].strip():
+        yield text[start:]
+
+
+class Chunker:
+    """
+    Token-budgeted text chunker.
+
+    Text is cut into segments at natural boundaries, each segment is
+    tokenized once, and segments are packed greedily into chunks of at most
+    ``max_tokens`` tokens with ``overlap_tokens`` of trailing context carried
+    into the next chunk. Chunks are yielded lazily, so arbitrarily large
+    inputs never need to be materialized as a list.
+    """
+
+    def __init__(
+        self,
+        count_tokens: Callable[[str], int] = approx_token_count,
+        max_tokens: int = 510,
+        overlap_tokens: int = 0,
+        strategy: str = CHUNKING_STRATEGY
+    ):
+        """
+        Initialize the chunker.
+
+        Args:
+            count_tokens: Function returning the number of model tokens in a text
+            max_tokens: Token budget per chunk
+            overlap_tokens: Tokens of trailing context repeated at the start of the next chunk
+            strategy: Name of a registered chunking strategy
+        """
+        if strategy not in CHUNKING_STRATEGIES:
+            raise ValueError(f"Unknown chunking strategy: {strategy}")
+        self.count_tokens = count_tokens
+        self.max_tokens = max(1, max_tokens)
+        self.overlap_tokens = max(0, min(overlap_tokens, self.max_tokens // 2))
+        self.strategy = strategy
+
+    def iter_chunks(self, text: str) -> Iterator[str]:
+        """
+        Lazily chunk text with the configured strategy.
+
+        Args:
+            text: Text to chunk
+
+        Yields:
+            Stripped, non-empty chunks in document order
+        """
+        for chunk in CHUNKING_STRATEGIES[self.strategy](self, text):
+            chunk = chunk.strip()
+            if chunk:
+                yield chunk
+
+    def segments(self, text: str, levels: List[Pattern]) -> Iterator[Tuple[str, int]]:
+        """
+        Split text at the first boundary level, descending to finer levels
+        only for pieces that exceed the token budget.
+
+        Yields:
+            (piece, token count) pairs, each within the budget
+        """
+        for piece in split_on(text, levels[0]):
+            tokens = self.count_tokens(piece)
+            if tokens <= self.max_tokens:
+                yield piece, tokens
+            elif len(levels) > 1:
+                yield from self.segments(piece, levels[1:])
+            else:
+                yield from self._hard_split(piece, tokens)
+
+    def _hard_split(self, piece: str, tokens: int) -> Iterator[Tuple[str, int]]:
+        """
+        Split a boundary-free piece into windows sized from its characters-per-token ratio.
+
+        Tokens are not spread evenly over the characters, so a window still
+        over the budget is split again with its own ratio. Counts are the
+        windows' real token counts; only a single character can exceed the budget.
+        """
+        window = max(1, int(len(piece) * self.max_tokens / tokens * 0.9))
+        for start in range(0, len(piece), window):
+            part = piece[start:start + window]
+            part_tokens = self.count_tokens(part)
+            if part_tokens > self.max_tokens and len(part) > 1:
+                yield from self._hard_split(part, part_tokens)
+            else:
+                yield part, part_tokens
+
+    def pack(self, segments: Iterable[Tuple[str, int]]) -> Iterator[str]:
+        """
+        Greedily pack segments into chunks within the token budget.
+
+        Yields:
+            Chunk texts (unstripped)
+        """
+        window = deque()
+        total = 0
+        for piece, tokens in segments:
+            if window and total + tokens > self.max_tokens:
+                yield "".join(part for part, _ in window)
+                # Keep the tail of the chunk as overlap, as long as the new piece still fits
+                while window and (total > self.overlap_tokens or total + tokens > self.max_tokens):
+                    total -= window.popleft()[1]
+            window.append((piece, tokens))
+            total += tokens
+        if window:
+            yield "".join(part for part, _ in window)
+
+
+def sentence_strategy(chunker: Chunker, text: str) -> Iterator[str]:
+    """Pack sentences into chunks, ignoring paragraph structure."""
+    return chunker.pack(chunker.segments(text, [SENTENCE_BREAK, WORD_BREAK]))
+
+
+def paragraph_strategy(chunker: Chunker, text: str) -> Iterator[str]:
+    """One chunk per paragraph; paragraphs over budget are split at sentence boundaries."""
+    for paragraph in split_on(text, PARAGRAPH_BREAK):
+        yield from chunker.pack(chunker.segments(paragraph, [SENTENCE_BREAK, WORD_BREAK]))
+
+
+def recursive_strategy(chunker: Chunker, text: str) -> Iterator[str]:
+    """Pack whole paragraphs, falling back to sentences and then words for oversized pieces."""
+    return chunker.pack(chunker.segments(text, [PARAGRAPH_BREAK, SENTENCE_BREAK, WORD_BREAK]))
+
+
+def character_strategy(chunker: Chunker, text: str) -> Iterator[str]:
+    """
+    Legacy fixed-width character windows with a sentence-boundary nudge.
+
+    Here max_tokens and overlap_tokens are interpreted as characters.
+    """
+    chunk_size = chunker.max_tokens
+    overlap = chunker.overlap_tokens
+    if len(text) <= chunk_size:
+        yield text
+        return
+
+    start = 0
+    while start < len(text):
+        end = start + chunk_size
+        chunk = text[start:end]
+
+        # Try to break at sentence boundary if possible
+        if end < len(text):
+            # Look for sentence endings near the end
+            for punct in ['. ', '.\n', '! ', '!\n', '? ', '?\n']:
+                last_punct = chunk.rfind(punct)
+                if last_punct > chunk_size * 0.7:  # If found in last 30% of chunk
+                    chunk = chunk[:last_punct + 1]
+                    end = start + len(chunk)
+                    break
+
+        yield chunk
+        if end >= len(text):
+            break
+        start = end - overlap  # Overlap for context
+
+
+CHUNKING_STRATEGIES: Dict[str, Callable[[Chunker, str], Iterator[str]]] = {
+    "sentence": sentence_strategy,
+    "paragraph": paragraph_strategy,
+    "recursive": recursive_strategy,
+    "characters": character_strategy,
+}
+
+
+def register_strategy(name: str, strategy: Callable[[Chunker, str], Iterator[str]]):
+    """
+    Register a custom chunking strategy.
+
+    Args:
+        name: Strategy name used in requests
+        strategy: Function taking (chunker, text) and yielding chunk texts
+    """
+    CHUNKING_STRATEGIES[name] = strategy
+
+
+def resolve_strategy(name: Optional[str]) -> str:
+    """
+    Validate a requested strategy name, falling back to the configured default.
+
+    Args:
+        name: Requested strategy or None
+
+    Returns:
+        A registered strategy name
+
+    Raises:
+        ValueError: If the strategy is not registered
+    """
+    name = name or CHUNKING_STRATEGY
+    if name not in CHUNKING_STRATEGIES:
+        raise ValueError(f"Unknown chunking strategy: {name}")
+    return name
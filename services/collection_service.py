@@ -0,0 +1,97 @@
+import asyncio
+from typing import Dict, List, Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from database.bootstrap import create_collection, drop_collection, VECTOR_INDEX_TYPE
+from database.database import engine, AsyncSessionLocal
+from database.models import Collection, VECTOR_QUANTIZATION, DEFAULT_COLLECTION
+from services.response_cache import chat_response_cache
+
+
+class CollectionService:
+    """
+    Create, list and drop collections.
+
+    Creating and dropping run DDL (partition and ANN index) on the sync
+    engine in a worker thread. The quantization of each collection is cached
+    because every search needs it to pick the first-pass index.
+    """
+
+    def __init__(self):
+        """Initialize the collection service."""
+        self._quantizations: Dict[str, str] = {}
+
+    async def acreate(
+        self,
+        name: str,
+        quantization: str = VECTOR_QUANTIZATION,
+        index_type: str = VECTOR_INDEX_TYPE
+    ) -> bool:
+        """
+        Create a collection with its partition and ANN index.
+
+        Args:
+            name: Collection name (lowercase letters, digits and underscores)
+            quantization: Quantization of the collection's ANN index
+            index_type: "hnsw", "ivfflat" or "none"
+
+        Returns:
+            True if the collection was created, False if it already existed
+
+        Raises:
+            ValueError: If the name or quantization is invalid
+        """
+        return await asyncio.to_thread(create_collection, engine, name, quantization, index_type)
+
+    async def adrop(self, name: str) -> bool:
+        """
+        Drop a collection with all its documents and chunks.
+
+        Args:
+            name: Collection name
+
+        Returns:
+            True if the collection existed
+
+        Raises:
+            ValueError: If the name is the default collection
+        """
+        if name == DEFAULT_COLLECTION:
+            raise ValueError("The default collection cannot be dropped")
+        self._quantizations.pop(name, None)
+        chat_response_cache.invalidate_collection(name)
+        return await asyncio.to_thread(drop_collection, engine, name)
+
+    async def aget(self, db: AsyncSession, name: str) -> Optional[Collection]:
+        """Get a collection by name, or None."""
+        collection = await db.get(Collection, name)
+        if collection is not None:
+            self._quantizations[name] = collection.quantization
+        return collection
+
+    async def alist(self, db: AsyncSession) -> List[Collection]:
+        """List all collections by name."""
+        return list((await db.execute(select(Collection).order_by(Collection.name))).scalars())
+
+    async def aquantization(self, name: str, db: Optional[AsyncSession] = None) -> Optional[str]:
+        """
+        Quantization of a collection's ANN index, also used as an existence check.
+
+        Args:
+            name: Collection name
+            db: Async database session; a short-lived one is opened on a cache miss if omitted
+
+        Returns:
+            The quantization mode, or None if the collection does not exist
+        """
+        if name not in self._quantizations:
+            if db is None:
+                async with AsyncSessionLocal() as session:
+                    await self.aget(session, name)
+            else:
+                await self.aget(db, name)
+        return self._quantizations.get(name)
+
+
+# Shared by the HTTP controllers and the agent tool
+collection_service = CollectionService()
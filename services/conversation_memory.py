@@ -0,0 +1,181 @@
+import asyncio
+import os
+import weakref
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import AsyncIterator, List, Optional
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+from langchain_core.messages.utils import count_tokens_approximately
+from agent.llm import get_llm
+from agent.metrics_callback import AgentMetricsCallback
+from services.session_store import SessionState, SessionStore, create_session_store
+from utils.logger import logger
+from utils.metrics import stage_timer
+
+# Token budget of the verbatim history sent with each turn; beyond it the
+# oldest turns are folded into the session summary
+CHAT_HISTORY_MAX_TOKENS = int(os.getenv("CHAT_HISTORY_MAX_TOKENS", "2000"))
+# Newest turns kept verbatim after summarizing, so the summary is not rebuilt on every turn
+CHAT_HISTORY_KEEP_TOKENS = int(os.getenv("CHAT_HISTORY_KEEP_TOKENS", str(CHAT_HISTORY_MAX_TOKENS // 2)))
+CHAT_SUMMARY_MAX_TOKENS = int(os.getenv("CHAT_SUMMARY_MAX_TOKENS", "400"))
+
+SUMMARY_PROMPT = """You maintain a running summary of a conversation between a user and an assistant.
+
+Current summary:
+{summary}
+
+New turns to fold in:
+{transcript}
+
+Write the updated summary in at most {max_tokens} tokens. Keep facts, names, numbers, decisions and open questions \
+the user may refer back to; drop greetings and repetition. Reply with the summary only."""
+
+
+class ConversationMemory:
+    """
+    Bounded server-side history for chat sessions.
+
+    A session keeps its recent turns verbatim (the user question and the
+    final answer; tool calls and results are not kept) plus an LLM-written
+    summary of everything older. When the verbatim turns exceed
+    ``max_tokens``, the oldest are folded into the summary until at most
+    ``keep_tokens`` remain, so each turn sends the LLM a bounded context.
+    """
+
+    def __init__(
+        self,
+        store: Optional[SessionStore] = None,
+        max_tokens: int = CHAT_HISTORY_MAX_TOKENS,
+        keep_tokens: int = CHAT_HISTORY_KEEP_TOKENS,
+        summary_max_tokens: int = CHAT_SUMMARY_MAX_TOKENS
+    ):
+        """
+        Initialize the memory.
+
+        Args:
+            store: Session store; the configured one is created on first use if omitted
+            max_tokens: Verbatim history budget that triggers summarization
+            keep_tokens: Verbatim history left after summarizing
+            summary_max_tokens: Length limit of the summary
+        """
+        self._store = store
+        self.max_tokens = max_tokens
+        self.keep_tokens = min(keep_tokens, max_tokens)
+        self.summary_max_tokens = summary_max_tokens
+        self._llm = None
+        # One lock per active session; entries vanish once no turn holds them
+        self._locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+    @property
+    def store(self) -> SessionStore:
+        if self._store is None:
+            self._store = create_session_store()
+        return self._store
+
+    @asynccontextmanager
+    async def turn(self, session_id: Optional[str]) -> AsyncIterator[Optional[SessionState]]:
+        """
+        Load a session for one chat turn.
+
+        Turns of the same session are serialized within this process, so two
+        concurrent requests cannot both extend the same history. A stateless
+        request (no session ID) yields None.
+
+        Args:
+            session_id: Caller-supplied session ID, or None
+
+        Yields:
+            The session state (new and empty for an unknown ID), or None
+        """
+        if session_id is None:
+            yield None
+            return
+        lock = self._locks.get(session_id)
+        if lock is None:
+            lock = self._locks[session_id] = asyncio.Lock()
+        async with lock:
+            yield await self.store.aload(session_id) or SessionState(session_id=session_id)
+
+    @staticmethod
+    def context_messages(session: Optional[SessionState], message: str) -> List[BaseMessage]:
+        """
+        Messages sent to the agent for a turn: recent turns, then the new message.
+
+        The summary is prefixed to the first user message rather than sent as
+        a second system message, which many local chat templates reject when
+        it does not come first.
+
+        Args:
+            session: Session state, or None for a stateless request
+            message: The user's new message
+
+        Returns:
+            List of messages
+        """
+        messages: List[BaseMessage] = list(session.messages) if session is not None else []
+        messages.append(HumanMessage(content=message))
+        if session is not None and session.summary:
+            first = next(index for index, item in enumerate(messages) if isinstance(item, HumanMessage))
+            messages[first] = HumanMessage(
+                content=f"Summary of the conversation so far:\n{session.summary}\n\n{messages[first].content}"
+            )
+        return messages
+
+    async def arecord_turn(self, session: SessionState, message: str, answer: str):
+        """
+        Append a finished turn, summarize older turns if over budget, and save the session.
+
+        Args:
+            session: Session state loaded by turn()
+            message: The user's message
+            answer: The agent's final answer
+        """
+        session.messages.extend([HumanMessage(content=message), AIMessage(content=answer)])
+        if count_tokens_approximately(session.messages) > self.max_tokens:
+            split = self._split(session.messages)
+            older, session.messages = session.messages[:split], session.messages[split:]
+            session.summary = await self._asummarize(session.summary, older)
+            logger.info(
+                f"[CHAT MEMORY] session {session.session_id}: folded {len(older)} messages into the summary, "
+                f"{len(session.messages)} kept"
+            )
+        session.updated_at = datetime.utcnow()
+        await self.store.asave(session)
+
+    async def adelete(self, session_id: str) -> bool:
+        """Delete a session; returns True if it existed."""
+        return await self.store.adelete(session_id)
+
+    async def aload(self, session_id: str) -> Optional[SessionState]:
+        """Load a session without taking its turn lock, or None if unknown."""
+        return await self.store.aload(session_id)
+
+    def _split(self, messages: List[BaseMessage]) -> int:
+        """Index of the first message kept: the newest whole turns within keep_tokens, at least the last turn."""
+        starts = [index for index, message in enumerate(messages) if isinstance(message, HumanMessage)]
+        split = starts[-1] if starts else len(messages)
+        for start in reversed(starts[:-1]):
+            if count_tokens_approximately(messages[start:]) > self.keep_tokens:
+                break
+            split = start
+        return split
+
+    async def _asummarize(self, summary: str, messages: List[BaseMessage]) -> str:
+        """Fold messages into the running summary with one LLM call."""
+        if self._llm is None:
+            self._llm = get_llm().bind(max_tokens=self.summary_max_tokens)
+        transcript = "\n".join(
+            f"{'User' if isinstance(message, HumanMessage) else 'Assistant'}: {message.content}"
+            for message in messages
+        )
+        prompt = SUMMARY_PROMPT.format(
+            summary=summary or "(none)", transcript=transcript, max_tokens=self.summary_max_tokens
+        )
+        with stage_timer("chat", "summarize", messages=len(messages)):
+            response = await self._llm.ainvoke(
+                [HumanMessage(content=prompt)], config={"callbacks": [AgentMetricsCallback()]}
+            )
+        return str(response.content).strip()
+
+
+conversation_memory = ConversationMemory()
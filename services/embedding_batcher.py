@@ -0,0 +1,155 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, List, Tuple
+from utils.logger import logger
+
+
+class EmbeddingQueueFull(RuntimeError):
+    """Raised when too many embedding requests are already waiting."""
+
+
+class EmbeddingBatcher:
+    """
+    Background micro-batcher for embedding requests.
+
+    Concurrent callers submit lists of texts; a worker thread collects
+    pending requests for up to ``max_wait_ms`` (or until ``max_batch_size``
+    texts are queued), runs them through ``embed_fn`` as one batch, and hands
+    each caller back its own embeddings in the order it submitted them. If a
+    batch fails, its requests are retried one by one, so only the requests
+    that fail on their own see the error.
+    Use more than one worker thread only when ``embed_fn`` is safe to call
+    concurrently (e.g. it dispatches to a process pool).
+    """
+
+    def __init__(
+        self,
+        embed_fn: Callable[[List[str]], List[List[float]]],
+        max_batch_size: int = 32,
+        max_wait_ms: float = 5.0,
+        max_pending: int = 0,
+        concurrency: int = 1
+    ):
+        """
+        Initialize the batcher.
+
+        Args:
+            embed_fn: Function embedding a list of texts in a single model call
+            max_batch_size: Maximum number of texts sent to embed_fn at once
+            max_wait_ms: How long to wait for more requests before flushing a batch
+            max_pending: Maximum queued requests before submit() rejects (0 = unbounded)
+            concurrency: Number of worker threads forming and running batches
+        """
+        self.embed_fn = embed_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self._queue: "queue.Queue[Tuple[List[str], Future]]" = queue.Queue(maxsize=max(0, max_pending))
+        self.concurrency = max(1, concurrency)
+        self._workers = []
+        self._lock = threading.Lock()
+
+    def submit(self, texts: List[str]) -> Future:
+        """
+        Queue texts for embedding.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            Future resolving to the list of embeddings, in the same order as texts
+
+        Raises:
+            EmbeddingQueueFull: If max_pending requests are already queued
+        """
+        future = Future()
+        if not texts:
+            future.set_result([])
+            return future
+
+        self._ensure_worker()
+        try:
+            # Never block the caller; it may be running on the event loop
+            self._queue.put_nowait((list(texts), future))
+        except queue.Full:
+            raise EmbeddingQueueFull(f"Embedding queue is full ({self._queue.maxsize} pending requests)")
+        return future
+
+    @property
+    def pending(self) -> int:
+        """Requests queued but not yet picked up by a worker thread."""
+        return self._queue.qsize()
+
+    def _ensure_worker(self):
+        """Start the worker threads on first use."""
+        if self._workers:
+            return
+        with self._lock:
+            if not self._workers:
+                for i in range(self.concurrency):
+                    worker = threading.Thread(
+                        target=self._run,
+                        name=f"embedding-batcher-{i}",
+                        daemon=True
+                    )
+                    worker.start()
+                    self._workers.append(worker)
+
+    def _collect(self) -> List[Tuple[List[str], Future]]:
+        """Block for the first request, then gather more until the batch is full or the wait expires."""
+        pending = [self._queue.get()]
+        total = len(pending[0][0])
+        deadline = time.monotonic() + self.max_wait
+
+        while total < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            pending.append(item)
+            total += len(item[0])
+
+        return pending
+
+    def _run(self):
+        while True:
+            pending = self._collect()
+            texts = [text for item_texts, _ in pending for text in item_texts]
+
+            try:
+                embeddings = self._embed(texts)
+            except Exception as e:
+                if len(pending) == 1:
+                    logger.error(f"[EMBED] batch of {len(texts)} failed: {str(e)}")
+                    pending[0][1].set_exception(e)
+                else:
+                    # One bad request must not fail the requests it was batched with
+                    logger.warning(
+                        f"[EMBED] batch of {len(texts)} failed, retrying its {len(pending)} requests one by one: {str(e)}"
+                    )
+                    self._run_separately(pending)
+                continue
+
+            # Hand each caller back its own slice of the batch
+            offset = 0
+            for item_texts, future in pending:
+                future.set_result(embeddings[offset:offset + len(item_texts)])
+                offset += len(item_texts)
+
+    def _run_separately(self, pending: List[Tuple[List[str], Future]]):
+        """Embed each request of a failed batch on its own, failing only the requests that fail again."""
+        for item_texts, future in pending:
+            try:
+                future.set_result(self._embed(item_texts))
+            except Exception as e:
+                logger.error(f"[EMBED] request of {len(item_texts)} texts failed: {str(e)}")
+                future.set_exception(e)
+
+    def _embed(self, texts: List[str]) -> List[List[float]]:
+        """Run texts through embed_fn in slices of at most max_batch_size."""
+        embeddings = []
+        for start in range(0, len(texts), self.max_batch_size):
+            embeddings.extend(self.embed_fn(texts[start:start + self.max_batch_size]))
+        return embeddings
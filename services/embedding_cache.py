@@ -0,0 +1,156 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import unicodedata
+from array import array
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Cache settings (size 0 disables the in-memory tier, empty path disables the disk tier)
+EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "10000"))
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", "")
+
+
+class EmbeddingCache:
+    """
+    Content-hashed embedding cache.
+
+    Entries are keyed by a hash of (model id, normalized text). A bounded
+    in-memory LRU tier sits in front of an optional SQLite tier; disk hits
+    are promoted back into memory. The memory tier holds tuples and lookups
+    return fresh lists, so a caller mutating its embedding cannot corrupt the
+    entry other requests are served.
+    """
+
+    def __init__(self, max_entries: int = EMBEDDING_CACHE_SIZE, path: Optional[str] = EMBEDDING_CACHE_PATH):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum entries kept in memory (0 disables the memory tier)
+            path: SQLite file for the persistent tier (None/empty disables it)
+        """
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, ...]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._db = None
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, embedding BLOB NOT NULL)")
+            self._db.commit()
+
+    @property
+    def persistent(self) -> bool:
+        """Whether lookups may hit the SQLite tier, so async callers should make them off the event loop."""
+        return self._db is not None
+
+    @staticmethod
+    def make_key(model_id: str, text: str) -> str:
+        """
+        Build the cache key for a text embedded with a given model.
+
+        Text is NFC-normalized and its whitespace collapsed, so trivially
+        different copies of the same content share an entry.
+
+        Args:
+            model_id: Identifier of the embedding model
+            text: Text being embedded
+
+        Returns:
+            Hex SHA-256 digest
+        """
+        normalized = " ".join(unicodedata.normalize("NFC", text).split())
+        return hashlib.sha256(f"{model_id}\0{normalized}".encode("utf-8")).hexdigest()
+
+    def get_many(self, keys: List[str]) -> Dict[str, List[float]]:
+        """
+        Look up several keys.
+
+        Args:
+            keys: Cache keys
+
+        Returns:
+            Mapping of the keys that were found to copies of their embeddings
+        """
+        found = {}
+        with self._lock:
+            for key in keys:
+                if key in found:
+                    continue
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    found[key] = list(self._entries[key])
+                    self.hits += 1
+
+            missing = [key for key in dict.fromkeys(keys) if key not in found]
+            if missing and self._db is not None:
+                rows = []
+                # Stay below SQLite's bound-parameter limit
+                for start in range(0, len(missing), 500):
+                    batch = missing[start:start + 500]
+                    placeholders = ",".join("?" * len(batch))
+                    rows.extend(self._db.execute(
+                        f"SELECT key, embedding FROM embeddings WHERE key IN ({placeholders})", batch
+                    ).fetchall())
+                for key, blob in rows:
+                    embedding = array("f", blob).tolist()
+                    found[key] = embedding
+                    self._remember(key, tuple(embedding))
+                    self.disk_hits += 1
+
+            self.misses += sum(1 for key in missing if key not in found)
+        return found
+
+    def put_many(self, items: Dict[str, Sequence[float]]):
+        """
+        Store embeddings in both tiers.
+
+        The memory tier keeps its own copy, so the caller may go on using
+        (and modifying) the embeddings it passed in.
+
+        Args:
+            items: Mapping of cache key to embedding
+        """
+        if not items:
+            return
+        with self._lock:
+            for key, embedding in items.items():
+                self._remember(key, tuple(embedding))
+            if self._db is not None:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO embeddings (key, embedding) VALUES (?, ?)",
+                    [(key, array("f", embedding).tobytes()) for key, embedding in items.items()]
+                )
+                self._db.commit()
+
+    def _remember(self, key: str, embedding: Tuple[float, ...]):
+        """Insert into the memory tier, evicting the least recently used entries. Caller holds the lock."""
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = embedding
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss/eviction counters and current size."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+            }
+
+
+embedding_cache = EmbeddingCache()
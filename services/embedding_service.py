@@ -1,38 +1,254 @@
 from llama_cpp import Llama
+import asyncio
 import os
+import threading
+import time
+from typing import List
+from services.embedding_batcher import EmbeddingBatcher
+from services.embedding_cache import EmbeddingCache, embedding_cache
+from services.embedding_workers import EmbeddingWorkerPool, EMBEDDING_WORKERS, EMBEDDING_THREADS_PER_WORKER, load_model
+from utils.metrics import EMBEDDING_BATCH_SECONDS, EMBEDDING_BATCH_TEXTS, batch_size_label
 
 MODEL_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "models", "granite-embedding-278m-multilingual-Q8_0.gguf")  # local model path
 
+# Micro-batching settings for concurrent embedding requests
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "32"))
+EMBEDDING_BATCH_WAIT_MS = float(os.getenv("EMBEDDING_BATCH_WAIT_MS", "5"))
+EMBEDDING_MAX_PENDING = int(os.getenv("EMBEDDING_MAX_PENDING", "1024"))
+
+
+def model_fingerprint(model_path: str) -> str:
+    """
+    Identify a model file for cache keys: its resolved path plus its size.
+
+    Args:
+        model_path: Path to the GGUF model file
+
+    Returns:
+        Fingerprint string (the path alone if the file does not exist yet)
+    """
+    path = os.path.realpath(model_path)
+    try:
+        return f"{path}:{os.path.getsize(path)}"
+    except OSError:
+        return path
+
 
 class EmbeddingService:
-    def __init__(self, model_path: str = MODEL_PATH,  
-                 n_ctx: int = 512, n_threads: int = 8):
+    # Subclasses serving a reranker load the model with rank pooling (see load_model)
+    rerank = False
+
+    def __init__(self, model_path: str = MODEL_PATH,
+                 n_ctx: int = 512, n_threads: int = 8,
+                 max_batch_size: int = EMBEDDING_BATCH_SIZE,
+                 max_wait_ms: float = EMBEDDING_BATCH_WAIT_MS,
+                 max_pending: int = EMBEDDING_MAX_PENDING,
+                 cache: EmbeddingCache = embedding_cache,
+                 workers: int = EMBEDDING_WORKERS,
+                 threads_per_worker: int = EMBEDDING_THREADS_PER_WORKER):
         """
         Initialize the embedding service with a GGUF model.
-        
+
+        The model itself is loaded lazily on first use or by calling load().
+
         Args:
             model_path: Path to the GGUF model file
             n_ctx: Context window size
             n_threads: Number of threads for processing
+            max_batch_size: Maximum number of texts embedded in one llama.cpp call
+            max_wait_ms: How long concurrent requests are collected before a batch runs
+            max_pending: Maximum queued requests before new ones are rejected
+            cache: Embedding cache consulted before running inference (None disables it)
+            workers: Worker processes for inference (0 runs inference in this process)
+            threads_per_worker: llama.cpp threads in each worker process
         """
-        self.llm = Llama(
-            model_path=model_path,
-            embedding=True,
-            n_ctx=n_ctx,
-            n_threads=n_threads,
-            verbose=False
+        self.model_path = model_path
+        self.model_id = os.path.basename(model_path)  # metric label
+        # Cache entries are tied to the model weights, not the registry name
+        # or the file name, which two different models may share
+        self.cache_namespace = model_fingerprint(model_path)
+        self.cache = cache
+        self.n_ctx = n_ctx
+        self.n_threads = n_threads
+        self.workers = workers
+        self.threads_per_worker = threads_per_worker
+        self.worker_pool = None
+        self._llm = None
+        self._load_lock = threading.Lock()
+        # A single llama.cpp context is not safe for concurrent calls, so only
+        # a worker pool gets one batching thread per worker
+        self.batcher = EmbeddingBatcher(
+            self._embed_batch,
+            max_batch_size=max_batch_size,
+            max_wait_ms=max_wait_ms,
+            max_pending=max_pending,
+            concurrency=max(1, workers)
         )
-    
+
+    @property
+    def llm(self) -> Llama:
+        """The underlying llama.cpp model, loaded on first access."""
+        return self._llm if self._llm is not None else self.load()
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._llm is not None
+
+    def load(self) -> Llama:
+        """
+        Load the GGUF model if it has not been loaded yet.
+
+        With a worker pool, the workers load the full model and this process
+        only loads the vocabulary for tokenization.
+
+        Returns:
+            The loaded Llama instance
+        """
+        with self._load_lock:
+            if self._llm is None:
+                if self.workers > 0:
+                    pool = EmbeddingWorkerPool(
+                        self.model_path,
+                        n_ctx=self.n_ctx,
+                        workers=self.workers,
+                        threads_per_worker=self.threads_per_worker,
+                        rerank=self.rerank
+                    )
+                    pool.warm_up()
+                    self.worker_pool = pool
+                    self._llm = Llama(model_path=self.model_path, vocab_only=True, verbose=False)
+                else:
+                    self._llm = load_model(self.model_path, self.n_ctx, self.n_threads, rerank=self.rerank)
+        return self._llm
+
+    def shutdown(self):
+        """Stop the worker processes, if any."""
+        if self.worker_pool is not None:
+            self.worker_pool.shutdown()
+
+    def queue_stats(self) -> dict:
+        """Queue depth of the batcher and, if present, the worker pool."""
+        stats = {"pending_requests": self.batcher.pending}
+        if self.worker_pool is not None:
+            stats.update(self.worker_pool.stats())
+        return stats
+
+    def count_tokens(self, text: str) -> int:
+        """
+        Count the model tokens in a text, excluding special tokens.
+
+        Args:
+            text: Input text
+
+        Returns:
+            Number of tokens
+        """
+        return len(self.llm.tokenize(text.encode("utf-8"), add_bos=False))
+
     def create_embedding(self, text: str) -> list[float]:
         """
         Create an embedding for the given text.
-        
+
+        Args:
+            text: Input text to embed
+
+        Returns:
+            List of float values representing the embedding
+        """
+        return self.create_embeddings([text])[0]
+
+    def create_embeddings(self, texts: List[str]) -> List[list[float]]:
+        """
+        Create embeddings for several texts.
+
+        Cached embeddings are returned directly; the remaining texts are
+        queued on the micro-batcher, so they may share a llama.cpp batch with
+        other concurrent requests.
+
+        Args:
+            texts: Input texts to embed
+
+        Returns:
+            List of embeddings in the same order as texts
+        """
+        keys, cached, missing = self._lookup(texts)
+        if missing:
+            cached.update(self._remember(missing, self.batcher.submit(list(missing.values())).result()))
+        return [cached[key] for key in keys]
+
+    async def acreate_embedding(self, text: str) -> list[float]:
+        """
+        Async variant of create_embedding.
+
         Args:
             text: Input text to embed
-            
+
         Returns:
             List of float values representing the embedding
         """
-        result = self.llm.create_embedding(text)
-        return result["data"][0]["embedding"]
+        return (await self.acreate_embeddings([text]))[0]
+
+    async def acreate_embeddings(self, texts: List[str]) -> List[list[float]]:
+        """
+        Async variant of create_embeddings.
+
+        Inference runs on the batcher's dedicated worker thread, so awaiting
+        this never blocks the event loop.
+
+        Args:
+            texts: Input texts to embed
+
+        Returns:
+            List of embeddings in the same order as texts
+        """
+        # The disk tier runs SQLite queries under the cache lock, so keep it off the event loop
+        offload = self.cache is not None and self.cache.persistent
+        if offload:
+            keys, cached, missing = await asyncio.to_thread(self._lookup, texts)
+        else:
+            keys, cached, missing = self._lookup(texts)
+        if missing:
+            embeddings = await asyncio.wrap_future(self.batcher.submit(list(missing.values())))
+            if offload:
+                cached.update(await asyncio.to_thread(self._remember, missing, embeddings))
+            else:
+                cached.update(self._remember(missing, embeddings))
+        return [cached[key] for key in keys]
+
+    def _lookup(self, texts: List[str]):
+        """
+        Split texts into cache hits and the unique texts that still need inference.
+
+        Returns:
+            Tuple of (cache key per text, cached embeddings by key, missing texts by key)
+        """
+        if self.cache is None:
+            keys = [str(i) for i in range(len(texts))]
+            return keys, {}, dict(zip(keys, texts))
+
+        keys = [self.cache.make_key(self.cache_namespace, text) for text in texts]
+        cached = self.cache.get_many(keys)
+        missing = {key: text for key, text in zip(keys, texts) if key not in cached}
+        return keys, cached, missing
+
+    def _remember(self, missing: dict, embeddings: List[list[float]]) -> dict:
+        """Store freshly computed embeddings in the cache and return them by key."""
+        computed = dict(zip(missing.keys(), embeddings))
+        if self.cache is not None:
+            self.cache.put_many(computed)
+        return computed
 
+    def _embed_batch(self, texts: List[str]) -> List[list[float]]:
+        """Embed a batch in one llama.cpp call, or spread it over the worker pool."""
+        llm = self.llm  # loads the model (and starts the pool) on first use
+        start = time.perf_counter()
+        if self.worker_pool is not None:
+            embeddings = self.worker_pool.embed(texts)
+        else:
+            result = llm.create_embedding(texts)
+            data = sorted(result["data"], key=lambda item: item["index"])
+            embeddings = [item["embedding"] for item in data]
+        # Model load time stays out of the histogram: the timer starts after self.llm
+        EMBEDDING_BATCH_SECONDS.labels(self.model_id, batch_size_label(len(texts))).observe(time.perf_counter() - start)
+        EMBEDDING_BATCH_TEXTS.labels(self.model_id).observe(len(texts))
+        return embeddings
@@ -0,0 +1,242 @@
+import math
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Dict, List
+
+# Worker pool settings (EMBEDDING_WORKERS=0 keeps inference in-process)
+EMBEDDING_WORKERS = int(os.getenv("EMBEDDING_WORKERS", "0"))
+EMBEDDING_THREADS_PER_WORKER = int(os.getenv("EMBEDDING_THREADS_PER_WORKER", "4"))
+# Sub-batches allowed in flight across all workers (0 = two per worker)
+EMBEDDING_WORKER_MAX_INFLIGHT = int(os.getenv("EMBEDDING_WORKER_MAX_INFLIGHT", "0"))
+# Smallest sub-batch worth sending to its own worker
+EMBEDDING_WORKER_MIN_BATCH = int(os.getenv("EMBEDDING_WORKER_MIN_BATCH", "8"))
+
+# Model owned by this worker process (set by the pool initializer)
+_worker_llm = None
+
+
+def load_model(model_path: str, n_ctx: int, n_threads: int, rerank: bool = False, **options):
+    """
+    Load a GGUF model for embedding, or for scoring query/document pairs.
+
+    A reranker (cross-encoder such as bge-reranker) is loaded with rank
+    pooling, so the first value of its "embedding" of a pair is the
+    relevance score. Rank pooling writes only n_cls_out floats per sequence
+    while Llama.embed copies n_embd of them, reading past the end of the
+    scores; the reranker's embed reads exactly n_cls_out instead. The
+    tokenizer parses special tokens, which pair templates use to separate
+    query and document, and a whole pair must fit in one batch. Rank pooling
+    needs llama-cpp-python 0.3.2 or later.
+
+    Args:
+        model_path: Path to the GGUF model file
+        n_ctx: Context window size
+        n_threads: Number of threads for processing
+        rerank: Load as a reranker
+        **options: Further Llama arguments
+
+    Returns:
+        The loaded Llama instance
+    """
+    from llama_cpp import Llama
+
+    if not rerank:
+        return Llama(
+            model_path=model_path, embedding=True, n_ctx=n_ctx, n_threads=n_threads, verbose=False, **options
+        )
+
+    import llama_cpp
+    from llama_cpp import LLAMA_POOLING_TYPE_RANK
+
+    class RerankerLlama(Llama):
+        def tokenize(self, text: bytes, add_bos: bool = True, special: bool = False) -> List[int]:
+            return super().tokenize(text, add_bos, True)
+
+        def embed(self, input, normalize: bool = False, truncate: bool = True, return_count: bool = False):
+            # Same batching as Llama.embed, but each sequence yields its n_cls_out scores
+            # (builds without llama_model_n_cls_out have exactly one)
+            n_cls_out_fn = getattr(llama_cpp, "llama_model_n_cls_out", None)
+            n_cls_out = n_cls_out_fn(self._model.model) if n_cls_out_fn is not None else 1
+            n_batch = self.n_batch
+            n_seq_max = self.context_params.n_seq_max
+            scores: List[List[float]] = []
+            seq_sizes: List[int] = []
+            total_tokens = 0
+
+            def decode_batch():
+                self._ctx.kv_cache_clear()
+                self._ctx.decode(self._batch)
+                self._batch.reset()
+                for seq_id in range(len(seq_sizes)):
+                    scores.append(llama_cpp.llama_get_embeddings_seq(self._ctx.ctx, seq_id)[:n_cls_out])
+                seq_sizes.clear()
+
+            self._batch.reset()
+            for text in [input] if isinstance(input, str) else input:
+                tokens = self.tokenize(text.encode("utf-8"))
+                if truncate:
+                    tokens = tokens[:n_batch]
+                if len(tokens) > n_batch:
+                    raise ValueError(f"Requested tokens ({len(tokens)}) exceed batch size of {n_batch}")
+                if seq_sizes and (sum(seq_sizes) + len(tokens) > n_batch or len(seq_sizes) >= n_seq_max):
+                    decode_batch()
+                self._batch.add_sequence(tokens, len(seq_sizes), True)
+                seq_sizes.append(len(tokens))
+                total_tokens += len(tokens)
+            if seq_sizes:
+                decode_batch()
+            self._ctx.kv_cache_clear()
+            self.reset()
+
+            output = scores[0] if isinstance(input, str) else scores
+            return (output, total_tokens) if return_count else output
+
+    return RerankerLlama(
+        model_path=model_path,
+        embedding=True,
+        pooling_type=LLAMA_POOLING_TYPE_RANK,
+        n_ctx=n_ctx,
+        n_batch=n_ctx,
+        n_ubatch=n_ctx,
+        n_threads=n_threads,
+        verbose=False,
+        **options
+    )
+
+
+def _init_worker(model_path: str, n_ctx: int, n_threads: int, rerank: bool = False):
+    """Load the model once per worker process; mmap lets all workers share the weights' page cache."""
+    global _worker_llm
+    _worker_llm = load_model(model_path, n_ctx, n_threads, rerank=rerank, use_mmap=True)
+
+
+def _embed_in_worker(texts: List[str]) -> List[List[float]]:
+    """Embed a batch with this worker's model."""
+    if not texts:
+        return []
+    result = _worker_llm.create_embedding(texts)
+    data = sorted(result["data"], key=lambda item: item["index"])
+    return [item["embedding"] for item in data]
+
+
+class EmbeddingWorkerPool:
+    """
+    Pool of embedding worker processes, each with its own llama.cpp context.
+
+    Batches are split into sub-batches and dispatched to the least-loaded
+    workers. A bounded number of sub-batches may be in flight; callers
+    beyond that block until a slot frees up, which pushes backpressure
+    back onto the embedding queue.
+    """
+
+    def __init__(
+        self,
+        model_path: str,
+        n_ctx: int = 512,
+        workers: int = EMBEDDING_WORKERS,
+        threads_per_worker: int = EMBEDDING_THREADS_PER_WORKER,
+        max_inflight: int = EMBEDDING_WORKER_MAX_INFLIGHT,
+        min_batch: int = EMBEDDING_WORKER_MIN_BATCH,
+        rerank: bool = False
+    ):
+        """
+        Start the worker processes.
+
+        Args:
+            model_path: Path to the GGUF model file
+            n_ctx: Context window size per worker
+            workers: Number of worker processes
+            threads_per_worker: llama.cpp threads in each worker
+            max_inflight: Sub-batches allowed in flight (0 = two per worker)
+            min_batch: Smallest sub-batch sent to its own worker
+            rerank: Load the model as a reranker (see load_model)
+        """
+        self.workers = max(1, workers)
+        self.min_batch = max(1, min_batch)
+        self.max_inflight = max_inflight or self.workers * 2
+        context = multiprocessing.get_context("spawn")
+        self._executors = [
+            ProcessPoolExecutor(
+                max_workers=1,
+                mp_context=context,
+                initializer=_init_worker,
+                initargs=(model_path, n_ctx, threads_per_worker, rerank)
+            )
+            for _ in range(self.workers)
+        ]
+        self._inflight = [0] * self.workers
+        self._waiting = 0
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.max_inflight)
+
+    def warm_up(self):
+        """Block until every worker has loaded its model."""
+        for future in [executor.submit(_embed_in_worker, []) for executor in self._executors]:
+            future.result()
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed texts across the workers, preserving order.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            List of embeddings in the same order as texts
+        """
+        if not texts:
+            return []
+
+        parts = min(self.workers, math.ceil(len(texts) / self.min_batch))
+        size = math.ceil(len(texts) / parts)
+        futures = [self._submit(texts[start:start + size]) for start in range(0, len(texts), size)]
+
+        embeddings = []
+        for future in futures:
+            embeddings.extend(future.result())
+        return embeddings
+
+    def _submit(self, texts: List[str]) -> Future:
+        """Send a sub-batch to the least-loaded worker, waiting for a free slot first."""
+        with self._lock:
+            self._waiting += 1
+        self._slots.acquire()
+        with self._lock:
+            self._waiting -= 1
+            index = min(range(self.workers), key=self._inflight.__getitem__)
+            self._inflight[index] += 1
+
+        def _release(_):
+            with self._lock:
+                self._inflight[index] -= 1
+            self._slots.release()
+
+        try:
+            future = self._executors[index].submit(_embed_in_worker, texts)
+        except Exception:
+            _release(None)
+            raise
+        future.add_done_callback(_release)
+        return future
+
+    @property
+    def queue_depth(self) -> int:
+        """Sub-batches running or waiting for a worker slot."""
+        with self._lock:
+            return sum(self._inflight) + self._waiting
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_inflight": self.max_inflight,
+                "inflight_per_worker": list(self._inflight),
+                "waiting": self._waiting,
+                "queue_depth": sum(self._inflight) + self._waiting,
+            }
+
+    def shutdown(self):
+        for executor in self._executors:
+            executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,215 @@
+import asyncio
+import json
+import os
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import AsyncIterable, Dict, Iterable, List, Tuple, Union
+from sqlalchemy.ext.asyncio import AsyncEngine
+from database.database import async_engine
+from database.bootstrap import partition_name
+from database.models import DEFAULT_COLLECTION
+from services.store_embedding_service import StoreEmbeddingService
+from services.chunking import CHUNKING_STRATEGY
+from utils.logger import logger
+
+# Number of chunks embedded together before a batch is handed to the writer
+INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", "256"))
+# Embedded batches allowed to wait for the writer before embedding pauses
+INGEST_QUEUE_DEPTH = int(os.getenv("INGEST_QUEUE_DEPTH", "2"))
+
+# COPY takes values rather than SQL defaults, so each batch reads the database clock once
+UTC_NOW_SQL = "SELECT timezone('utc', clock_timestamp())"
+
+
+@dataclass
+class IngestionResult:
+    document_ids: List[uuid.UUID] = field(default_factory=list)
+    chunks_count: int = 0
+    duration: float = 0.0
+
+    @property
+    def docs_per_sec(self) -> float:
+        return len(self.document_ids) / self.duration if self.duration else 0.0
+
+    @property
+    def chunks_per_sec(self) -> float:
+        return self.chunks_count / self.duration if self.duration else 0.0
+
+
+@dataclass
+class _Batch:
+    documents: List[Tuple[uuid.UUID, str, str, str]] = field(default_factory=list)
+    chunks: List[Tuple[uuid.UUID, int, str, str]] = field(default_factory=list)
+    embeddings: List[list] = field(default_factory=list)
+
+
+class IngestionPipeline:
+    """
+    Streaming bulk ingestion: chunk -> batch-embed -> bulk insert.
+
+    Documents are chunked as they arrive and their chunks accumulated until
+    ``batch_size`` chunks are ready; each batch is embedded in one call and
+    handed to a writer task that COPYs it into Postgres while the next batch
+    is being embedded. A document never spans two batches, so every batch
+    commits whole documents.
+    """
+
+    def __init__(
+        self,
+        store_service: StoreEmbeddingService,
+        engine: AsyncEngine = async_engine,
+        batch_size: int = INGEST_BATCH_SIZE,
+        queue_depth: int = INGEST_QUEUE_DEPTH
+    ):
+        """
+        Initialize the ingestion pipeline.
+
+        Args:
+            store_service: Service providing chunking and embeddings
+            engine: Async engine used for the COPY writes
+            batch_size: Number of chunks embedded together
+            queue_depth: Embedded batches buffered ahead of the writer
+        """
+        self.store_service = store_service
+        self.engine = engine
+        self.batch_size = max(1, batch_size)
+        self.queue_depth = max(1, queue_depth)
+
+    async def ingest(
+        self,
+        documents: Union[Iterable[Dict], AsyncIterable[Dict]],
+        chunk_size: int = 500,
+        overlap: int = 50,
+        strategy: str = CHUNKING_STRATEGY,
+        collection: str = DEFAULT_COLLECTION
+    ) -> IngestionResult:
+        """
+        Ingest a stream of documents.
+
+        Args:
+            documents: Iterable or async iterable of dicts with a "text" key and
+                optional per-document "metadata"/"chunk_size"/"overlap"/"strategy"
+            chunk_size: Default maximum size of each chunk
+            overlap: Default overlap between chunks
+            strategy: Default chunking strategy
+            collection: Collection every document is stored in (must exist)
+
+        Returns:
+            IngestionResult with the stored document IDs, chunk count and throughput
+        """
+        start_time = time.perf_counter()
+        result = IngestionResult()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_depth)
+        writer = asyncio.create_task(self._write_stage(queue, result, collection))
+
+        try:
+            batch = _Batch()
+            async for document in self._iterate(documents):
+                text = document.get("text", "")
+                if not text.strip():
+                    continue
+
+                document_id = uuid.uuid4()
+                chunking = (
+                    document.get("chunk_size", chunk_size),
+                    document.get("overlap", overlap),
+                    document.get("strategy", strategy)
+                )
+                chunks = await asyncio.to_thread(self.store_service.chunk_text, text, *chunking)
+                metadata = document.get("metadata") or {}
+                if not isinstance(metadata, dict):
+                    raise ValueError("Document metadata must be an object")
+                metadata = json.dumps(metadata)  # COPY sends jsonb as text
+                batch.documents.append(
+                    (document_id, text, self.store_service.document_hash(text, *chunking), metadata)
+                )
+                batch.chunks.extend(
+                    (document_id, chunk_index, chunk, metadata) for chunk_index, chunk in enumerate(chunks)
+                )
+
+                if len(batch.chunks) >= self.batch_size:
+                    await self._put(queue, await self._embed(batch), writer)
+                    batch = _Batch()
+
+            if batch.documents:
+                await self._put(queue, await self._embed(batch), writer)
+            await self._put(queue, None, writer)
+            await writer
+        except BaseException:
+            writer.cancel()
+            raise
+
+        result.duration = time.perf_counter() - start_time
+        logger.info(
+            f"[INGEST] {len(result.document_ids)} documents, {result.chunks_count} chunks in "
+            f"{result.duration:.2f}s ({result.docs_per_sec:.1f} docs/s, {result.chunks_per_sec:.1f} chunks/s)"
+        )
+        return result
+
+    @staticmethod
+    async def _iterate(documents):
+        """Iterate sync and async document sources the same way."""
+        if hasattr(documents, "__aiter__"):
+            async for document in documents:
+                yield document
+        else:
+            for document in documents:
+                yield document
+
+    async def _embed(self, batch: _Batch) -> _Batch:
+        """Embed every chunk of a batch in one call."""
+        batch.embeddings = await self.store_service.embedding_service.acreate_embeddings(
+            [chunk for _, _, chunk, _ in batch.chunks]
+        )
+        return batch
+
+    @staticmethod
+    async def _put(queue: asyncio.Queue, item, writer: asyncio.Task):
+        """Hand an item to the writer, surfacing the writer's error if it died."""
+        put = asyncio.ensure_future(queue.put(item))
+        done, _ = await asyncio.wait({put, writer}, return_when=asyncio.FIRST_COMPLETED)
+        if put not in done:
+            put.cancel()
+            writer.result()  # raises the writer's exception
+            raise RuntimeError("Ingestion writer stopped unexpectedly")
+
+    async def _write_stage(self, queue: asyncio.Queue, result: IngestionResult, collection: str):
+        """Bulk insert embedded batches with COPY, one transaction per batch."""
+        # COPY straight into the collection's partition skips per-row partition routing
+        chunks_table = partition_name(collection)
+        async with self.engine.connect() as conn:
+            raw = await conn.get_raw_connection()
+            driver = raw.driver_connection
+
+            while True:
+                batch = await queue.get()
+                if batch is None:
+                    return
+
+                async with driver.transaction():
+                    # Stamped on the database clock like every other document write (see utc_now)
+                    now = await driver.fetchval(UTC_NOW_SQL)
+                    await driver.copy_records_to_table(
+                        "documents",
+                        records=[(collection, *document, now, now) for document in batch.documents],
+                        columns=["collection", "id", "text", "content_hash", "metadata", "created_at", "updated_at"]
+                    )
+                    await driver.copy_records_to_table(
+                        chunks_table,
+                        records=[
+                            (
+                                uuid.uuid4(), collection, document_id, embedding, chunk, chunk_index,
+                                self.store_service.chunk_hash(chunk), metadata
+                            )
+                            for (document_id, chunk_index, chunk, metadata), embedding
+                            in zip(batch.chunks, batch.embeddings)
+                        ],
+                        columns=[
+                            "id", "collection", "document_id", "embedding", "text", "chunk_index",
+                            "content_hash", "metadata"
+                        ]
+                    )
+
+                result.document_ids.extend(document[0] for document in batch.documents)
+                result.chunks_count += len(batch.chunks)
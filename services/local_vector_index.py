@@ -0,0 +1,257 @@
+import json
+import os
+import threading
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from database.models import EMBEDDING_DIM
+
+# On-disk location and element type of the in-process index
+LOCAL_INDEX_PATH = os.getenv("LOCAL_INDEX_PATH", "data/local_index")
+LOCAL_INDEX_DTYPE = os.getenv("LOCAL_INDEX_DTYPE", "float32")  # float32 | float16
+# Rows scored per block, bounding the float32 copy made of float16 rows
+LOCAL_INDEX_BLOCK_ROWS = int(os.getenv("LOCAL_INDEX_BLOCK_ROWS", "65536"))
+# Smallest step the vector file grows by when an append outgrows it (it at least doubles)
+LOCAL_INDEX_GROW_ROWS = int(os.getenv("LOCAL_INDEX_GROW_ROWS", "4096"))
+
+
+class LocalVectorIndex:
+    """
+    In-process exact cosine index over normalized embeddings.
+
+    Vectors live in a raw row-major file (``vectors.<dtype>``) that is
+    memory-mapped, so loading costs no copy and pages are shared with the OS
+    cache. Chunk metadata lives in ``chunks.jsonl``, one line per row, and
+    sets the row count: the vector file is grown ahead of it in blocks, so an
+    append writes into the existing mapping and the file is only re-mapped
+    when it grows. Appends write both files in place; nothing is ever rebuilt,
+    and reading an index that was never written creates nothing on disk.
+    """
+
+    def __init__(
+        self,
+        path: str = LOCAL_INDEX_PATH,
+        dim: int = EMBEDDING_DIM,
+        dtype: str = LOCAL_INDEX_DTYPE,
+        block_rows: int = LOCAL_INDEX_BLOCK_ROWS
+    ):
+        """
+        Initialize the index; files are opened on first use.
+
+        Args:
+            path: Directory holding the index files
+            dim: Embedding dimension
+            dtype: Stored element type, "float32" or "float16"
+            block_rows: Rows scored per block during search
+        """
+        if dtype not in ("float32", "float16"):
+            raise ValueError(f"Unsupported local index dtype: {dtype}")
+        self.path = path
+        self.dim = dim
+        self.dtype = np.dtype(dtype)
+        self.block_rows = max(1, block_rows)
+        self._vectors: Optional[np.ndarray] = None
+        self._storage: Optional[np.ndarray] = None  # the whole vector file, rows past len(self._chunks) unused
+        self._chunks: List[Dict] = []
+        self._positions: Dict[tuple, int] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def vectors_path(self) -> str:
+        return os.path.join(self.path, f"vectors.{self.dtype.name}")
+
+    @property
+    def chunks_path(self) -> str:
+        return os.path.join(self.path, "chunks.jsonl")
+
+    @property
+    def meta_path(self) -> str:
+        return os.path.join(self.path, "meta.json")
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._vectors is not None
+
+    def __len__(self) -> int:
+        self.load()
+        return len(self._chunks)
+
+    def chunk_ids(self) -> set:
+        """IDs of the chunks already in the index."""
+        self.load()
+        return {chunk["chunk_id"] for chunk in self._chunks}
+
+    def load(self):
+        """Open the index files and map the vectors."""
+        if self._vectors is not None:
+            return
+        with self._lock:
+            if self._vectors is None:
+                self._load()
+
+    def _load(self):
+        """Caller holds the lock."""
+        if os.path.exists(self.meta_path):
+            with open(self.meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta["dim"] != self.dim or meta["dtype"] != self.dtype.name:
+                raise ValueError(
+                    f"Local index at {self.path} holds {meta['dtype']}[{meta['dim']}] vectors, "
+                    f"expected {self.dtype.name}[{self.dim}]"
+                )
+
+        chunks = []
+        if os.path.exists(self.chunks_path):
+            with open(self.chunks_path, encoding="utf-8") as f:
+                chunks = [json.loads(line) for line in f if line.strip()]
+        row_bytes = self.dim * self.dtype.itemsize
+        capacity = os.path.getsize(self.vectors_path) // row_bytes if os.path.exists(self.vectors_path) else 0
+
+        # Vectors are written before their chunk lines, so chunk lines without
+        # vectors only remain from an index written before the file was grown in blocks
+        if len(chunks) > capacity:
+            chunks = chunks[:capacity]
+            with open(self.chunks_path, "w", encoding="utf-8") as f:
+                f.writelines(json.dumps(chunk) + "\n" for chunk in chunks)
+
+        self._chunks = chunks
+        self._positions = {
+            (chunk["document_id"], chunk["chunk_index"]): row for row, chunk in enumerate(chunks)
+        }
+        self._storage = self._map(capacity, "r")
+        self._vectors = self._storage[:len(chunks)]
+
+    def _map(self, capacity: int, mode: str) -> np.ndarray:
+        if capacity == 0:
+            return np.empty((0, self.dim), dtype=self.dtype)
+        return np.memmap(self.vectors_path, dtype=self.dtype, mode=mode, shape=(capacity, self.dim))
+
+    def _reserve(self, rows: int):
+        """Grow the vector file to hold at least rows rows and map it writable. Caller holds the lock."""
+        capacity = len(self._storage)
+        if rows > capacity:
+            capacity = max(rows, capacity * 2, LOCAL_INDEX_GROW_ROWS)
+        os.makedirs(self.path, exist_ok=True)
+        if not os.path.exists(self.meta_path):
+            with open(self.meta_path, "w", encoding="utf-8") as f:
+                json.dump({"dim": self.dim, "dtype": self.dtype.name}, f)
+        with open(self.vectors_path, "ab") as f:
+            f.truncate(capacity * self.dim * self.dtype.itemsize)  # the new rows read as zeros
+        self._storage = self._map(capacity, "r+")
+
+    def append(self, embeddings: Sequence[Sequence[float]], chunks: List[Dict]):
+        """
+        Add vectors and their chunk metadata, persisting both immediately.
+
+        Args:
+            embeddings: One embedding per chunk
+            chunks: Dicts with chunk_id, chunk_text, chunk_index, document_id, metadata and created_at
+        """
+        if len(embeddings) != len(chunks):
+            raise ValueError("embeddings and chunks must have the same length")
+        if not chunks:
+            return
+        matrix = self._normalize(np.asarray(embeddings, dtype=np.float32)).astype(self.dtype)
+
+        self.load()
+        with self._lock:
+            start = len(self._chunks)
+            end = start + len(chunks)
+            if end > len(self._storage) or getattr(self._storage, "mode", None) != "r+":
+                self._reserve(end)
+            self._storage[start:end] = matrix
+            self._storage.flush()
+            with open(self.chunks_path, "a", encoding="utf-8") as f:
+                f.writelines(json.dumps(chunk) + "\n" for chunk in chunks)
+            for offset, chunk in enumerate(chunks):
+                self._positions[(chunk["document_id"], chunk["chunk_index"])] = start + offset
+            # Both only grow: searches already running keep their view of the first start rows
+            self._chunks.extend(chunks)
+            self._vectors = self._storage[:end]
+
+    def search(
+        self,
+        query_embedding: Sequence[float],
+        limit: int = 5,
+        similarity_threshold: float = 0.0,
+        predicate: Optional[Callable[[Dict], bool]] = None
+    ) -> List[Dict]:
+        """
+        Exact top-k cosine search.
+
+        Args:
+            query_embedding: Embedding of the search query
+            limit: Maximum number of results to return
+            similarity_threshold: Minimum similarity score (0-1, same scale as pgvector search)
+            predicate: Only chunks for which this returns True are eligible (applied before top-k)
+
+        Returns:
+            List of result dictionaries ordered by similarity
+        """
+        self.load()
+        vectors, chunks = self._vectors, self._chunks
+        # An append may land between the two reads; only score rows present in both
+        count = min(len(vectors), len(chunks))
+        if count == 0 or limit <= 0:
+            return []
+
+        query = self._normalize(np.asarray(query_embedding, dtype=np.float32)[None, :])[0]
+        scores = np.empty(count, dtype=np.float32)
+        for start in range(0, count, self.block_rows):
+            block = vectors[start:min(start + self.block_rows, count)]
+            scores[start:start + len(block)] = block.astype(np.float32, copy=False) @ query
+        if predicate is not None:
+            eligible = np.fromiter((predicate(chunks[row]) for row in range(count)), dtype=bool, count=count)
+            scores[~eligible] = -np.inf
+
+        k = min(limit, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+
+        results = []
+        for row in top:
+            # Cosine distance is 1 - cos, and pgvector search reports 1 - distance / 2
+            if scores[row] == -np.inf:
+                break  # fewer eligible chunks than the limit
+            similarity = (1.0 + float(scores[row])) / 2
+            if similarity < similarity_threshold:
+                break
+            results.append({**chunks[row], "similarity": similarity})
+        return results
+
+    def context(self, document_id: str, chunk_index: int, window: int) -> List[Dict]:
+        """
+        Chunks within window positions of a chunk, in document order.
+
+        Returns:
+            List of {"chunk_index", "text"} dicts
+        """
+        self.load()
+        positions, chunks = self._positions, self._chunks
+        context = []
+        for position in range(chunk_index - window, chunk_index + window + 1):
+            row = positions.get((document_id, position))
+            if row is not None and row < len(chunks):
+                context.append({"chunk_index": position, "text": chunks[row]["chunk_text"]})
+        return context
+
+    def vectors(self, keys: Sequence[Tuple[str, Optional[int]]]) -> np.ndarray:
+        """
+        Stored (normalized) vectors of chunks identified by (document_id, chunk_index).
+
+        Returns:
+            float32 matrix with one row per key (zeros for a chunk not in the index)
+        """
+        self.load()
+        positions, vectors = self._positions, self._vectors
+        matrix = np.zeros((len(keys), self.dim), dtype=np.float32)
+        for offset, key in enumerate(keys):
+            row = positions.get(key)
+            if row is not None and row < len(vectors):
+                matrix[offset] = vectors[row]
+        return matrix
+
+    @staticmethod
+    def _normalize(matrix: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
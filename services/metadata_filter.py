@@ -0,0 +1,180 @@
+import json
+from typing import Any, Dict, List, Optional
+
+# Comparison operators evaluated through a jsonpath predicate
+JSONPATH_COMPARISONS = {"$ne": "!=", "$gt": ">", "$gte": ">=", "$lt": "<", "$lte": "<="}
+FILTER_OPERATORS = {"$eq", "$in", "$contains", "$exists", *JSONPATH_COMPARISONS}
+
+
+class MetadataFilter:
+    """
+    Filter on document metadata, compiled for SQL push-down.
+
+    Filters map top-level metadata keys to a value (equality) or to an
+    operator dict, all conditions combined with AND:
+
+        {"source": "wiki",
+         "tags": {"$contains": ["python"]},
+         "published": {"$gte": "2024-01-01", "$lt": "2025-01-01"},
+         "lang": {"$in": ["en", "de"]}}
+
+    Equality and $contains compile into one jsonb containment value
+    (``metadata @> ...``); the other operators compile into one jsonpath
+    predicate (``metadata @@ ...``), so the SQL keeps a fixed shape whatever
+    the filter and values are always bound as parameters. Dates compare as
+    ISO-8601 strings. As in lax jsonpath, the jsonpath operators match an
+    array value when any of its elements does.
+
+    The jsonb_path_ops GIN index serves containment and the equality tests
+    of $in. Range, $ne and $exists conditions are checked on the rows the
+    vector index scan returns (iterative index scans keep it going until
+    enough rows pass), so they narrow a search but do not make it cheaper. B-tree expression indexes on
+    ``metadata->>'key'`` would not help either: they cannot serve a jsonpath
+    predicate, and per-key SQL would give up the fixed statement shape.
+    """
+
+    def __init__(self, containment: Dict[str, Any], predicates: List[str], conditions: List[tuple]):
+        self.containment = containment
+        self.predicates = predicates
+        self._conditions = conditions
+
+    @classmethod
+    def parse(cls, filters: Optional[Dict[str, Any]]) -> Optional["MetadataFilter"]:
+        """
+        Validate and compile a filter expression.
+
+        Args:
+            filters: Filter expression, or None
+
+        Returns:
+            Compiled MetadataFilter, or None if there is nothing to filter on
+
+        Raises:
+            ValueError: If the expression is malformed
+        """
+        if not filters:
+            return None
+        if not isinstance(filters, dict):
+            raise ValueError("Metadata filter must be an object of key -> condition")
+
+        containment: Dict[str, Any] = {}
+        predicates: List[str] = []
+        conditions: List[tuple] = []
+        for key, condition in filters.items():
+            if not isinstance(key, str) or not key or key.startswith("$"):
+                raise ValueError(f"Invalid metadata filter key: {key!r}")
+            operators = condition if isinstance(condition, dict) else {"$eq": condition}
+            if not operators:
+                raise ValueError(f"Empty condition for metadata key {key!r}")
+            path = f"$.{json.dumps(key)}"
+
+            for operator, value in operators.items():
+                if operator not in FILTER_OPERATORS:
+                    raise ValueError(f"Unknown metadata filter operator: {operator}")
+                if operator == "$eq":
+                    cls._check_scalar(key, operator, value)
+                    if key in containment:
+                        raise ValueError(f"Conflicting equality conditions for metadata key {key!r}")
+                    containment[key] = value
+                elif operator == "$contains":
+                    values = value if isinstance(value, list) else [value]
+                    for item in values:
+                        cls._check_scalar(key, operator, item)
+                    if key in containment:
+                        raise ValueError(f"Conflicting equality conditions for metadata key {key!r}")
+                    containment[key] = values
+                elif operator == "$in":
+                    if not isinstance(value, list) or not value:
+                        raise ValueError(f"$in for metadata key {key!r} needs a non-empty list")
+                    for item in value:
+                        cls._check_scalar(key, operator, item)
+                    predicates.append(
+                        "(" + " || ".join(f"{path} == {json.dumps(item)}" for item in value) + ")"
+                    )
+                elif operator == "$exists":
+                    if not isinstance(value, bool):
+                        raise ValueError(f"$exists for metadata key {key!r} needs true or false")
+                    predicates.append(f"exists({path})" if value else f"!(exists({path}))")
+                else:
+                    cls._check_scalar(key, operator, value)
+                    if operator != "$ne" and (value is None or isinstance(value, bool)):
+                        raise ValueError(f"{operator} for metadata key {key!r} needs a number or string")
+                    predicates.append(f"{path} {JSONPATH_COMPARISONS[operator]} {json.dumps(value)}")
+                conditions.append((key, operator, value))
+
+        return cls(containment, predicates, conditions)
+
+    @staticmethod
+    def _check_scalar(key: str, operator: str, value: Any):
+        if isinstance(value, (dict, list)):
+            raise ValueError(f"{operator} for metadata key {key!r} needs a scalar value")
+
+    @property
+    def containment_json(self) -> Optional[str]:
+        """jsonb value for ``metadata @> ...``, or None."""
+        return json.dumps(self.containment) if self.containment else None
+
+    @property
+    def jsonpath(self) -> Optional[str]:
+        """jsonpath predicate for ``metadata @@ ...``, or None."""
+        return " && ".join(self.predicates) if self.predicates else None
+
+    def matches(self, metadata: Optional[Dict[str, Any]]) -> bool:
+        """
+        Evaluate the filter in Python with the same semantics as the SQL.
+
+        Used by search backends that cannot push the filter into a query.
+        """
+        metadata = metadata or {}
+        for key, operator, value in self._conditions:
+            present = key in metadata
+            actual = metadata.get(key)
+            if operator == "$exists":
+                if present != value:
+                    return False
+            elif not present:
+                return False
+            elif operator == "$eq":
+                if not _equal(actual, value):
+                    return False
+            elif operator == "$contains":
+                items = value if isinstance(value, list) else [value]
+                if not isinstance(actual, list) or not all(any(_equal(a, i) for a in actual) for i in items):
+                    return False
+            elif operator == "$in":
+                if not any(_equal(a, item) for a in _items(actual) for item in value):
+                    return False
+            elif operator == "$ne":
+                if not any(not _equal(a, value) for a in _items(actual)):
+                    return False
+            elif not any(_compare(a, operator, value) for a in _items(actual)):
+                return False
+        return True
+
+
+def _items(value: Any) -> List[Any]:
+    """Lax jsonpath unwraps arrays before comparing."""
+    return value if isinstance(value, list) else [value]
+
+
+def _equal(a: Any, b: Any) -> bool:
+    """JSON equality: booleans never equal numbers."""
+    if isinstance(a, bool) or isinstance(b, bool):
+        return a is b
+    return a == b
+
+
+def _compare(a: Any, operator: str, b: Any) -> bool:
+    """Ordering comparison between values of the same JSON type, as jsonpath does."""
+    if isinstance(a, bool) or isinstance(b, bool):
+        return False
+    if isinstance(a, str) != isinstance(b, str):
+        return False
+    if not isinstance(a, (str, int, float)):
+        return False
+    return {
+        "$gt": a > b,
+        "$gte": a >= b,
+        "$lt": a < b,
+        "$lte": a <= b,
+    }[operator]
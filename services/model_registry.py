@@ -0,0 +1,130 @@
+import json
+import os
+import threading
+from typing import Dict, List, Optional
+from services.embedding_service import EmbeddingService, MODEL_PATH
+from utils.logger import logger
+
+DEFAULT_EMBEDDING_MODEL = os.getenv("DEFAULT_EMBEDDING_MODEL", "default")
+
+
+def load_model_specs() -> Dict[str, dict]:
+    """
+    Read the embedding model definitions from the environment.
+
+    The default model uses MODEL_PATH, EMBEDDING_N_CTX and EMBEDDING_N_THREADS.
+    Additional models can be declared in EMBEDDING_MODELS as JSON, e.g.
+    {"small": {"model_path": "models/small.gguf", "n_ctx": 256, "n_threads": 4, "workers": 2}}.
+
+    Returns:
+        Mapping of model name to EmbeddingService keyword arguments
+    """
+    specs = {
+        DEFAULT_EMBEDDING_MODEL: {
+            "model_path": os.getenv("EMBEDDING_MODEL_PATH", MODEL_PATH),
+            "n_ctx": int(os.getenv("EMBEDDING_N_CTX", "512")),
+            "n_threads": int(os.getenv("EMBEDDING_N_THREADS", "8")),
+        }
+    }
+    specs.update(json.loads(os.getenv("EMBEDDING_MODELS", "{}")))
+    return specs
+
+
+class ModelRegistry:
+    """
+    Process-wide registry of named embedding models.
+
+    Each model gets exactly one EmbeddingService, so its GGUF weights are
+    mapped and its llama.cpp context allocated once no matter how many
+    controllers or tools use it.
+    """
+
+    def __init__(self, specs: Dict[str, dict]):
+        """
+        Initialize the registry.
+
+        Args:
+            specs: Mapping of model name to EmbeddingService keyword arguments
+        """
+        self._specs = dict(specs)
+        self._services: Dict[str, EmbeddingService] = {}
+        self._errors: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def names(self) -> List[str]:
+        return list(self._specs)
+
+    def get(self, name: Optional[str] = None) -> EmbeddingService:
+        """
+        Get the shared service for a model. The model loads on first use.
+
+        Args:
+            name: Model name (defaults to DEFAULT_EMBEDDING_MODEL)
+
+        Returns:
+            The shared EmbeddingService instance
+
+        Raises:
+            KeyError: If no model with this name is configured
+        """
+        name = name or DEFAULT_EMBEDDING_MODEL
+        if name not in self._specs:
+            raise KeyError(f"Unknown embedding model: {name}")
+
+        with self._lock:
+            if name not in self._services:
+                self._services[name] = EmbeddingService(**self._specs[name])
+            return self._services[name]
+
+    def warm_up(self, names: Optional[List[str]] = None) -> threading.Thread:
+        """
+        Load models in a background thread so startup does not block.
+
+        Args:
+            names: Models to load (defaults to all configured models)
+
+        Returns:
+            The started warm-up thread
+        """
+        def _load():
+            for name in names or self.names():
+                try:
+                    logger.info(f"[MODEL] loading {name}")
+                    self.get(name).load()
+                    logger.info(f"[MODEL] {name} ready")
+                except Exception as e:
+                    self._errors[name] = str(e)
+                    logger.error(f"[MODEL] failed to load {name}: {str(e)}")
+
+        thread = threading.Thread(target=_load, name="model-warmup", daemon=True)
+        thread.start()
+        return thread
+
+    def status(self) -> Dict[str, str]:
+        """Load state of every configured model."""
+        status = {}
+        for name in self._specs:
+            service = self._services.get(name)
+            if name in self._errors:
+                status[name] = f"error: {self._errors[name]}"
+            elif service is not None and service.is_loaded:
+                status[name] = "ready"
+            else:
+                status[name] = "loading" if service is not None else "not_loaded"
+        return status
+
+    def shutdown(self):
+        """Stop worker processes of every loaded model."""
+        for service in list(self._services.values()):
+            service.shutdown()
+
+    def is_ready(self) -> bool:
+        return all(state == "ready" for state in self.status().values())
+
+
+model_registry = ModelRegistry(load_model_specs())
+
+
+def get_embedding_service(name: Optional[str] = None) -> EmbeddingService:
+    """Get the shared EmbeddingService for a named model."""
+    return model_registry.get(name)
@@ -0,0 +1,153 @@
+import os
+import threading
+from typing import List, Optional
+import numpy as np
+from services.embedding_service import EmbeddingService
+from services.embedding_workers import EMBEDDING_THREADS_PER_WORKER
+
+# Cross-encoder reranker (e.g. bge-reranker-v2-m3 GGUF) for the second retrieval stage
+RERANKER_MODEL_PATH = os.getenv(
+    "RERANKER_MODEL_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), "models", "bge-reranker-v2-m3-Q8_0.gguf")
+)
+RERANKER_N_CTX = int(os.getenv("RERANKER_N_CTX", "1024"))  # tokens per query/document pair
+RERANKER_N_THREADS = int(os.getenv("RERANKER_N_THREADS", "8"))
+RERANKER_BATCH_SIZE = int(os.getenv("RERANKER_BATCH_SIZE", "16"))  # pairs per llama.cpp call
+RERANKER_WORKERS = int(os.getenv("RERANKER_WORKERS", "0"))
+# How a pair is presented to the model; the default is the XLM-R layout used by bge rerankers
+RERANKER_TEMPLATE = os.getenv("RERANKER_TEMPLATE", "{query}</s></s>{document}")
+
+
+class RerankerService(EmbeddingService):
+    """
+    Cross-encoder relevance scores for query/document pairs.
+
+    Runs on the same infrastructure as embeddings: pairs from concurrent
+    searches share micro-batches, and with workers > 0 inference runs in a
+    pool of worker processes. Scores are the model's raw logits; higher
+    means more relevant. Under rank pooling each output holds the model's
+    n_cls_out class scores, and the first one is the relevance score.
+    """
+
+    rerank = True
+
+    def __init__(
+        self,
+        model_path: str = RERANKER_MODEL_PATH,
+        n_ctx: int = RERANKER_N_CTX,
+        n_threads: int = RERANKER_N_THREADS,
+        max_batch_size: int = RERANKER_BATCH_SIZE,
+        workers: int = RERANKER_WORKERS,
+        threads_per_worker: int = EMBEDDING_THREADS_PER_WORKER,
+        template: str = RERANKER_TEMPLATE
+    ):
+        """
+        Initialize the reranker. The model is loaded lazily on first use or by calling load().
+
+        Args:
+            model_path: Path to the GGUF reranker model
+            n_ctx: Context window, which bounds the tokens of one pair
+            n_threads: Number of threads for processing
+            max_batch_size: Maximum pairs scored in one llama.cpp call
+            workers: Worker processes for inference (0 runs inference in this process)
+            threads_per_worker: llama.cpp threads in each worker process
+            template: Format string with {query} and {document} placeholders
+        """
+        # Pair scores are not worth caching: queries rarely repeat exactly
+        super().__init__(
+            model_path, n_ctx, n_threads,
+            max_batch_size=max_batch_size,
+            cache=None,
+            workers=workers,
+            threads_per_worker=threads_per_worker
+        )
+        self.template = template
+
+    def score(self, query: str, documents: List[str]) -> List[float]:
+        """
+        Score documents against a query.
+
+        Args:
+            query: Search query text
+            documents: Candidate texts
+
+        Returns:
+            One relevance score per document, in order
+        """
+        if not documents:
+            return []
+        return [float(output[0]) for output in self.create_embeddings(self._pairs(query, documents))]
+
+    async def ascore(self, query: str, documents: List[str]) -> List[float]:
+        """Async variant of score; inference runs off the event loop."""
+        if not documents:
+            return []
+        return [float(output[0]) for output in await self.acreate_embeddings(self._pairs(query, documents))]
+
+    def _pairs(self, query: str, documents: List[str]) -> List[str]:
+        return [self.template.format(query=query, document=document) for document in documents]
+
+
+def maximal_marginal_relevance(
+    vectors: np.ndarray,
+    relevance: np.ndarray,
+    k: int,
+    lambda_mult: float
+) -> List[int]:
+    """
+    Greedy maximal marginal relevance selection.
+
+    Each step picks the candidate maximizing
+    ``lambda_mult * relevance - (1 - lambda_mult) * max cosine similarity to
+    the candidates already picked``, so near-duplicates of a chosen result
+    lose out to slightly less relevant but different ones.
+
+    Args:
+        vectors: Candidate embeddings, one row per candidate (zero rows are never similar to anything)
+        relevance: Relevance of each candidate to the query
+        k: Number of candidates to pick
+        lambda_mult: 1.0 ranks by relevance alone, 0.0 by diversity alone
+
+    Returns:
+        Indexes of the picked candidates in pick order
+    """
+    count = len(relevance)
+    if count == 0 or k <= 0:
+        return []
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    unit = vectors / norms
+    similarity = unit @ unit.T
+
+    relevance = np.asarray(relevance, dtype=np.float32)
+    picked = [int(np.argmax(relevance))]
+    available = np.ones(count, dtype=bool)
+    available[picked[0]] = False
+    redundancy = similarity[picked[0]].copy()
+    while len(picked) < min(k, count):
+        scores = lambda_mult * relevance - (1 - lambda_mult) * redundancy
+        scores[~available] = -np.inf
+        best = int(np.argmax(scores))
+        picked.append(best)
+        available[best] = False
+        redundancy = np.maximum(redundancy, similarity[best])
+    return picked
+
+
+_reranker: Optional[RerankerService] = None
+_reranker_lock = threading.Lock()
+
+
+def get_reranker_service() -> RerankerService:
+    """Get the shared RerankerService (created on first use, model loaded lazily)."""
+    global _reranker
+    with _reranker_lock:
+        if _reranker is None:
+            _reranker = RerankerService()
+        return _reranker
+
+
+def shutdown_reranker():
+    """Stop the reranker's worker processes, if it was ever created."""
+    if _reranker is not None:
+        _reranker.shutdown()
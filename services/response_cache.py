@@ -0,0 +1,287 @@
+import itertools
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, FrozenSet, List, Optional, Sequence
+import numpy as np
+from sqlalchemy import select, text
+from database.database import read_only_connection
+from database.models import utc_now
+from utils.metrics import CHAT_CACHE_ENTRIES, CHAT_CACHE_LOOKUPS
+
+# Semantic answer cache for /chat (off by default: answers are reused for similar questions)
+CHAT_CACHE_ENABLED = os.getenv("CHAT_CACHE_ENABLED", "false").lower() == "true"
+# Largest cosine distance between two questions that still share an answer
+CHAT_CACHE_MAX_DISTANCE = float(os.getenv("CHAT_CACHE_MAX_DISTANCE", "0.05"))
+CHAT_CACHE_TTL = float(os.getenv("CHAT_CACHE_TTL", "3600"))  # seconds
+CHAT_CACHE_SIZE = int(os.getenv("CHAT_CACHE_SIZE", "1000"))
+
+# An entry is still valid if every document it was answered from exists and
+# has not been modified since the answer was produced (a primary key lookup
+# of the few cited documents, both timestamps on the database clock)
+VALIDATE_SQL = text("""
+    SELECT count(*) FROM documents
+    WHERE id = ANY(CAST(:ids AS uuid[])) AND updated_at <= :answered_at
+""")
+
+
+@dataclass
+class CachedAnswer:
+    key: int
+    collection: str
+    query: str
+    answer: str
+    document_ids: FrozenSet[str]
+    answered_at: datetime  # database clock when retrieval started, compared with documents.updated_at
+    expires_at: float  # time.monotonic() deadline
+
+
+class SemanticResponseCache:
+    """
+    Answer cache keyed on question embeddings.
+
+    A question hits when a cached question of the same collection lies within
+    ``max_distance`` cosine distance of it. Only answers grounded in retrieved
+    documents are cached, together with the IDs of those documents: an entry
+    is dropped when one of them is updated or deleted (checked against the
+    database on every hit, so writes from other processes count too) and
+    eagerly when this process modifies them. Entries also expire after
+    ``ttl`` seconds, and the least recently used are evicted beyond
+    ``max_entries``.
+
+    The per-hit check is required rather than an optimization left undone:
+    the ingestion script, other workers and direct SQL writes never reach
+    this process's eager invalidation. It costs one primary key lookup of
+    the handful of documents an answer cites, against the full agent run a
+    hit saves. Answers are stamped with ``aclock`` so the comparison never
+    mixes the application and database clocks.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = CHAT_CACHE_SIZE,
+        ttl: float = CHAT_CACHE_TTL,
+        max_distance: float = CHAT_CACHE_MAX_DISTANCE
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum cached answers
+            ttl: Seconds an answer stays valid
+            max_distance: Cosine distance threshold for a hit
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_distance = max_distance
+        self._entries: "OrderedDict[int, CachedAnswer]" = OrderedDict()
+        self._vectors: Dict[int, np.ndarray] = {}
+        # Per-collection (matrix of unit vectors, entry keys), rebuilt after changes
+        self._matrices: Dict[str, tuple] = {}
+        self._keys = itertools.count()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.evictions = 0
+
+    def lookup(self, collection: str, embedding: Sequence[float]) -> Optional[CachedAnswer]:
+        """
+        Find the cached answer to the closest question, if close enough.
+
+        The caller must still confirm the entry with avalidate before serving it.
+
+        Args:
+            collection: Collection the question is asked against
+            embedding: Question embedding
+
+        Returns:
+            CachedAnswer or None
+        """
+        vector = self._normalize(embedding)
+        with self._lock:
+            self._expire()
+            matrix, keys = self._matrix(collection)
+            if not keys:
+                return None
+            scores = matrix @ vector
+            best = int(np.argmax(scores))
+            if 1.0 - float(scores[best]) > self.max_distance:
+                return None
+            entry = self._entries[keys[best]]
+            self._entries.move_to_end(entry.key)
+            return entry
+
+    async def alookup(self, collection: str, embedding: Sequence[float]) -> Optional[CachedAnswer]:
+        """
+        Find and validate a cached answer, recording the outcome.
+
+        Args:
+            collection: Collection the question is asked against
+            embedding: Question embedding
+
+        Returns:
+            A still-valid CachedAnswer, or None on a miss
+        """
+        entry = self.lookup(collection, embedding)
+        if entry is not None and not await self.avalidate(entry):
+            self.remove(entry.key)
+            CHAT_CACHE_LOOKUPS.labels("stale").inc()
+            entry = None
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        CHAT_CACHE_LOOKUPS.labels("hit" if entry is not None else "miss").inc()
+        return entry
+
+    @staticmethod
+    async def aclock() -> datetime:
+        """The database clock, to stamp an answer before its retrieval starts."""
+        async with read_only_connection() as conn:
+            return await conn.scalar(select(utc_now()))
+
+    @staticmethod
+    async def avalidate(entry: CachedAnswer) -> bool:
+        """
+        Check that none of the entry's documents changed or disappeared since it was cached.
+
+        Runs on every hit; see the class docstring for why it cannot be skipped.
+        """
+        ids = [uuid.UUID(document_id) for document_id in entry.document_ids]
+        async with read_only_connection() as conn:
+            unchanged = await conn.scalar(VALIDATE_SQL, {"ids": ids, "answered_at": entry.answered_at})
+        return unchanged == len(entry.document_ids)
+
+    def put(
+        self,
+        collection: str,
+        embedding: Sequence[float],
+        query: str,
+        answer: str,
+        document_ids: Sequence[str],
+        answered_at: datetime
+    ) -> Optional[CachedAnswer]:
+        """
+        Cache an answer.
+
+        Args:
+            collection: Collection the question was asked against
+            embedding: Question embedding
+            query: Question text
+            answer: Final answer
+            document_ids: Documents the answer was retrieved from
+            answered_at: Database clock when the request started (before any retrieval), see aclock
+
+        Returns:
+            The new entry, or None if the answer was not grounded in any document
+        """
+        if not document_ids or self.max_entries <= 0:
+            return None
+        entry = CachedAnswer(
+            key=next(self._keys),
+            collection=collection,
+            query=query,
+            answer=answer,
+            document_ids=frozenset(str(document_id) for document_id in document_ids),
+            answered_at=answered_at,
+            expires_at=time.monotonic() + self.ttl
+        )
+        with self._lock:
+            self._entries[entry.key] = entry
+            self._vectors[entry.key] = self._normalize(embedding)
+            self._matrices.pop(collection, None)
+            while len(self._entries) > self.max_entries:
+                self._discard(next(iter(self._entries)))
+                self.evictions += 1
+            CHAT_CACHE_ENTRIES.set(len(self._entries))
+        return entry
+
+    def remove(self, key: int):
+        with self._lock:
+            if key in self._entries:
+                self._discard(key)
+                self.invalidations += 1
+            CHAT_CACHE_ENTRIES.set(len(self._entries))
+
+    def invalidate_documents(self, document_ids: Sequence) -> int:
+        """
+        Drop every answer retrieved from any of the given documents.
+
+        Returns:
+            Number of entries removed
+        """
+        ids = {str(document_id) for document_id in document_ids}
+        with self._lock:
+            stale = [key for key, entry in self._entries.items() if entry.document_ids & ids]
+            for key in stale:
+                self._discard(key)
+            self.invalidations += len(stale)
+            CHAT_CACHE_ENTRIES.set(len(self._entries))
+        return len(stale)
+
+    def invalidate_collection(self, collection: str) -> int:
+        """
+        Drop every answer cached for a collection.
+
+        Returns:
+            Number of entries removed
+        """
+        with self._lock:
+            stale = [key for key, entry in self._entries.items() if entry.collection == collection]
+            for key in stale:
+                self._discard(key)
+            self.invalidations += len(stale)
+            CHAT_CACHE_ENTRIES.set(len(self._entries))
+        return len(stale)
+
+    def stats(self) -> Dict:
+        """Hit/miss/invalidation/eviction counters, hit rate and current size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "invalidations": self.invalidations,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+            }
+
+    @staticmethod
+    def _normalize(embedding: Sequence[float]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _matrix(self, collection: str) -> tuple:
+        """Stacked unit vectors of a collection's entries. Caller holds the lock."""
+        if collection not in self._matrices:
+            keys: List[int] = [key for key, entry in self._entries.items() if entry.collection == collection]
+            matrix = np.stack([self._vectors[key] for key in keys]) if keys else np.empty((0, 0), dtype=np.float32)
+            self._matrices[collection] = (matrix, keys)
+        return self._matrices[collection]
+
+    def _expire(self):
+        """Drop expired entries. Caller holds the lock."""
+        now = time.monotonic()
+        expired = [key for key, entry in self._entries.items() if entry.expires_at <= now]
+        for key in expired:
+            self._discard(key)
+        if expired:
+            CHAT_CACHE_ENTRIES.set(len(self._entries))
+
+    def _discard(self, key: int):
+        """Remove an entry. Caller holds the lock."""
+        entry = self._entries.pop(key)
+        self._vectors.pop(key, None)
+        self._matrices.pop(entry.collection, None)
+
+
+chat_response_cache = SemanticResponseCache()
@@ -0,0 +1,999 @@
+import asyncio
+import itertools
+import os
+import threading
+from dataclasses import replace
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from database.models import EMBEDDING_DIM, TEXT_SEARCH_CONFIG, DEFAULT_COLLECTION
+from database.prepared import PreparedStatement, to_vector_literal
+from database.bootstrap import validate_collection_name
+from database.database import engine
+from services.local_vector_index import LocalVectorIndex, LOCAL_INDEX_PATH
+from services.metadata_filter import MetadataFilter
+from services.search_options import SearchOptions
+from utils.logger import logger
+from utils.metrics import SEARCH_QUERY_SECONDS
+
+# Where vector search runs: "pgvector" (Postgres) or "local" (in-process numpy index)
+SEARCH_BACKEND = os.getenv("SEARCH_BACKEND", "pgvector")
+
+# What search results carry: the chunk only, the chunk plus its neighbouring
+# chunks, or the chunk plus the full text of its document
+SEARCH_PROJECTIONS = ("chunk", "context", "document")
+
+# Iterative index scans for filtered queries (pgvector >= 0.8): the ANN scan
+# keeps going until enough rows pass the filter instead of returning fewer
+# than the limit. "relaxed_order" | "strict_order" (HNSW only) | "off"
+FILTERED_ITERATIVE_SCAN = os.getenv("FILTERED_ITERATIVE_SCAN", "relaxed_order")
+ITERATIVE_SCAN_MIN_VERSION = (0, 8)
+
+# First-pass distance per quantization mode; each must match the indexed
+# expression in QUANTIZED_INDEX_EXPRESSIONS for the index to be used
+FIRST_PASS_DISTANCES = {
+    "none": "dc.embedding <=> $1::vector",
+    "halfvec": f"dc.embedding::halfvec({EMBEDDING_DIM}) <=> $1::vector::halfvec({EMBEDDING_DIM})",
+    "binary": f"binary_quantize(dc.embedding)::bit({EMBEDDING_DIM}) <~> binary_quantize($1::vector)",
+}
+
+
+def _metadata_filter_sql(containment: bool, predicate: bool, first_param: int) -> Tuple[str, List[str]]:
+    """
+    Metadata conditions on document_chunks (alias dc) and their placeholder types.
+
+    Each filter shape gets its own statement, so unfiltered searches keep
+    plans that never consider the metadata index.
+    """
+    clauses, arg_types = [], []
+    if containment:
+        clauses.append(f"AND dc.metadata @> ${first_param + len(arg_types)}::jsonb")
+        arg_types.append("jsonb")
+    if predicate:
+        clauses.append(f"AND dc.metadata @@ ${first_param + len(arg_types)}::jsonpath")
+        arg_types.append("jsonpath")
+    return " ".join(clauses), arg_types
+
+
+def _statement_suffix(containment: bool, predicate: bool) -> str:
+    return ("_c" if containment else "") + ("_p" if predicate else "")
+
+
+def _search_statement(quantization: str, containment: bool = False, predicate: bool = False) -> PreparedStatement:
+    # $1 = query vector, $2 = similarity threshold, $3 = limit, $4 = first-pass candidates,
+    # $5 = collection (prunes the scan to that collection's partition), then the metadata filter
+    metadata_sql, metadata_types = _metadata_filter_sql(containment, predicate, 6)
+    return PreparedStatement(
+        name=f"semantic_search_v5_{quantization}{_statement_suffix(containment, predicate)}",
+        sql=f"""
+            SELECT
+                c.id,
+                c.text,
+                c.chunk_index,
+                c.document_id,
+                c.metadata,
+                d.created_at,
+                1 - c.distance / 2 AS similarity
+            FROM (
+                SELECT
+                    q.id, q.text, q.chunk_index, q.document_id, q.metadata,
+                    q.embedding <=> $1::vector AS distance
+                FROM (
+                    SELECT dc.id, dc.text, dc.chunk_index, dc.document_id, dc.metadata, dc.embedding
+                    FROM document_chunks dc
+                    WHERE dc.collection = $5::text {metadata_sql}
+                    ORDER BY {FIRST_PASS_DISTANCES[quantization]}
+                    LIMIT $4::int
+                ) q
+                ORDER BY distance
+                LIMIT $3::int
+            ) c
+            JOIN documents d ON c.document_id = d.id
+            WHERE 1 - c.distance / 2 >= $2::float8
+            ORDER BY c.distance
+        """,
+        arg_types=["vector", "float8", "int", "int", "text", *metadata_types]
+    )
+
+
+def _hybrid_search_statement(
+    quantization: str,
+    containment: bool = False,
+    predicate: bool = False
+) -> PreparedStatement:
+    # $1 = query vector, $2 = query text, $3 = candidates per retriever, $4 = RRF k,
+    # $5 = limit, $6 = first-pass vector candidates, $7 = collection, then the metadata filter
+    metadata_sql, metadata_types = _metadata_filter_sql(containment, predicate, 8)
+    return PreparedStatement(
+        name=f"hybrid_search_v5_{quantization}{_statement_suffix(containment, predicate)}",
+        sql=f"""
+            WITH vector_candidates AS (
+                SELECT id, row_number() OVER (ORDER BY distance) AS rank
+                FROM (
+                    SELECT q.id, q.embedding <=> $1::vector AS distance
+                    FROM (
+                        SELECT dc.id, dc.embedding
+                        FROM document_chunks dc
+                        WHERE dc.collection = $7::text {metadata_sql}
+                        ORDER BY {FIRST_PASS_DISTANCES[quantization]}
+                        LIMIT $6::int
+                    ) q
+                    ORDER BY distance
+                    LIMIT $3::int
+                ) v
+            ),
+            lexical_candidates AS (
+                SELECT id, row_number() OVER (ORDER BY lexical_score DESC) AS rank
+                FROM (
+                    SELECT dc.id, ts_rank_cd(dc.text_search, q) AS lexical_score
+                    FROM document_chunks dc, websearch_to_tsquery('{TEXT_SEARCH_CONFIG}', $2::text) q
+                    WHERE dc.collection = $7::text AND dc.text_search @@ q {metadata_sql}
+                    ORDER BY lexical_score DESC
+                    LIMIT $3::int
+                ) l
+            ),
+            fused AS (
+                SELECT
+                    COALESCE(v.id, l.id) AS id,
+                    COALESCE(1.0 / ($4::int + v.rank), 0) + COALESCE(1.0 / ($4::int + l.rank), 0) AS score,
+                    v.rank AS vector_rank,
+                    l.rank AS lexical_rank
+                FROM vector_candidates v
+                FULL OUTER JOIN lexical_candidates l ON v.id = l.id
+                ORDER BY score DESC
+                LIMIT $5::int
+            )
+            SELECT
+                c.id,
+                c.text,
+                c.chunk_index,
+                c.document_id,
+                c.metadata,
+                d.created_at,
+                1 - (c.embedding <=> $1::vector) / 2 AS similarity,
+                f.score,
+                f.vector_rank,
+                f.lexical_rank
+            FROM fused f
+            JOIN document_chunks c ON c.id = f.id AND c.collection = $7::text
+            JOIN documents d ON c.document_id = d.id
+            ORDER BY f.score DESC
+        """,
+        arg_types=["vector", "text", "int", "int", "int", "int", "text", *metadata_types]
+    )
+
+
+def _lateral_first_pass(quantization: str) -> str:
+    """First-pass distance against the current query of a multi-query statement."""
+    return FIRST_PASS_DISTANCES[quantization].replace("$1::vector", "q.query_vector::vector")
+
+
+def _search_many_statement(quantization: str, containment: bool = False, predicate: bool = False) -> PreparedStatement:
+    # Same parameters as _search_statement, except $1 = query vectors as text[] (one search per element)
+    metadata_sql, metadata_types = _metadata_filter_sql(containment, predicate, 6)
+    return PreparedStatement(
+        name=f"semantic_search_many_v1_{quantization}{_statement_suffix(containment, predicate)}",
+        sql=f"""
+            SELECT
+                q.ord,
+                r.id,
+                r.text,
+                r.chunk_index,
+                r.document_id,
+                r.metadata,
+                d.created_at,
+                1 - r.distance / 2 AS similarity
+            FROM unnest($1::text[]) WITH ORDINALITY AS q(query_vector, ord)
+            CROSS JOIN LATERAL (
+                SELECT c.id, c.text, c.chunk_index, c.document_id, c.metadata, c.distance
+                FROM (
+                    SELECT
+                        f.id, f.text, f.chunk_index, f.document_id, f.metadata,
+                        f.embedding <=> q.query_vector::vector AS distance
+                    FROM (
+                        SELECT dc.id, dc.text, dc.chunk_index, dc.document_id, dc.metadata, dc.embedding
+                        FROM document_chunks dc
+                        WHERE dc.collection = $5::text {metadata_sql}
+                        ORDER BY {_lateral_first_pass(quantization)}
+                        LIMIT $4::int
+                    ) f
+                    ORDER BY distance
+                    LIMIT $3::int
+                ) c
+                WHERE 1 - c.distance / 2 >= $2::float8
+            ) r
+            JOIN documents d ON r.document_id = d.id
+            ORDER BY q.ord, r.distance
+        """,
+        arg_types=["text[]", "float8", "int", "int", "text", *metadata_types]
+    )
+
+
+def _hybrid_search_many_statement(
+    quantization: str,
+    containment: bool = False,
+    predicate: bool = False
+) -> PreparedStatement:
+    # Same parameters as _hybrid_search_statement, except $1 = query vectors as text[] and
+    # $2 = query texts as text[] (one search per element pair)
+    metadata_sql, metadata_types = _metadata_filter_sql(containment, predicate, 8)
+    return PreparedStatement(
+        name=f"hybrid_search_many_v1_{quantization}{_statement_suffix(containment, predicate)}",
+        sql=f"""
+            SELECT
+                q.ord,
+                c.id,
+                c.text,
+                c.chunk_index,
+                c.document_id,
+                c.metadata,
+                d.created_at,
+                1 - (c.embedding <=> q.query_vector::vector) / 2 AS similarity,
+                f.score,
+                f.vector_rank,
+                f.lexical_rank
+            FROM unnest($1::text[], $2::text[]) WITH ORDINALITY AS q(query_vector, query_text, ord)
+            CROSS JOIN LATERAL (
+                SELECT
+                    COALESCE(v.id, l.id) AS id,
+                    COALESCE(1.0 / ($4::int + v.rank), 0) + COALESCE(1.0 / ($4::int + l.rank), 0) AS score,
+                    v.rank AS vector_rank,
+                    l.rank AS lexical_rank
+                FROM (
+                    SELECT id, row_number() OVER (ORDER BY distance) AS rank
+                    FROM (
+                        SELECT x.id, x.embedding <=> q.query_vector::vector AS distance
+                        FROM (
+                            SELECT dc.id, dc.embedding
+                            FROM document_chunks dc
+                            WHERE dc.collection = $7::text {metadata_sql}
+                            ORDER BY {_lateral_first_pass(quantization)}
+                            LIMIT $6::int
+                        ) x
+                        ORDER BY distance
+                        LIMIT $3::int
+                    ) vector_hits
+                ) v
+                FULL OUTER JOIN (
+                    SELECT id, row_number() OVER (ORDER BY lexical_score DESC) AS rank
+                    FROM (
+                        SELECT dc.id, ts_rank_cd(dc.text_search, ts) AS lexical_score
+                        FROM document_chunks dc, websearch_to_tsquery('{TEXT_SEARCH_CONFIG}', q.query_text) ts
+                        WHERE dc.collection = $7::text AND dc.text_search @@ ts {metadata_sql}
+                        ORDER BY lexical_score DESC
+                        LIMIT $3::int
+                    ) lexical_hits
+                ) l ON v.id = l.id
+                ORDER BY score DESC
+                LIMIT $5::int
+            ) f
+            JOIN document_chunks c ON c.id = f.id AND c.collection = $7::text
+            JOIN documents d ON c.document_id = d.id
+            ORDER BY q.ord, f.score DESC
+        """,
+        arg_types=["text[]", "text[]", "int", "int", "int", "int", "text", *metadata_types]
+    )
+
+
+# Keyed by (quantization, has containment filter, has jsonpath filter)
+STATEMENT_KEYS = list(itertools.product(FIRST_PASS_DISTANCES, (False, True), (False, True)))
+SEARCH_STATEMENTS = {key: _search_statement(*key) for key in STATEMENT_KEYS}
+HYBRID_SEARCH_STATEMENTS = {key: _hybrid_search_statement(*key) for key in STATEMENT_KEYS}
+SEARCH_MANY_STATEMENTS = {key: _search_many_statement(*key) for key in STATEMENT_KEYS}
+HYBRID_SEARCH_MANY_STATEMENTS = {key: _hybrid_search_many_statement(*key) for key in STATEMENT_KEYS}
+
+# Transaction-local setting, so it never leaks to other users of a pooled connection
+SET_CONFIG_SQL = text("SELECT set_config(:name, :value, true)")
+
+# Chunks within `window` positions of each (document, position) pair
+CONTEXT_SQL = text("""
+    SELECT c.document_id, c.chunk_index, c.text
+    FROM document_chunks c
+    JOIN unnest(CAST(:document_ids AS uuid[]), CAST(:chunk_indexes AS int[])) AS h(document_id, chunk_index)
+        ON c.document_id = h.document_id
+        AND c.chunk_index BETWEEN h.chunk_index - :window AND h.chunk_index + :window
+    WHERE c.collection = :collection
+""")
+
+PGVECTOR_VERSION_SQL = text("SELECT extversion FROM pg_extension WHERE extname = 'vector'")
+
+DOCUMENTS_SQL = text("SELECT id, text FROM documents WHERE id = ANY(CAST(:ids AS uuid[]))")
+
+# Stored vectors of result chunks, as plain arrays so neither driver needs the vector codec
+EMBEDDINGS_SQL = text("""
+    SELECT id, embedding::real[] AS embedding
+    FROM document_chunks
+    WHERE collection = :collection AND id = ANY(CAST(:ids AS uuid[]))
+""")
+
+
+class SearchBackend:
+    """
+    Nearest-neighbour search over stored chunk embeddings.
+
+    Backends return up to options.limit result dictionaries (per query for
+    the batched methods) with chunk_id, chunk_text, chunk_index, document_id,
+    metadata, created_at and similarity, apply the options' metadata filter
+    before ranking, and attach the fields requested by a projection. Tuning
+    options a backend has no use for are ignored.
+    """
+
+    name = ""
+    # False for backends that never touch Postgres; callers may then pass db=None
+    uses_database = True
+
+    def search(self, db: Session, query_embedding: List[float], options: SearchOptions) -> List[Dict]:
+        raise NotImplementedError
+
+    async def asearch(self, db: AsyncSession, query_embedding: List[float], options: SearchOptions) -> List[Dict]:
+        raise NotImplementedError
+
+    def hybrid_search(
+        self,
+        db: Session,
+        query_embedding: List[float],
+        query: str,
+        options: SearchOptions
+    ) -> List[Dict]:
+        raise NotImplementedError
+
+    async def ahybrid_search(
+        self,
+        db: AsyncSession,
+        query_embedding: List[float],
+        query: str,
+        options: SearchOptions
+    ) -> List[Dict]:
+        raise NotImplementedError
+
+    def search_many(
+        self,
+        db: Session,
+        query_embeddings: List[List[float]],
+        options: SearchOptions
+    ) -> List[List[Dict]]:
+        """
+        Run one search per query embedding in a single round trip.
+
+        Returns:
+            One result list per query embedding, in order
+        """
+        raise NotImplementedError
+
+    async def asearch_many(
+        self,
+        db: AsyncSession,
+        query_embeddings: List[List[float]],
+        options: SearchOptions
+    ) -> List[List[Dict]]:
+        raise NotImplementedError
+
+    def hybrid_search_many(
+        self,
+        db: Session,
+        query_embeddings: List[List[float]],
+        queries: List[str],
+        options: SearchOptions
+    ) -> List[List[Dict]]:
+        raise NotImplementedError
+
+    async def ahybrid_search_many(
+        self,
+        db: AsyncSession,
+        query_embeddings: List[List[float]],
+        queries: List[str],
+        options: SearchOptions
+    ) -> List[List[Dict]]:
+        raise NotImplementedError
+
+    def project(
+        self,
+        db: Session,
+        results: List[Dict],
+        projection: str,
+        context_window: int,
+        collection: str = DEFAULT_COLLECTION
+    ) -> List[Dict]:
+        raise NotImplementedError
+
+    async def aproject(
+        self,
+        db: AsyncSession,
+        results: List[Dict],
+        projection: str,
+        context_window: int,
+        collection: str = DEFAULT_COLLECTION
+    ) -> List[Dict]:
+        raise NotImplementedError
+
+    def embeddings(self, db: Session, results: List[Dict], collection: str = DEFAULT_COLLECTION) -> np.ndarray:
+        """
+        Stored embeddings of result chunks.
+
+        Returns:
+            float32 matrix with one row per result, in order (zeros for a chunk without a stored vector)
+        """
+        raise NotImplementedError
+
+    async def aembeddings(
+        self,
+        db: AsyncSession,
+        results: List[Dict],
+        collection: str = DEFAULT_COLLECTION
+    ) -> np.ndarray:
+        raise NotImplementedError
+
+    @staticmethod
+    def _check_projection(projection: str):
+        if projection not in SEARCH_PROJECTIONS:
+            raise ValueError(f"Unknown search projection: {projection}")
+
+
+class PgVectorBackend(SearchBackend):
+    """Search served by pgvector indexes in Postgres."""
+
+    name = "pgvector"
+    # Whether the server's pgvector has iterative index scans; checked once by check_server
+    iterative_scan = True
+
+    @classmethod
+    def check_server(cls, bind: Engine = engine) -> Optional[str]:
+        """
+        Read the installed pgvector version once, at startup.
+
+        Iterative index scans arrived in pgvector 0.8, and older servers
+        reject their settings, so filtered searches then run without them.
+
+        Returns:
+            The pgvector version, or None if the extension is not installed
+        """
+        with bind.connect() as conn:
+            version = conn.execute(PGVECTOR_VERSION_SQL).scalar()
+        numbers = tuple(int(part) for part in version.split(".")[:2] if part.isdigit()) if version else ()
+        cls.iterative_scan = numbers >= ITERATIVE_SCAN_MIN_VERSION
+        if not cls.iterative_scan and FILTERED_ITERATIVE_SCAN != "off":
+            logger.warning(
+                f"[DB] pgvector {version} has no iterative index scans (0.8+); "
+                "filtered searches may return fewer rows than the limit"
+            )
+        return version
+
+    def search(self, db: Session, query_embedding: List[float], options: SearchOptions) -> List[Dict]:
+        statement, first_pass, settings, filter_args = self._plan(SEARCH_STATEMENTS, options, options.limit)
+        self._set_all(db, settings)
+
+        # The vector is bound once and its distance computed once per row;
+        # the threshold is applied after the index-ordered LIMIT, which yields
+        # the same rows because similarity decreases monotonically with distance
+        with SEARCH_QUERY_SECONDS.labels(self.name, "vector").time():
+            result = statement.execute(
+                db,
+                to_vector_literal(query_embedding),
+                options.similarity_threshold,
+                options.limit,
+                first_pass,
+                options.collection,
+                *filter_args
+            )
+        return self._format_results(result)
+
+    async def asearch(self, db: AsyncSession, query_embedding: List[float], options: SearchOptions) -> List[Dict]:
+        statement, first_pass, settings, filter_args = self._plan(SEARCH_STATEMENTS, options, options.limit)
+        await self._aset_all(db, settings)
+
+        with SEARCH_QUERY_SECONDS.labels(self.name, "vector").time():
+            result = await statement.aexecute(
+                db,
+                query_embedding,
+                options.similarity_threshold,
+                options.limit,
+                first_pass,
+                options.collection,
+                *filter_args
+            )
+        return self._format_results(result)
+
+    def hybrid_search(
+        self,
+        db: Session,
+        query_embedding: List[float],
+        query: str,
+        options: SearchOptions
+    ) -> List[Dict]:
+        candidates = max(options.candidates, options.limit)
+        statement, first_pass, settings, filter_args = self._plan(HYBRID_SEARCH_STATEMENTS, options, candidates)
+        self._set_all(db, settings)
+        with SEARCH_QUERY_SECONDS.labels(self.name, "hybrid").time():
+            result = statement.execute(
+                db,
+                to_vector_literal(query_embedding),
+                query,
+                candidates,
+                options.rrf_k,
+                options.limit,
+                first_pass,
+                options.collection,
+                *filter_args
+            )
+        return self._format_results(result)
+
+    async def ahybrid_search(
+        self,
+        db: AsyncSession,
+        query_embedding: List[float],
+        query: str,
+        options: SearchOptions
+    ) -> List[Dict]:
+        candidates = max(options.candidates, options.limit)
+        statement, first_pass, settings, filter_args = self._plan(HYBRID_SEARCH_STATEMENTS, options, candidates)
+        await self._aset_all(db, settings)
+        with SEARCH_QUERY_SECONDS.labels(self.name, "hybrid").time():
+            result = await statement.aexecute(
+                db,
+                query_embedding,
+                query,
+                candidates,
+                options.rrf_k,
+                options.limit,
+                first_pass,
+                options.collection,
+                *filter_args
+            )
+        return self._format_results(result)
+
+    def search_many(
+        self,
+        db: Session,
+        query_embeddings: List[List[float]],
+        options: SearchOptions
+    ) -> List[List[Dict]]:
+        statement, first_pass, settings, filter_args = self._plan(SEARCH_MANY_STATEMENTS, options, options.limit)
+        self._set_all(db, settings)
+
+        # One LATERAL index scan per query vector in a single statement; the
+        # vectors travel as text so both drivers bind them without the vector codec
+        with SEARCH_QUERY_SECONDS.labels(self.name, "vector_many").time():
+            result = statement.execute(
+                db,
+                [to_vector_literal(embedding) for embedding in query_embeddings],
+                options.similarity_threshold,
+                options.limit,
+                first_pass,
+                options.collection,
+                *filter_args
+            )
+        return self._format_grouped_results(result, len(query_embeddings))
+
+    async def asearch_many(
+        self,
+        db: AsyncSession,
+        query_embeddings: List[List[float]],
+        options: SearchOptions
+    ) -> List[List[Dict]]:
+        statement, first_pass, settings, filter_args = self._plan(SEARCH_MANY_STATEMENTS, options, options.limit)
+        await self._aset_all(db, settings)
+
+        with SEARCH_QUERY_SECONDS.labels(self.name, "vector_many").time():
+            result = await statement.aexecute(
+                db,
+                [to_vector_literal(embedding) for embedding in query_embeddings],
+                options.similarity_threshold,
+                options.limit,
+                first_pass,
+                options.collection,
+                *filter_args
+            )
+        return self._format_grouped_results(result, len(query_embeddings))
+
+    def hybrid_search_many(
+        self,
+        db: Session,
+        query_embeddings: List[List[float]],
+        queries: List[str],
+        options: SearchOptions
+    ) -> List[List[Dict]]:
+        candidates = max(options.candidates, options.limit)
+        statement, first_pass, settings, filter_args = self._plan(HYBRID_SEARCH_MANY_STATEMENTS, options, candidates)
+        self._set_all(db, settings)
+        with SEARCH_QUERY_SECONDS.labels(self.name, "hybrid_many").time():
+            result = statement.execute(
+                db,
+                [to_vector_literal(embedding) for embedding in query_embeddings],
+                list(queries),
+                candidates,
+                options.rrf_k,
+                options.limit,
+                first_pass,
+                options.collection,
+                *filter_args
+            )
+        return self._format_grouped_results(result, len(query_embeddings))
+
+    async def ahybrid_search_many(
+        self,
+        db: AsyncSession,
+        query_embeddings: List[List[float]],
+        queries: List[str],
+        options: SearchOptions
+    ) -> List[List[Dict]]:
+        candidates = max(options.candidates, options.limit)
+        statement, first_pass, settings, filter_args = self._plan(HYBRID_SEARCH_MANY_STATEMENTS, options, candidates)
+        await self._aset_all(db, settings)
+        with SEARCH_QUERY_SECONDS.labels(self.name, "hybrid_many").time():
+            result = await statement.aexecute(
+                db,
+                [to_vector_literal(embedding) for embedding in query_embeddings],
+                list(queries),
+                candidates,
+                options.rrf_k,
+                options.limit,
+                first_pass,
+                options.collection,
+                *filter_args
+            )
+        return self._format_grouped_results(result, len(query_embeddings))
+
+    @classmethod
+    def _plan(
+        cls,
+        statements: Dict[tuple, PreparedStatement],
+        options: SearchOptions,
+        candidates: int
+    ) -> Tuple[PreparedStatement, int, List[tuple], List[str]]:
+        """
+        Statement, first-pass row count, index settings and filter parameters
+        for a search retrieving candidates rows from the vector index.
+        """
+        metadata_filter = options.metadata_filter
+        statement = cls._statement(statements, options.quantization, metadata_filter)
+        first_pass = cls._first_pass_limit(candidates, options.quantization, options.rerank_factor)
+        settings = cls._index_settings(
+            cls._ef_search(options.ef_search, first_pass), options.probes, metadata_filter is not None
+        )
+        return statement, first_pass, settings, cls._filter_args(metadata_filter)
+
+    @staticmethod
+    def _set_all(db: Session, settings: List[tuple]):
+        for name, value in settings:
+            db.execute(SET_CONFIG_SQL, {"name": name, "value": value})
+
+    @staticmethod
+    async def _aset_all(db: AsyncSession, settings: List[tuple]):
+        for name, value in settings:
+            await db.execute(SET_CONFIG_SQL, {"name": name, "value": value})
+
+    @staticmethod
+    def _statement(
+        statements: Dict[tuple, PreparedStatement],
+        quantization: str,
+        metadata_filter: Optional[MetadataFilter] = None
+    ) -> PreparedStatement:
+        if quantization not in FIRST_PASS_DISTANCES:
+            raise ValueError(f"Unknown vector quantization: {quantization}")
+        if metadata_filter is None:
+            return statements[(quantization, False, False)]
+        return statements[(quantization, bool(metadata_filter.containment), bool(metadata_filter.predicates))]
+
+    @staticmethod
+    def _filter_args(metadata_filter: Optional[MetadataFilter]) -> List[str]:
+        """Parameter values for the metadata conditions, in statement order."""
+        if metadata_filter is None:
+            return []
+        return [value for value in (metadata_filter.containment_json, metadata_filter.jsonpath) if value is not None]
+
+    @staticmethod
+    def _first_pass_limit(limit: int, quantization: str, rerank_factor: int) -> int:
+        """Rows fetched from the ANN index before the full-precision re-rank."""
+        if quantization == "none":
+            return limit
+        return limit * max(1, rerank_factor)
+
+    @staticmethod
+    def _ef_search(ef_search: Optional[int], first_pass: int) -> Optional[int]:
+        """HNSW returns at most ef_search rows, so widen it to cover a larger first pass."""
+        if ef_search is None and first_pass <= 40:  # pgvector's default ef_search
+            return None
+        return max(ef_search or 0, first_pass)
+
+    @classmethod
+    def _index_settings(cls, ef_search: Optional[int], probes: Optional[int], filtered: bool = False) -> List[tuple]:
+        """ANN recall parameters to set for a query, as (setting, value) pairs."""
+        settings = []
+        if ef_search is not None:
+            settings.append(("hnsw.ef_search", str(ef_search)))
+        if probes is not None:
+            settings.append(("ivfflat.probes", str(probes)))
+        if filtered:
+            # Plan each filtered execution with its actual filter values, so a
+            # selective filter pre-filters through the metadata index and exact
+            # distances instead of reusing a generic ANN plan
+            settings.append(("plan_cache_mode", "force_custom_plan"))
+            if FILTERED_ITERATIVE_SCAN != "off" and cls.iterative_scan:
+                settings.append(("hnsw.iterative_scan", FILTERED_ITERATIVE_SCAN))
+                settings.append(("ivfflat.iterative_scan", "relaxed_order"))
+        return settings
+
+    @classmethod
+    def apply_index_settings(
+        cls,
+        db: Session,
+        ef_search: Optional[int] = None,
+        probes: Optional[int] = None,
+        filtered: bool = False
+    ):
+        """
+        Set ANN recall parameters for the current transaction only.
+
+        Args:
+            db: Database session
+            ef_search: Value for hnsw.ef_search
+            probes: Value for ivfflat.probes
+            filtered: Enable iterative index scans and per-execution planning for a filtered query
+        """
+        cls._set_all(db, cls._index_settings(ef_search, probes, filtered))
+
+    def project(
+        self,
+        db: Session,
+        results: List[Dict],
+        projection: str,
+        context_window: int,
+        collection: str = DEFAULT_COLLECTION
+    ) -> List[Dict]:
+        """Attach the fields requested by the projection with one extra query at most."""
+        self._check_projection(projection)
+        if projection == "context" and results:
+            rows = db.execute(CONTEXT_SQL, self._context_params(results, context_window, collection))
+            self._attach_context(results, rows, context_window)
+        elif projection == "document" and results:
+            rows = db.execute(DOCUMENTS_SQL, {"ids": self._document_ids(results)})
+            self._attach_documents(results, rows)
+        return results
+
+    async def aproject(
+        self,
+        db: AsyncSession,
+        results: List[Dict],
+        projection: str,
+        context_window: int,
+        collection: str = DEFAULT_COLLECTION
+    ) -> List[Dict]:
+        """Async variant of project."""
+        self._check_projection(projection)
+        if projection == "context" and results:
+            rows = await db.execute(CONTEXT_SQL, self._context_params(results, context_window, collection))
+            self._attach_context(results, rows, context_window)
+        elif projection == "document" and results:
+            rows = await db.execute(DOCUMENTS_SQL, {"ids": self._document_ids(results)})
+            self._attach_documents(results, rows)
+        return results
+
+    def embeddings(self, db: Session, results: List[Dict], collection: str = DEFAULT_COLLECTION) -> np.ndarray:
+        rows = db.execute(EMBEDDINGS_SQL, self._embeddings_params(results, collection)) if results else []
+        return self._embedding_matrix(results, rows)
+
+    async def aembeddings(
+        self,
+        db: AsyncSession,
+        results: List[Dict],
+        collection: str = DEFAULT_COLLECTION
+    ) -> np.ndarray:
+        rows = await db.execute(EMBEDDINGS_SQL, self._embeddings_params(results, collection)) if results else []
+        return self._embedding_matrix(results, rows)
+
+    @staticmethod
+    def _embeddings_params(results: List[Dict], collection: str) -> Dict:
+        return {"ids": [result["chunk_id"] for result in results], "collection": collection}
+
+    @staticmethod
+    def _embedding_matrix(results: List[Dict], rows) -> np.ndarray:
+        vectors = {str(row.id): row.embedding for row in rows}
+        matrix = np.zeros((len(results), EMBEDDING_DIM), dtype=np.float32)
+        for position, result in enumerate(results):
+            vector = vectors.get(result["chunk_id"])
+            if vector is not None:
+                matrix[position] = vector
+        return matrix
+
+    @staticmethod
+    def _context_params(results: List[Dict], context_window: int, collection: str) -> Dict:
+        # Chunks stored before chunk_index existed have no position and get no neighbours
+        positioned = [result for result in results if result["chunk_index"] is not None]
+        return {
+            "document_ids": [result["document_id"] for result in positioned],
+            "chunk_indexes": [result["chunk_index"] for result in positioned],
+            "window": max(0, context_window),
+            "collection": collection,
+        }
+
+    @staticmethod
+    def _document_ids(results: List[Dict]) -> List[str]:
+        # Each document is fetched once, however many of its chunks matched
+        return list(dict.fromkeys(result["document_id"] for result in results))
+
+    @staticmethod
+    def _attach_context(results: List[Dict], rows, context_window: int):
+        """Give each result its window of chunks (itself included) in document order."""
+        chunks: Dict[str, Dict[int, str]] = {}
+        for row in rows:
+            chunks.setdefault(str(row.document_id), {})[row.chunk_index] = row.text
+        for result in results:
+            index = result["chunk_index"]
+            if index is None:
+                result["context"] = [{"chunk_index": None, "text": result["chunk_text"]}]
+                continue
+            positions = chunks.get(result["document_id"], {})
+            result["context"] = [
+                {"chunk_index": position, "text": positions[position]}
+                for position in range(index - context_window, index + context_window + 1)
+                if position in positions
+            ]
+
+    @staticmethod
+    def _attach_documents(results: List[Dict], rows):
+        texts = {str(row.id): row.text for row in rows}
+        for result in results:
+            result["document_text"] = texts.get(result["document_id"])
+
+    @staticmethod
+    def _format_results(result) -> List[Dict]:
+        """Convert search rows to result dictionaries."""
+        return [PgVectorBackend._format_row(row) for row in result]
+
+    @staticmethod
+    def _format_grouped_results(result, count: int) -> List[List[Dict]]:
+        """Convert multi-query search rows to one result list per query, using their 1-based ord column."""
+        grouped: List[List[Dict]] = [[] for _ in range(count)]
+        for row in result:
+            grouped[row.ord - 1].append(PgVectorBackend._format_row(row))
+        return grouped
+
+    @staticmethod
+    def _format_row(row) -> Dict:
+        item = {
+            "chunk_id": str(row.id),
+            "chunk_text": row.text,
+            "chunk_index": row.chunk_index,
+            "document_id": str(row.document_id),
+            "metadata": row.metadata or {},
+            "created_at": row.created_at.isoformat() if row.created_at else None,
+            "similarity": float(row.similarity)
+        }
+        # Hybrid search also reports the fused score and each retriever's rank
+        fields = row._mapping
+        if "score" in fields:
+            item["score"] = float(fields["score"])
+            item["vector_rank"] = fields["vector_rank"]
+            item["lexical_rank"] = fields["lexical_rank"]
+        return item
+
+
+class LocalIndexBackend(SearchBackend):
+    """
+    Search served by in-process LocalVectorIndex instances, one per collection.
+
+    No database is touched, so the db argument may be None.
+    There is no full-text index locally: hybrid search ranks by vector
+    similarity alone, and the "document" projection is unavailable.
+    """
+
+    name = "local"
+    uses_database = False
+
+    def __init__(self, path: str = LOCAL_INDEX_PATH):
+        """
+        Initialize the backend.
+
+        Args:
+            path: Directory holding one index directory per collection (loaded on first use)
+        """
+        self.path = path
+        self._indexes: Dict[str, LocalVectorIndex] = {}
+        self._lock = threading.Lock()
+
+    def index(self, collection: str = DEFAULT_COLLECTION) -> LocalVectorIndex:
+        """
+        Get the index of a collection.
+
+        Looking up a collection that has no index yet creates nothing on disk,
+        and its (empty) index is not kept, so one built later is picked up.
+        """
+        with self._lock:
+            index = self._indexes.get(collection)
+            if index is None:
+                index = LocalVectorIndex(os.path.join(self.path, validate_collection_name(collection)))
+                if os.path.isdir(index.path):
+                    self._indexes[collection] = index
+            return index
+
+    def has_collection(self, collection: str) -> bool:
+        """Whether an index has been built for a collection."""
+        return os.path.isdir(os.path.join(self.path, validate_collection_name(collection)))
+
+    def search(self, db, query_embedding, options):
+        predicate = None
+        metadata_filter = options.metadata_filter
+        if metadata_filter is not None:
+            def predicate(chunk: Dict) -> bool:
+                return metadata_filter.matches(chunk.get("metadata"))
+        results = self.index(options.collection).search(
+            query_embedding, limit=options.limit, similarity_threshold=options.similarity_threshold, predicate=predicate
+        )
+        for result in results:
+            result.setdefault("metadata", {})  # indexes built before metadata existed
+        return results
+
+    async def asearch(self, db, query_embedding, options):
+        # The matrix product releases the GIL, so scoring runs off the event loop
+        return await asyncio.to_thread(self.search, db, query_embedding, options)
+
+    def hybrid_search(self, db, query_embedding, query, options):
+        return self.search(db, query_embedding, self._vector_only(options))
+
+    async def ahybrid_search(self, db, query_embedding, query, options):
+        return await self.asearch(db, query_embedding, self._vector_only(options))
+
+    def search_many(self, db, query_embeddings, options):
+        return [self.search(db, query_embedding, options) for query_embedding in query_embeddings]
+
+    async def asearch_many(self, db, query_embeddings, options):
+        return await asyncio.to_thread(self.search_many, db, query_embeddings, options)
+
+    def hybrid_search_many(self, db, query_embeddings, queries, options):
+        return self.search_many(db, query_embeddings, self._vector_only(options))
+
+    async def ahybrid_search_many(self, db, query_embeddings, queries, options):
+        return await self.asearch_many(db, query_embeddings, self._vector_only(options))
+
+    @staticmethod
+    def _vector_only(options: SearchOptions) -> SearchOptions:
+        """Hybrid search falls back to vector ranking, which fusion does not threshold."""
+        return replace(options, similarity_threshold=0.0)
+
+    def project(self, db, results, projection, context_window, collection=DEFAULT_COLLECTION):
+        self._check_projection(projection)
+        if projection == "document":
+            raise ValueError("The local search backend does not store document text")
+        if projection == "context":
+            index = self.index(collection)
+            for result in results:
+                if result["chunk_index"] is None:
+                    result["context"] = [{"chunk_index": None, "text": result["chunk_text"]}]
+                else:
+                    result["context"] = index.context(
+                        result["document_id"], result["chunk_index"], max(0, context_window)
+                    )
+        return results
+
+    async def aproject(self, db, results, projection, context_window, collection=DEFAULT_COLLECTION):
+        return self.project(db, results, projection, context_window, collection)
+
+    def embeddings(self, db, results, collection=DEFAULT_COLLECTION):
+        return self.index(collection).vectors([(result["document_id"], result["chunk_index"]) for result in results])
+
+    async def aembeddings(self, db, results, collection=DEFAULT_COLLECTION):
+        return self.embeddings(db, results, collection)
+
+
+def create_search_backend(name: str = SEARCH_BACKEND, index_path: str = LOCAL_INDEX_PATH) -> SearchBackend:
+    """
+    Build the configured search backend.
+
+    Args:
+        name: "pgvector" or "local"
+        index_path: Directory of the per-collection local indexes (local backend only)
+
+    Returns:
+        SearchBackend instance
+
+    Raises:
+        ValueError: If the backend name is unknown
+    """
+    if name == "pgvector":
+        return PgVectorBackend()
+    if name == "local":
+        return LocalIndexBackend(index_path)
+    raise ValueError(f"Unknown search backend: {name}")
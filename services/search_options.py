@@ -0,0 +1,96 @@
+import os
+from dataclasses import dataclass, replace
+from typing import Any, Dict, Optional
+from database.models import VECTOR_QUANTIZATION, DEFAULT_COLLECTION
+from services.metadata_filter import MetadataFilter
+
+# Default per-query ANN recall settings (None keeps the server default)
+HNSW_EF_SEARCH = int(os.getenv("HNSW_EF_SEARCH")) if os.getenv("HNSW_EF_SEARCH") else None
+IVFFLAT_PROBES = int(os.getenv("IVFFLAT_PROBES")) if os.getenv("IVFFLAT_PROBES") else None
+
+# Quantized first pass: vectors fetched by the indexed (approximate) distance
+# before being re-ranked by exact float32 cosine distance
+RERANK_FACTOR = int(os.getenv("RERANK_FACTOR", "4"))
+
+# Hybrid search: candidates fetched from each retriever and the reciprocal rank fusion constant
+HYBRID_CANDIDATES = int(os.getenv("HYBRID_CANDIDATES", "50"))
+RRF_K = int(os.getenv("RRF_K", "60"))
+
+# Neighbouring chunks returned on each side of a hit for the "context" projection
+SEARCH_CONTEXT_WINDOW = int(os.getenv("SEARCH_CONTEXT_WINDOW", "1"))
+
+# Two-stage retrieval: fetch limit * SEARCH_OVERFETCH_FACTOR candidates, then
+# re-rank them with the cross-encoder and/or pick a diverse top-k with MMR
+SEARCH_RERANK = os.getenv("SEARCH_RERANK", "false").lower() == "true"
+SEARCH_OVERFETCH_FACTOR = int(os.getenv("SEARCH_OVERFETCH_FACTOR", "4"))
+# Relevance/diversity trade-off of MMR (1.0 = relevance only); unset disables MMR
+SEARCH_MMR_LAMBDA = float(os.getenv("SEARCH_MMR_LAMBDA")) if os.getenv("SEARCH_MMR_LAMBDA") else None
+
+
+@dataclass(frozen=True)
+class SearchOptions:
+    """
+    How a search runs, shared by every search method (sync, async and batched)
+    of SemanticSearchService and the search backends.
+
+    Attributes:
+        limit: Maximum number of results (per query for batched searches)
+        similarity_threshold: Vector search: minimum similarity score (0-1, higher = more similar)
+        candidates: Hybrid search: candidates taken from each retriever before fusion
+        rrf_k: Hybrid search: RRF constant; larger values flatten the rank contribution
+        collection: Collection searched
+        filters: Metadata filter expression (see MetadataFilter), applied inside the search query
+        ef_search: HNSW candidate list size for this query (higher = better recall, slower)
+        probes: Number of IVFFlat lists scanned for this query
+        quantization: Index used for the first pass: "none", "halfvec" or "binary"
+        rerank_factor: Quantized first-pass candidates per result, re-ranked at full precision
+        projection: "chunk", "context" (adds neighbouring chunks) or "document" (adds the full document text)
+        context_window: Neighbouring chunks on each side for the "context" projection
+        rerank: Re-rank the candidates with the cross-encoder reranker
+        mmr_lambda: Diversify the results with maximal marginal relevance (None disables it)
+        overfetch_factor: Candidates fetched per result when re-ranking or diversifying
+    """
+
+    limit: int = 5
+    similarity_threshold: float = 0.7
+    candidates: int = HYBRID_CANDIDATES
+    rrf_k: int = RRF_K
+    collection: str = DEFAULT_COLLECTION
+    filters: Optional[Dict[str, Any]] = None
+    ef_search: Optional[int] = HNSW_EF_SEARCH
+    probes: Optional[int] = IVFFLAT_PROBES
+    quantization: str = VECTOR_QUANTIZATION
+    rerank_factor: int = RERANK_FACTOR
+    projection: str = "chunk"
+    context_window: int = SEARCH_CONTEXT_WINDOW
+    rerank: bool = SEARCH_RERANK
+    mmr_lambda: Optional[float] = SEARCH_MMR_LAMBDA
+    overfetch_factor: int = SEARCH_OVERFETCH_FACTOR
+
+    @classmethod
+    def of(cls, options: Optional["SearchOptions"] = None, **overrides) -> "SearchOptions":
+        """
+        Options with individual fields replaced, e.g. SearchOptions.of(options, limit=10).
+
+        Raises:
+            TypeError: If an override is not a SearchOptions field
+        """
+        options = options or cls()
+        return replace(options, **overrides) if overrides else options
+
+    @property
+    def metadata_filter(self) -> Optional[MetadataFilter]:
+        """
+        The compiled metadata filter, or None without one.
+
+        Raises:
+            ValueError: If the filter expression is malformed
+        """
+        return MetadataFilter.parse(self.filters)
+
+    @property
+    def candidate_count(self) -> int:
+        """Rows retrieved in the first stage: over-fetched only when a second stage picks among them."""
+        if self.rerank or self.mmr_lambda is not None:
+            return self.limit * max(1, self.overfetch_factor)
+        return self.limit
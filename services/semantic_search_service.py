@@ -1,80 +1,380 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import text
-from database.models import DocumentChunk, Document
+from sqlalchemy.ext.asyncio import AsyncSession
 from services.embedding_service import EmbeddingService
+from services.search_backends import SearchBackend, create_search_backend
+from services.search_options import SearchOptions
+from services.reranker_service import RerankerService, get_reranker_service, maximal_marginal_relevance
+from utils.metrics import stage_timer
 from typing import List, Dict, Optional
+import asyncio
+import numpy as np
+import os
+
+# Default retrieval mode for the agent tool: "hybrid" or "vector"
+SEARCH_MODE = os.getenv("SEARCH_MODE", "hybrid")
 
 
 class SemanticSearchService:
-    def __init__(self, embedding_service: EmbeddingService):
+    """
+    Semantic, hybrid and batched search over stored document chunks.
+
+    Every search method takes a SearchOptions describing how the search runs
+    (defaults from the environment when omitted); individual fields may also
+    be given as keyword arguments, e.g. search(db, query, limit=10), and
+    replace the corresponding fields of options.
+    """
+
+    def __init__(
+        self,
+        embedding_service: EmbeddingService,
+        backend: Optional[SearchBackend] = None,
+        reranker: Optional[RerankerService] = None
+    ):
         """
         Initialize the semantic search service.
         
         Args:
             embedding_service: Instance of EmbeddingService for creating query embeddings
+            backend: Vector search backend (defaults to the one selected by SEARCH_BACKEND)
+            reranker: Cross-encoder for re-ranking (defaults to the shared RerankerService)
         """
         self.embedding_service = embedding_service
+        self.backend = backend or create_search_backend()
+        self._reranker = reranker
+    
+    @property
+    def reranker(self) -> RerankerService:
+        """Cross-encoder for the second stage (the shared one unless given), created on first use."""
+        if self._reranker is None:
+            self._reranker = get_reranker_service()
+        return self._reranker
+    
+    def search(self, db: Session, query: str, options: Optional[SearchOptions] = None, **overrides) -> List[Dict]:
+        """
+        Perform semantic search on stored document chunks.
+        
+        Args:
+            db: Database session
+            query: Search query text
+            options: How the search runs (see SearchOptions)
+            **overrides: SearchOptions fields replacing those of options
+            
+        Returns:
+            List of dictionaries containing chunk text, document info, and similarity score
+            
+        Raises:
+            ValueError: If the projection is unknown or the metadata filter is malformed
+            TypeError: If an override is not a SearchOptions field
+        """
+        options = SearchOptions.of(options, **overrides)
+        with stage_timer("search", "embed"):
+            query_embedding = self.embedding_service.create_embedding(query)
+        
+        return self.search_by_embedding(db, query_embedding, options, query=query)
+    
+    def search_by_embedding(
+        self,
+        db: Session,
+        query_embedding: List[float],
+        options: Optional[SearchOptions] = None,
+        query: Optional[str] = None,
+        **overrides
+    ) -> List[Dict]:
+        """
+        Perform semantic search with a precomputed query embedding.
+        
+        Args:
+            db: Database session
+            query_embedding: Embedding of the search query
+            options: How the search runs (see SearchOptions)
+            query: Search query text, required for re-ranking
+            **overrides: SearchOptions fields replacing those of options
+            
+        Returns:
+            List of dictionaries containing chunk text, document info, and similarity score
+        """
+        options = SearchOptions.of(options, **overrides)
+        with stage_timer("search", "retrieve", mode="vector", backend=self.backend.name):
+            results = self.backend.search(db, query_embedding, self._first_stage(options))
+        
+        results = self._refine(db, query, results, options)
+        
+        with stage_timer("search", "project"):
+            return self.backend.project(db, results, options.projection, options.context_window, options.collection)
     
-    def search(
+    async def asearch(
+        self,
+        db: AsyncSession,
+        query: str,
+        options: Optional[SearchOptions] = None,
+        **overrides
+    ) -> List[Dict]:
+        """Async variant of search for use on the event loop."""
+        options = SearchOptions.of(options, **overrides)
+        with stage_timer("search", "embed"):
+            query_embedding = await self.embedding_service.acreate_embedding(query)
+        
+        return await self.asearch_by_embedding(db, query_embedding, options, query=query)
+    
+    async def asearch_by_embedding(
+        self,
+        db: AsyncSession,
+        query_embedding: List[float],
+        options: Optional[SearchOptions] = None,
+        query: Optional[str] = None,
+        **overrides
+    ) -> List[Dict]:
+        """Async variant of search_by_embedding; db may also be an async connection."""
+        options = SearchOptions.of(options, **overrides)
+        with stage_timer("search", "retrieve", mode="vector", backend=self.backend.name):
+            results = await self.backend.asearch(db, query_embedding, self._first_stage(options))
+        
+        results = await self._arefine(db, query, results, options)
+        
+        with stage_timer("search", "project"):
+            return await self.backend.aproject(
+                db, results, options.projection, options.context_window, options.collection
+            )
+    
+    def hybrid_search(
         self,
         db: Session,
         query: str,
-        limit: int = 5,
-        similarity_threshold: float = 0.7
+        options: Optional[SearchOptions] = None,
+        **overrides
     ) -> List[Dict]:
         """
-        Perform semantic search on stored document chunks.
+        Hybrid search: full-text and vector candidates fused with reciprocal rank fusion.
+        
+        Both candidate lists are retrieved and fused in a single statement, so
+        exact terms (IDs, error codes, names) are found even when their
+        embedding is not close to the query's. options.candidates and
+        options.rrf_k tune the fusion; similarity_threshold does not apply.
         
         Args:
             db: Database session
             query: Search query text
-            limit: Maximum number of results to return
-            similarity_threshold: Minimum similarity score (0-1, higher = more similar)
+            options: How the search runs (see SearchOptions)
+            **overrides: SearchOptions fields replacing those of options
             
         Returns:
-            List of dictionaries containing chunk text, document info, and similarity score
+            List of result dictionaries with RRF score and per-retriever ranks
         """
-        # Create embedding for the query
-        query_embedding = self.embedding_service.create_embedding(query)
-        
- 
-        embedding_array = ','.join(map(str, query_embedding))
-        
-        sql_query = text(f"""
-            SELECT 
-                dc.id,
-                dc.text,
-                dc.document_id,
-                d.text as document_text,
-                d.created_at,
-                1 - (dc.embedding <=> ARRAY[{embedding_array}]::vector) / 2 as similarity
-            FROM document_chunks dc
-            JOIN documents d ON dc.document_id = d.id
-            WHERE 1 - (dc.embedding <=> ARRAY[{embedding_array}]::vector) / 2 >= :threshold
-            ORDER BY dc.embedding <=> ARRAY[{embedding_array}]::vector
-            LIMIT :limit
-        """)
-        
-        result = db.execute(
-            sql_query,
-            {
-                "threshold": similarity_threshold,
-                "limit": limit
-            }
-        )
-        
-        results = []
-        for row in result:
-            results.append({
-                "chunk_id": str(row.id),
-                "chunk_text": row.text,
-                "document_id": str(row.document_id),
-                "document_text": row.document_text,
-                "created_at": row.created_at.isoformat() if row.created_at else None,
-                "similarity": float(row.similarity)
-            })
-        
-        return results
+        options = SearchOptions.of(options, **overrides)
+        with stage_timer("search", "embed"):
+            query_embedding = self.embedding_service.create_embedding(query)
+        
+        with stage_timer("search", "retrieve", mode="hybrid", backend=self.backend.name):
+            results = self.backend.hybrid_search(db, query_embedding, query, self._first_stage(options))
+        
+        results = self._refine(db, query, results, options)
+        
+        with stage_timer("search", "project"):
+            return self.backend.project(db, results, options.projection, options.context_window, options.collection)
+    
+    async def ahybrid_search(
+        self,
+        db: AsyncSession,
+        query: str,
+        options: Optional[SearchOptions] = None,
+        **overrides
+    ) -> List[Dict]:
+        """Async variant of hybrid_search."""
+        options = SearchOptions.of(options, **overrides)
+        with stage_timer("search", "embed"):
+            query_embedding = await self.embedding_service.acreate_embedding(query)
+        
+        return await self.ahybrid_search_by_embedding(db, query, query_embedding, options)
+    
+    async def ahybrid_search_by_embedding(
+        self,
+        db: AsyncSession,
+        query: str,
+        query_embedding: List[float],
+        options: Optional[SearchOptions] = None,
+        **overrides
+    ) -> List[Dict]:
+        """
+        Async hybrid search with a precomputed query embedding.
+        
+        Args:
+            db: Async database session or connection
+            query: Search query text, for the full-text retriever
+            query_embedding: Embedding of the search query
+            options: How the search runs (see SearchOptions)
+            **overrides: SearchOptions fields replacing those of options
+            
+        Returns:
+            List of result dictionaries with RRF score and per-retriever ranks
+        """
+        options = SearchOptions.of(options, **overrides)
+        with stage_timer("search", "retrieve", mode="hybrid", backend=self.backend.name):
+            results = await self.backend.ahybrid_search(db, query_embedding, query, self._first_stage(options))
+        
+        results = await self._arefine(db, query, results, options)
+        
+        with stage_timer("search", "project"):
+            return await self.backend.aproject(
+                db, results, options.projection, options.context_window, options.collection
+            )
+    
+    async def asearch_many_by_embedding(
+        self,
+        db: AsyncSession,
+        queries: List[str],
+        query_embeddings: List[List[float]],
+        options: Optional[SearchOptions] = None,
+        **overrides
+    ) -> List[List[Dict]]:
+        """
+        Vector search for several queries at once.
+        
+        The backend answers all queries with one statement, and the second
+        stage and projection run over every query's results together, so a
+        batch costs about as many round trips as a single search.
+        
+        Args:
+            db: Async database session or connection
+            queries: Search query texts, for re-ranking
+            query_embeddings: Embedding of each query, in the same order
+            options: How the search runs (see SearchOptions); limit applies per query
+            **overrides: SearchOptions fields replacing those of options
+            
+        Returns:
+            One result list per query, in order
+        """
+        options = SearchOptions.of(options, **overrides)
+        with stage_timer("search", "retrieve", mode="vector", backend=self.backend.name, queries=len(queries)):
+            result_lists = await self.backend.asearch_many(db, query_embeddings, self._first_stage(options))
+        
+        return await self._arefine_and_project_many(db, queries, result_lists, options)
+    
+    async def ahybrid_search_many_by_embedding(
+        self,
+        db: AsyncSession,
+        queries: List[str],
+        query_embeddings: List[List[float]],
+        options: Optional[SearchOptions] = None,
+        **overrides
+    ) -> List[List[Dict]]:
+        """
+        Hybrid search for several queries at once, in one backend statement.
+        
+        Args:
+            db: Async database session or connection
+            queries: Search query texts, for the full-text retriever
+            query_embeddings: Embedding of each query, in the same order
+            options: How the search runs (see SearchOptions); limit applies per query
+            **overrides: SearchOptions fields replacing those of options
+            
+        Returns:
+            One result list per query, in order
+        """
+        options = SearchOptions.of(options, **overrides)
+        with stage_timer("search", "retrieve", mode="hybrid", backend=self.backend.name, queries=len(queries)):
+            result_lists = await self.backend.ahybrid_search_many(
+                db, query_embeddings, queries, self._first_stage(options)
+            )
+        
+        return await self._arefine_and_project_many(db, queries, result_lists, options)
+    
+    async def _arefine_and_project_many(
+        self,
+        db: AsyncSession,
+        queries: List[str],
+        result_lists: List[List[Dict]],
+        options: SearchOptions
+    ) -> List[List[Dict]]:
+        """Second stage and projection for a batch of searches."""
+        if options.rerank:
+            # Every query's pairs are submitted at once and share the reranker's micro-batches
+            with stage_timer("search", "rerank", candidates=sum(map(len, result_lists))):
+                scores = await asyncio.gather(*(
+                    self.reranker.ascore(query, [result["chunk_text"] for result in results])
+                    for query, results in zip(queries, result_lists)
+                ))
+            result_lists = [self._order_by_scores(results, s) for results, s in zip(result_lists, scores)]
+        # MMR reads stored vectors over the one connection, so it runs query by query
+        diversify = SearchOptions.of(options, rerank=False)
+        result_lists = [
+            await self._arefine(db, query, results, diversify)
+            for query, results in zip(queries, result_lists)
+        ]
+        
+        with stage_timer("search", "project"):
+            # Projection fills in the result dictionaries, so one call covers every list
+            await self.backend.aproject(
+                db,
+                [result for results in result_lists for result in results],
+                options.projection,
+                options.context_window,
+                options.collection
+            )
+        return result_lists
+    
+    @staticmethod
+    def _first_stage(options: SearchOptions) -> SearchOptions:
+        """Options for the backend retrieval, over-fetching when a second stage picks among the rows."""
+        return SearchOptions.of(options, limit=options.candidate_count)
+    
+    def _refine(self, db: Session, query: Optional[str], results: List[Dict], options: SearchOptions) -> List[Dict]:
+        """
+        Second retrieval stage: re-rank the candidates, diversify them, and keep the top limit.
+        
+        Raises:
+            ValueError: If re-ranking is requested without the query text
+        """
+        if options.rerank and results:
+            with stage_timer("search", "rerank", candidates=len(results)):
+                scores = self.reranker.score(self._require_query(query), [result["chunk_text"] for result in results])
+            results = self._order_by_scores(results, scores)
+        if options.mmr_lambda is not None and len(results) > options.limit:
+            with stage_timer("search", "mmr", candidates=len(results)):
+                vectors = self.backend.embeddings(db, results, options.collection)
+                results = self._diversify(results, vectors, options.limit, options.mmr_lambda)
+        return results[:options.limit]
+    
+    async def _arefine(
+        self,
+        db: AsyncSession,
+        query: Optional[str],
+        results: List[Dict],
+        options: SearchOptions
+    ) -> List[Dict]:
+        """Async variant of _refine."""
+        if options.rerank and results:
+            with stage_timer("search", "rerank", candidates=len(results)):
+                scores = await self.reranker.ascore(
+                    self._require_query(query), [result["chunk_text"] for result in results]
+                )
+            results = self._order_by_scores(results, scores)
+        if options.mmr_lambda is not None and len(results) > options.limit:
+            with stage_timer("search", "mmr", candidates=len(results)):
+                vectors = await self.backend.aembeddings(db, results, options.collection)
+                results = self._diversify(results, vectors, options.limit, options.mmr_lambda)
+        return results[:options.limit]
+    
+    @staticmethod
+    def _require_query(query: Optional[str]) -> str:
+        if query is None:
+            raise ValueError("Re-ranking needs the query text")
+        return query
+    
+    @staticmethod
+    def _order_by_scores(results: List[Dict], scores: List[float]) -> List[Dict]:
+        """Attach cross-encoder scores and sort by them, best first."""
+        for result, score in zip(results, scores):
+            result["rerank_score"] = score
+        return sorted(results, key=lambda result: result["rerank_score"], reverse=True)
+    
+    @staticmethod
+    def _diversify(results: List[Dict], vectors: np.ndarray, limit: int, mmr_lambda: float) -> List[Dict]:
+        """MMR over the candidates; relevance is the cross-encoder score (squashed to 0-1) or the similarity."""
+        if "rerank_score" in results[0]:
+            relevance = 1 / (1 + np.exp(-np.array([result["rerank_score"] for result in results])))
+        else:
+            relevance = np.array([result["similarity"] for result in results])
+        return [results[index] for index in maximal_marginal_relevance(vectors, relevance, limit, mmr_lambda)]
     
     def search_simple(
         self,
@@ -93,6 +393,6 @@ class SemanticSearchService:
         Returns:
             List of chunk texts ordered by similarity
         """
-        results = self.search(db, query, limit)
+        results = self.search(db, query, limit=limit)
         return [result["chunk_text"] for result in results]
 
@@ -0,0 +1,178 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import List, Optional
+from langchain_core.messages import BaseMessage, messages_from_dict, messages_to_dict
+from sqlalchemy import delete
+from sqlalchemy.dialects.postgresql import insert
+from database.database import AsyncSessionLocal
+from database.models import ChatSession
+
+# Where chat sessions are kept: "postgres" (chat_sessions table) or "sqlite"
+CHAT_SESSION_STORE = os.getenv("CHAT_SESSION_STORE", "postgres")
+CHAT_SESSION_SQLITE_PATH = os.getenv("CHAT_SESSION_SQLITE_PATH", "data/chat_sessions.db")
+
+
+@dataclass
+class SessionState:
+    """Compact state of a conversation: summary of older turns plus the recent turns verbatim."""
+    session_id: str
+    summary: str = ""
+    messages: List[BaseMessage] = field(default_factory=list)
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    updated_at: datetime = field(default_factory=datetime.utcnow)
+
+
+class SessionStore:
+    """Persistence for chat session state, shared by every worker pointing at the same store."""
+
+    name = ""
+
+    async def aload(self, session_id: str) -> Optional[SessionState]:
+        raise NotImplementedError
+
+    async def asave(self, state: SessionState):
+        raise NotImplementedError
+
+    async def adelete(self, session_id: str) -> bool:
+        raise NotImplementedError
+
+
+class PostgresSessionStore(SessionStore):
+    """Sessions in the chat_sessions table of the application database."""
+
+    name = "postgres"
+
+    async def aload(self, session_id: str) -> Optional[SessionState]:
+        async with AsyncSessionLocal() as db:
+            row = await db.get(ChatSession, session_id)
+        if row is None:
+            return None
+        return SessionState(
+            session_id=row.id,
+            summary=row.summary,
+            messages=messages_from_dict(row.messages),
+            created_at=row.created_at,
+            updated_at=row.updated_at
+        )
+
+    async def asave(self, state: SessionState):
+        values = {
+            "id": state.session_id,
+            "summary": state.summary,
+            "messages": messages_to_dict(state.messages),
+            "created_at": state.created_at,
+            "updated_at": state.updated_at,
+        }
+        statement = insert(ChatSession).values(**values)
+        statement = statement.on_conflict_do_update(
+            index_elements=[ChatSession.id],
+            set_={
+                "summary": statement.excluded.summary,
+                "messages": statement.excluded.messages,
+                "updated_at": statement.excluded.updated_at,
+            }
+        )
+        async with AsyncSessionLocal() as db:
+            await db.execute(statement)
+            await db.commit()
+
+    async def adelete(self, session_id: str) -> bool:
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(delete(ChatSession).where(ChatSession.id == session_id))
+            await db.commit()
+        return result.rowcount > 0
+
+
+class SQLiteSessionStore(SessionStore):
+    """Sessions in a local SQLite file, for single-host deployments without Postgres."""
+
+    name = "sqlite"
+
+    def __init__(self, path: str = CHAT_SESSION_SQLITE_PATH):
+        """
+        Open (and create if needed) the session database.
+
+        Args:
+            path: SQLite file
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS chat_sessions ("
+            "id TEXT PRIMARY KEY, summary TEXT NOT NULL, messages TEXT NOT NULL, "
+            "created_at TEXT NOT NULL, updated_at TEXT NOT NULL)"
+        )
+        self._db.commit()
+
+    async def aload(self, session_id: str) -> Optional[SessionState]:
+        return await asyncio.to_thread(self._load, session_id)
+
+    async def asave(self, state: SessionState):
+        await asyncio.to_thread(self._save, state)
+
+    async def adelete(self, session_id: str) -> bool:
+        return await asyncio.to_thread(self._delete, session_id)
+
+    def _load(self, session_id: str) -> Optional[SessionState]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT summary, messages, created_at, updated_at FROM chat_sessions WHERE id = ?", (session_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return SessionState(
+            session_id=session_id,
+            summary=row[0],
+            messages=messages_from_dict(json.loads(row[1])),
+            created_at=datetime.fromisoformat(row[2]),
+            updated_at=datetime.fromisoformat(row[3])
+        )
+
+    def _save(self, state: SessionState):
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO chat_sessions (id, summary, messages, created_at, updated_at) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(id) DO UPDATE SET summary = excluded.summary, messages = excluded.messages, "
+                "updated_at = excluded.updated_at",
+                (
+                    state.session_id, state.summary, json.dumps(messages_to_dict(state.messages)),
+                    state.created_at.isoformat(), state.updated_at.isoformat()
+                )
+            )
+            self._db.commit()
+
+    def _delete(self, session_id: str) -> bool:
+        with self._lock:
+            cursor = self._db.execute("DELETE FROM chat_sessions WHERE id = ?", (session_id,))
+            self._db.commit()
+        return cursor.rowcount > 0
+
+
+def create_session_store(name: str = CHAT_SESSION_STORE, path: str = CHAT_SESSION_SQLITE_PATH) -> SessionStore:
+    """
+    Build the configured session store.
+
+    Args:
+        name: "postgres" or "sqlite"
+        path: SQLite file (sqlite store only)
+
+    Returns:
+        SessionStore instance
+
+    Raises:
+        ValueError: If the store name is unknown
+    """
+    if name == "postgres":
+        return PostgresSessionStore()
+    if name == "sqlite":
+        return SQLiteSessionStore(path)
+    raise ValueError(f"Unknown chat session store: {name}")
@@ -1,7 +1,45 @@
 from sqlalchemy.orm import Session
-from database.models import Document, DocumentChunk
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete, update, func
+from database.models import Document, DocumentChunk, DEFAULT_COLLECTION, utc_now
 from services.embedding_service import EmbeddingService
-from typing import List
+from services.chunking import Chunker, CHUNKING_STRATEGY, RESERVED_TOKENS
+from utils.metrics import stage_timer
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import asyncio
+import hashlib
+import uuid
+
+
+def content_hash(text: str, *settings: Any) -> str:
+    """
+    Hash text content for change detection.
+    
+    Args:
+        text: Document or chunk text
+        *settings: Anything else the stored result depends on (model
+            fingerprint, chunking parameters), hashed along with the text
+        
+    Returns:
+        Hex SHA-256 digest of the settings and the UTF-8 encoded text
+    """
+    digest = hashlib.sha256()
+    for setting in settings:
+        digest.update(f"{setting}\0".encode("utf-8"))
+    digest.update(text.encode("utf-8"))
+    return digest.hexdigest()
+
+
+@dataclass
+class UpsertResult:
+    document_id: uuid.UUID
+    status: str  # "created", "updated" or "unchanged"
+    chunks_count: int
+    chunks_added: int
+    chunks_removed: int
+    chunks_unchanged: int
+    embeddings_reused: int
 
 
 class StoreEmbeddingService:
@@ -14,49 +52,81 @@ class StoreEmbeddingService:
         """
         self.embedding_service = embedding_service
     
-    def chunk_text(self, text: str, chunk_size: int = 500, overlap: int = 50) -> List[str]:
+    def chunk_text(
+        self,
+        text: str,
+        chunk_size: int = 500,
+        overlap: int = 50,
+        strategy: str = CHUNKING_STRATEGY
+    ) -> List[str]:
         """
         Split text into chunks with optional overlap.
         
         Args:
             text: Text to chunk
-            chunk_size: Maximum size of each chunk in characters
-            overlap: Number of characters to overlap between chunks
+            chunk_size: Maximum size of each chunk in model tokens (characters for
+                the "characters" strategy), capped at the model's context window
+            overlap: Tokens (or characters) to overlap between chunks
+            strategy: Chunking strategy ("recursive", "sentence", "paragraph", "characters")
             
         Returns:
             List of text chunks
         """
-        if len(text) <= chunk_size:
-            return [text]
-        
-        chunks = []
-        start = 0
+        return list(self.iter_chunks(text, chunk_size, overlap, strategy))
+    
+    def iter_chunks(
+        self,
+        text: str,
+        chunk_size: int = 500,
+        overlap: int = 50,
+        strategy: str = CHUNKING_STRATEGY
+    ) -> Iterator[str]:
+        """
+        Lazily split text into chunks; same arguments as chunk_text.
         
-        while start < len(text):
-            end = start + chunk_size
-            chunk = text[start:end]
-            
-            # Try to break at sentence boundary if possible
-            if end < len(text):
-                # Look for sentence endings near the end
-                for punct in ['. ', '.\n', '! ', '!\n', '? ', '?\n']:
-                    last_punct = chunk.rfind(punct)
-                    if last_punct > chunk_size * 0.7:  # If found in last 30% of chunk
-                        chunk = chunk[:last_punct + 1]
-                        end = start + len(chunk)
-                        break
-            
-            chunks.append(chunk.strip())
-            start = end - overlap  # Overlap for context
+        Yields:
+            Text chunks in document order
+        """
+        if strategy == "characters":
+            chunker = Chunker(max_tokens=chunk_size, overlap_tokens=overlap, strategy=strategy)
+        else:
+            budget = self.embedding_service.n_ctx - RESERVED_TOKENS
+            chunker = Chunker(
+                count_tokens=self.embedding_service.count_tokens,
+                max_tokens=min(chunk_size, budget),
+                overlap_tokens=overlap,
+                strategy=strategy
+            )
+        return chunker.iter_chunks(text)
+    
+    def document_hash(
+        self,
+        text: str,
+        chunk_size: int = 500,
+        overlap: int = 50,
+        strategy: str = CHUNKING_STRATEGY
+    ) -> str:
+        """
+        Hash deciding whether a stored document is unchanged.
         
-        return chunks
+        Covers the text and everything its stored chunks depend on: the
+        chunking parameters and the embedding model.
+        """
+        return content_hash(text, self.embedding_service.cache_namespace, strategy, chunk_size, overlap)
+    
+    def chunk_hash(self, chunk_text: str) -> str:
+        """Hash of a chunk's text and the embedding model; equal hashes may share a vector."""
+        return content_hash(chunk_text, self.embedding_service.cache_namespace)
     
     def store_document_with_chunks(
         self, 
         db: Session, 
         text: str, 
         chunk_size: int = 500, 
-        overlap: int = 50
+        overlap: int = 50,
+        strategy: str = CHUNKING_STRATEGY,
+        collection: str = DEFAULT_COLLECTION,
+        metadata: Optional[Dict[str, Any]] = None
     ) -> Document:
         """
         Store a document and its chunks with embeddings in the database.
@@ -66,36 +136,349 @@ class StoreEmbeddingService:
             text: Text to store
             chunk_size: Maximum size of each chunk
             overlap: Overlap between chunks
+            strategy: Chunking strategy
+            collection: Collection the document belongs to
+            metadata: Filterable document attributes, copied onto every chunk
             
         Returns:
             Created Document object
         """
         # Create document
-        document = Document(text=text)
+        metadata = metadata or {}
+        document = Document(
+            collection=collection,
+            text=text,
+            content_hash=self.document_hash(text, chunk_size, overlap, strategy),
+            metadata_=metadata
+        )
         db.add(document)
         db.flush()  # Flush to get the document ID
         
         # Chunk the text
-        chunks = self.chunk_text(text, chunk_size, overlap)
+        with stage_timer("store", "chunk"):
+            chunks = self.chunk_text(text, chunk_size, overlap, strategy)
         
-        # Create chunks with embeddings
-        for chunk_text in chunks:
-            if not chunk_text.strip():
-                continue
+        # Embed all chunks in one batch
+        chunks = [chunk_text for chunk_text in chunks if chunk_text.strip()]
+        with stage_timer("store", "embed", chunks=len(chunks)):
+            embeddings = self.embedding_service.create_embeddings(chunks)
+        
+        with stage_timer("store", "write"):
+            # Create chunk records
+            for chunk_index, (chunk_text, embedding) in enumerate(zip(chunks, embeddings)):
+                chunk = DocumentChunk(
+                    collection=collection,
+                    document_id=document.id,
+                    text=chunk_text,
+                    chunk_index=chunk_index,
+                    content_hash=self.chunk_hash(chunk_text),
+                    metadata_=metadata,
+                    embedding=embedding
+                )
+                db.add(chunk)
             
-            # Create embedding for chunk
-            embedding = self.embedding_service.create_embedding(chunk_text)
+            # Commit all changes
+            db.commit()
+            db.refresh(document)
+        
+        return document
+
+    async def astore_document_with_chunks(
+        self, 
+        db: AsyncSession, 
+        text: str, 
+        chunk_size: int = 500, 
+        overlap: int = 50,
+        strategy: str = CHUNKING_STRATEGY,
+        collection: str = DEFAULT_COLLECTION,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> Tuple[Document, int]:
+        """
+        Async variant of store_document_with_chunks.
+        
+        Chunks are embedded before any database work starts, so no connection
+        is held while inference runs.
+        
+        Args:
+            db: Async database session
+            text: Text to store
+            chunk_size: Maximum size of each chunk
+            overlap: Overlap between chunks
+            strategy: Chunking strategy
+            collection: Collection the document belongs to
+            metadata: Filterable document attributes, copied onto every chunk
             
-            # Create chunk record
-            chunk = DocumentChunk(
+        Returns:
+            Tuple of the created Document object and the number of chunks stored
+        """
+        # Chunking tokenizes the whole text, so keep it off the event loop
+        with stage_timer("store", "chunk"):
+            chunks = await asyncio.to_thread(self.chunk_text, text, chunk_size, overlap, strategy)
+        with stage_timer("store", "embed", chunks=len(chunks)):
+            embeddings = await self.embedding_service.acreate_embeddings(chunks)
+        
+        metadata = metadata or {}
+        document = Document(
+            id=uuid.uuid4(),
+            collection=collection,
+            text=text,
+            content_hash=self.document_hash(text, chunk_size, overlap, strategy),
+            metadata_=metadata
+        )
+        db.add(document)
+        db.add_all([
+            DocumentChunk(
+                collection=collection,
                 document_id=document.id,
                 text=chunk_text,
+                chunk_index=chunk_index,
+                content_hash=self.chunk_hash(chunk_text),
+                metadata_=metadata,
                 embedding=embedding
             )
-            db.add(chunk)
+            for chunk_index, (chunk_text, embedding) in enumerate(zip(chunks, embeddings))
+        ])
         
-        # Commit all changes
-        db.commit()
-        db.refresh(document)
+        with stage_timer("store", "write"):
+            await db.commit()
         
-        return document
+        return document, len(chunks)
+    
+    async def aupsert_document(
+        self,
+        db: AsyncSession,
+        external_id: str,
+        text: str,
+        chunk_size: int = 500,
+        overlap: int = 50,
+        strategy: str = CHUNKING_STRATEGY,
+        collection: str = DEFAULT_COLLECTION,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> UpsertResult:
+        """
+        Create or update the document with the given external ID.
+        
+        Unchanged documents (same text, chunking parameters and embedding
+        model) are left untouched, and a metadata-only change rewrites metadata
+        without chunking or embedding. Otherwise the new chunks are diffed
+        against the stored ones by content hash: matching chunks keep their
+        rows and vectors, stale chunks are deleted, and only new chunk texts
+        are embedded (reusing any vector of the same model stored in the
+        collection before falling back to inference). Embedding happens before
+        the document row is locked, so the lock is held only for the writes.
+        
+        Args:
+            db: Async database session
+            external_id: Caller-supplied document ID, unique within the collection
+            text: Full document text
+            chunk_size: Maximum size of each chunk
+            overlap: Overlap between chunks
+            strategy: Chunking strategy
+            collection: Collection the document belongs to
+            metadata: Filterable document attributes; None keeps the stored metadata
+            
+        Returns:
+            UpsertResult describing what changed
+        """
+        document_hash = self.document_hash(text, chunk_size, overlap, strategy)
+        
+        # Chunk and embed before locking the document: inference can take
+        # seconds, and neither the row lock nor a pooled connection should be
+        # held meanwhile. The diff is redone under the lock, so a concurrent
+        # change only costs embedding the few chunks it made unexpected.
+        chunks, prepared = None, {}
+        stored = (await db.execute(
+            select(Document.id, Document.content_hash)
+            .where(Document.collection == collection, Document.external_id == external_id)
+        )).one_or_none()
+        if stored is None or stored.content_hash != document_hash:
+            with stage_timer("upsert", "chunk"):
+                chunks = await asyncio.to_thread(self.chunk_text, text, chunk_size, overlap, strategy)
+            known = set()
+            if stored is not None:
+                known = set((await db.scalars(
+                    select(DocumentChunk.content_hash)
+                    .where(DocumentChunk.collection == collection, DocumentChunk.document_id == stored.id)
+                )).all())
+            pending = {}
+            for chunk_text in chunks:
+                chunk_hash = self.chunk_hash(chunk_text)
+                if chunk_hash not in known:
+                    pending.setdefault(chunk_hash, chunk_text)
+            prepared = await self._astored_embeddings(db, collection, list(pending))
+            await db.rollback()  # end the read transaction, returning its connection to the pool
+            missing = [chunk_hash for chunk_hash in pending if chunk_hash not in prepared]
+            with stage_timer("upsert", "embed", chunks=len(missing)):
+                computed = await self.embedding_service.acreate_embeddings(
+                    [pending[chunk_hash] for chunk_hash in missing]
+                )
+            reused_hashes = set(prepared)
+            prepared.update(zip(missing, computed))
+        else:
+            reused_hashes = set()
+        
+        document = (await db.execute(
+            select(Document)
+            .where(Document.collection == collection, Document.external_id == external_id)
+            .with_for_update()
+        )).scalar_one_or_none()
+        
+        metadata_changed = document is not None and metadata is not None and metadata != document.metadata_
+        if metadata is None:
+            metadata = document.metadata_ if document is not None else {}
+        
+        if document is not None and document.content_hash == document_hash:
+            document_id = document.id  # the rollback below expires the instance
+            chunks_count = await db.scalar(
+                select(func.count(DocumentChunk.id))
+                .where(DocumentChunk.collection == collection, DocumentChunk.document_id == document_id)
+            )
+            if not metadata_changed:
+                await db.rollback()  # release the row lock
+                return UpsertResult(document_id, "unchanged", chunks_count, 0, 0, chunks_count, 0)
+            await self._aupdate_metadata(db, document, metadata)
+            await db.commit()
+            return UpsertResult(document_id, "updated", chunks_count, 0, 0, chunks_count, 0)
+        
+        if chunks is None:
+            # The document changed between the unlocked read and the lock
+            with stage_timer("upsert", "chunk"):
+                chunks = await asyncio.to_thread(self.chunk_text, text, chunk_size, overlap, strategy)
+        
+        # Stored (chunk ID, position) pairs by hash; a list because a document may repeat a chunk
+        existing: Dict[str, List[Tuple[uuid.UUID, int]]] = {}
+        if document is None:
+            status = "created"
+            document = Document(
+                id=uuid.uuid4(),
+                collection=collection,
+                external_id=external_id,
+                text=text,
+                content_hash=document_hash,
+                metadata_=metadata
+            )
+            db.add(document)
+        else:
+            status = "updated"
+            rows = await db.execute(
+                select(DocumentChunk.id, DocumentChunk.content_hash, DocumentChunk.chunk_index)
+                .where(DocumentChunk.collection == collection, DocumentChunk.document_id == document.id)
+            )
+            for chunk_id, chunk_hash, chunk_index in rows:
+                existing.setdefault(chunk_hash, []).append((chunk_id, chunk_index))
+            document.text = text
+            document.content_hash = document_hash
+            document.updated_at = utc_now()
+            if metadata_changed:
+                await self._aupdate_metadata(db, document, metadata)
+        document_id = document.id
+        
+        # Diff: keep stored chunks whose text is still present, collect the new ones
+        new_chunks = []
+        moved = []
+        unchanged = 0
+        for chunk_index, chunk_text in enumerate(chunks):
+            chunk_hash = self.chunk_hash(chunk_text)
+            if existing.get(chunk_hash):
+                chunk_id, stored_index = existing[chunk_hash].pop()
+                if stored_index != chunk_index:
+                    moved.append({"id": chunk_id, "collection": collection, "chunk_index": chunk_index})
+                unchanged += 1
+            else:
+                new_chunks.append((chunk_index, chunk_text, chunk_hash))
+        removed_ids = [chunk_id for chunk_ids in existing.values() for chunk_id, _ in chunk_ids]
+        
+        # Only chunks a concurrent change left unprepared are embedded under the lock
+        late = [(chunk_text, chunk_hash) for _, chunk_text, chunk_hash in new_chunks if chunk_hash not in prepared]
+        if late:
+            with stage_timer("upsert", "embed", chunks=len(late)):
+                embeddings, _ = await self._aembed_reusing_stored(db, collection, late)
+            prepared.update((chunk_hash, embedding) for (_, chunk_hash), embedding in zip(late, embeddings))
+        reused = sum(1 for _, _, chunk_hash in new_chunks if chunk_hash in reused_hashes)
+        
+        if removed_ids:
+            await db.execute(delete(DocumentChunk).where(
+                DocumentChunk.collection == collection, DocumentChunk.id.in_(removed_ids)
+            ))
+        if moved:
+            # Kept chunks whose position shifted (bulk UPDATE by primary key)
+            await db.execute(update(DocumentChunk), moved)
+        db.add_all([
+            DocumentChunk(
+                collection=collection,
+                document_id=document_id,
+                text=chunk_text,
+                chunk_index=chunk_index,
+                content_hash=chunk_hash,
+                metadata_=metadata,
+                embedding=prepared[chunk_hash]
+            )
+            for chunk_index, chunk_text, chunk_hash in new_chunks
+        ])
+        
+        with stage_timer("upsert", "write"):
+            await db.commit()
+        
+        return UpsertResult(
+            document_id=document_id,
+            status=status,
+            chunks_count=len(chunks),
+            chunks_added=len(new_chunks),
+            chunks_removed=len(removed_ids),
+            chunks_unchanged=unchanged,
+            embeddings_reused=reused
+        )
+    
+    @staticmethod
+    async def _aupdate_metadata(db: AsyncSession, document: Document, metadata: Dict[str, Any]):
+        """Replace a document's metadata and the copy held by each of its stored chunks."""
+        document.metadata_ = metadata
+        document.updated_at = utc_now()
+        await db.execute(
+            update(DocumentChunk)
+            .where(DocumentChunk.collection == document.collection, DocumentChunk.document_id == document.id)
+            .values(metadata_=metadata)
+        )
+    
+    @staticmethod
+    async def _astored_embeddings(db: AsyncSession, collection: str, hashes: List[str]) -> Dict[str, Any]:
+        """
+        Stored vectors of any chunks in a collection with the given content hashes, by hash.
+        
+        Chunk hashes include the embedding model, so only vectors of the current
+        model match; the collection keeps reuse within one tenant's partition.
+        """
+        if not hashes:
+            return {}
+        rows = await db.execute(
+            select(DocumentChunk.content_hash, DocumentChunk.embedding)
+            .where(DocumentChunk.collection == collection, DocumentChunk.content_hash.in_(hashes))
+            .distinct(DocumentChunk.content_hash)
+        )
+        return {chunk_hash: embedding for chunk_hash, embedding in rows}
+    
+    async def _aembed_reusing_stored(
+        self,
+        db: AsyncSession,
+        collection: str,
+        chunks: List[Tuple[str, str]]
+    ) -> Tuple[List, int]:
+        """
+        Get embeddings for (text, hash) pairs, copying vectors of identical chunks stored in the collection.
+        
+        Returns:
+            Tuple of the embeddings in input order and how many were reused
+        """
+        if not chunks:
+            return [], 0
+        
+        stored = await self._astored_embeddings(db, collection, list({chunk_hash for _, chunk_hash in chunks}))
+        
+        missing = [chunk_text for chunk_text, chunk_hash in chunks if chunk_hash not in stored]
+        computed = iter(await self.embedding_service.acreate_embeddings(missing))
+        
+        embeddings = [
+            stored[chunk_hash] if chunk_hash in stored else next(computed)
+            for _, chunk_hash in chunks
+        ]
+        return embeddings, len(chunks) - len(missing)
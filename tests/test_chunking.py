@@ -0,0 +1,82 @@
+import pytest
+from services.chunking import Chunker, approx_token_count, resolve_strategy, CHUNKING_STRATEGY
+
+
+def word_count(text):
+    return max(1, len(text.split()))
+
+
+def uneven_count(text):
+    """Capital letters cost a token each and everything else a quarter, so the characters-per-token ratio varies."""
+    return max(1, sum(1 for char in text if char.isupper()) + sum(1 for char in text if not char.isupper()) // 4)
+
+
+SENTENCES = " ".join(f"Sentence number {i} talks about topic {i % 7}." for i in range(60))
+PARAGRAPHS = "\n\n".join(
+    " ".join(f"Paragraph {p} sentence {s} has some words." for s in range(4)) for p in range(8)
+)
+
+
+@pytest.mark.parametrize("strategy", ["sentence", "paragraph", "recursive"])
+@pytest.mark.parametrize("text", [SENTENCES, PARAGRAPHS, "x" * 5000, "lorem " * 800])
+def test_chunks_stay_within_the_token_budget(strategy, text):
+    chunker = Chunker(approx_token_count, max_tokens=40, overlap_tokens=8, strategy=strategy)
+    chunks = list(chunker.iter_chunks(text))
+    assert chunks
+    assert all(approx_token_count(chunk) <= 40 for chunk in chunks)
+
+
+def test_hard_split_reports_real_counts_and_splits_again_over_budget():
+    chunker = Chunker(uneven_count, max_tokens=20)
+    piece = "a" * 400 + "W" * 400
+    parts = list(chunker._hard_split(piece, uneven_count(piece)))
+    assert "".join(part for part, _ in parts) == piece
+    assert all(tokens == uneven_count(part) for part, tokens in parts)
+    assert all(tokens <= 20 for _, tokens in parts)
+
+
+def test_hard_split_keeps_a_single_character_over_budget():
+    chunker = Chunker(lambda text: 3 * len(text), max_tokens=2)
+    assert list(chunker._hard_split("ab", 6)) == [("a", 3), ("b", 3)]
+
+
+def test_overlap_repeats_the_tail_of_the_previous_chunk():
+    chunker = Chunker(word_count, max_tokens=30, overlap_tokens=8, strategy="sentence")
+    chunks = list(chunker.iter_chunks(SENTENCES))
+    assert len(chunks) > 2
+    for previous, current in zip(chunks, chunks[1:]):
+        last_sentence = previous.rsplit(". ", 1)[-1]
+        assert current.startswith(last_sentence)
+
+
+def test_without_overlap_chunks_reassemble_the_text():
+    chunker = Chunker(word_count, max_tokens=30, overlap_tokens=0, strategy="recursive")
+    chunks = list(chunker.iter_chunks(PARAGRAPHS))
+    assert " ".join(" ".join(chunks).split()) == " ".join(PARAGRAPHS.split())
+
+
+def test_paragraph_strategy_never_merges_paragraphs():
+    chunker = Chunker(word_count, max_tokens=500, strategy="paragraph")
+    chunks = list(chunker.iter_chunks(PARAGRAPHS))
+    assert chunks == [paragraph.strip() for paragraph in PARAGRAPHS.split("\n\n")]
+
+
+def test_recursive_strategy_packs_whole_paragraphs():
+    chunker = Chunker(word_count, max_tokens=500, strategy="recursive")
+    assert list(chunker.iter_chunks(PARAGRAPHS)) == [PARAGRAPHS]
+
+
+def test_character_strategy_uses_characters_with_overlap():
+    text = "abcdefghij" * 30
+    chunks = list(Chunker(max_tokens=100, overlap_tokens=20, strategy="characters").iter_chunks(text))
+    assert all(len(chunk) <= 100 for chunk in chunks)
+    for previous, current in zip(chunks, chunks[1:]):
+        assert current.startswith(previous[-20:])
+
+
+def test_unknown_strategy_is_rejected():
+    with pytest.raises(ValueError):
+        Chunker(strategy="nope")
+    with pytest.raises(ValueError):
+        resolve_strategy("nope")
+    assert resolve_strategy(None) == CHUNKING_STRATEGY
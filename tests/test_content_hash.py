@@ -0,0 +1,27 @@
+import hashlib
+from types import SimpleNamespace
+from services.store_embedding_service import StoreEmbeddingService, content_hash
+
+
+def store_service(fingerprint="models/a.gguf:100"):
+    return StoreEmbeddingService(SimpleNamespace(cache_namespace=fingerprint))
+
+
+def test_plain_content_hash_is_sha256_of_text():
+    assert content_hash("hello") == hashlib.sha256(b"hello").hexdigest()
+
+
+def test_document_hash_changes_with_chunking_parameters():
+    service = store_service()
+    base = service.document_hash("text", 500, 50, "recursive")
+    assert service.document_hash("text", 500, 50, "recursive") == base
+    assert service.document_hash("text", 400, 50, "recursive") != base
+    assert service.document_hash("text", 500, 0, "recursive") != base
+    assert service.document_hash("text", 500, 50, "sentence") != base
+
+
+def test_hashes_change_with_embedding_model():
+    first, second = store_service("models/a.gguf:100"), store_service("models/b.gguf:200")
+    assert first.document_hash("text") != second.document_hash("text")
+    assert first.chunk_hash("chunk") != second.chunk_hash("chunk")
+    assert first.chunk_hash("chunk") == store_service("models/a.gguf:100").chunk_hash("chunk")
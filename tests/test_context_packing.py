@@ -0,0 +1,71 @@
+from agent.context_packing import pack_results
+
+
+def word_count(text):
+    return len(text.split())
+
+
+def hit(document_id, chunk_index, text, similarity=0.9):
+    return {"document_id": document_id, "chunk_index": chunk_index, "chunk_text": text, "similarity": similarity}
+
+
+FIRST = "Alpha bravo charlie delta echo foxtrot golf hotel india juliet"
+# The chunker repeats the tail of the previous chunk at the start of the next
+SECOND = "golf hotel india juliet kilo lima mike november oscar papa"
+
+
+def test_adjacent_chunks_merge_without_the_repeated_overlap():
+    packed = pack_results([hit("d", 1, SECOND, 0.9), hit("d", 0, FIRST, 0.8)], word_count, token_budget=0)
+    assert packed.passages == 1 and packed.merged == 1
+    assert "Alpha bravo charlie delta echo foxtrot golf hotel india juliet kilo lima mike november oscar papa" in packed.text
+    assert packed.text.count("golf hotel") == 1
+    assert "(Similarity: 90.00%)" in packed.text  # the passage keeps its best hit
+
+
+def test_a_hit_between_two_passages_joins_them():
+    results = [hit("d", 0, "zero " * 10), hit("d", 2, "two " * 10), hit("d", 1, "one " * 10)]
+    packed = pack_results(results, word_count, token_budget=0)
+    assert packed.passages == 1 and packed.merged == 2
+    assert packed.text.index("zero") < packed.text.index("one") < packed.text.index("two")
+
+
+def test_gaps_inside_a_passage_are_marked():
+    result = {
+        "document_id": "d", "chunk_index": 0, "chunk_text": "start", "similarity": 0.9,
+        "context": [{"chunk_index": 0, "text": "start of the text"}, {"chunk_index": 2, "text": "much later on"}],
+    }
+    packed = pack_results([result], word_count, token_budget=0)
+    assert "start of the text\n[...]\nmuch later on" in packed.text
+
+
+def test_unpositioned_chunks_are_never_merged():
+    packed = pack_results([hit("d", None, "first text here"), hit("d", None, "other words entirely")], word_count, 0)
+    assert packed.passages == 2 and packed.merged == 0
+
+
+def test_near_duplicates_of_a_better_ranked_passage_are_dropped():
+    text = "the same paragraph was stored in two different documents by accident"
+    packed = pack_results([hit("a", 0, text, 0.9), hit("b", 0, text + " again", 0.8)], word_count, token_budget=0)
+    assert packed.passages == 1 and packed.duplicates == 1
+    assert packed.document_ids == {"a"}
+
+
+def test_a_passage_extending_a_shorter_one_is_kept():
+    short = "only a few words"
+    packed = pack_results([hit("a", 0, short), hit("b", 0, short + " followed by much more new material")], word_count, 0)
+    assert packed.passages == 2 and packed.duplicates == 0
+
+
+def test_passages_that_do_not_fit_are_skipped_for_smaller_ones():
+    results = [hit("a", 0, "short first"), hit("b", 0, "long " * 50), hit("c", 0, "short third")]
+    packed = pack_results(results, word_count, token_budget=20)
+    assert packed.document_ids == {"a", "c"}
+    assert packed.tokens <= 20 and not packed.truncated
+    assert packed.tokens_saved > 0
+    assert "[Result 2]" in packed.text and "[Result 3]" not in packed.text  # numbered as shown
+
+
+def test_the_first_passage_is_cut_rather_than_returning_nothing():
+    packed = pack_results([hit("a", 0, "word " * 100)], word_count, token_budget=30)
+    assert packed.truncated and packed.passages == 1
+    assert packed.tokens <= 30 and packed.text.endswith("[...]\n---")
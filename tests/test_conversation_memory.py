@@ -0,0 +1,75 @@
+import asyncio
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.messages.utils import count_tokens_approximately
+from services.conversation_memory import ConversationMemory
+from services.session_store import SessionState, SQLiteSessionStore
+
+
+def turns(count, words=20):
+    messages = []
+    for i in range(count):
+        messages.append(HumanMessage(content=f"question {i} " + "word " * words))
+        messages.append(AIMessage(content=f"answer {i} " + "word " * words))
+    return messages
+
+
+class RecordingMemory(ConversationMemory):
+    """Summarizes without an LLM, recording what it was asked to fold in."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.folded = []
+
+    async def _asummarize(self, summary, messages):
+        self.folded.append(messages)
+        return f"{summary}+{len(messages)}"
+
+
+def test_a_stateless_request_sends_only_the_message():
+    messages = ConversationMemory.context_messages(None, "hello")
+    assert [(type(message), message.content) for message in messages] == [(HumanMessage, "hello")]
+
+
+def test_history_comes_first_and_the_summary_prefixes_the_first_question():
+    session = SessionState(session_id="s", summary="User is called Ada.", messages=turns(1))
+    messages = ConversationMemory.context_messages(session, "what is my name?")
+    assert len(messages) == 3 and messages[-1].content == "what is my name?"
+    assert messages[0].content.startswith("Summary of the conversation so far:\nUser is called Ada.\n\nquestion 0")
+    assert session.messages[0].content.startswith("question 0")  # the stored history is left alone
+
+
+def test_a_summary_without_history_prefixes_the_new_message():
+    session = SessionState(session_id="s", summary="Earlier: talked about pgvector.")
+    messages = ConversationMemory.context_messages(session, "and hnsw?")
+    assert len(messages) == 1 and messages[0].content.endswith("talked about pgvector.\n\nand hnsw?")
+
+
+def test_split_keeps_the_newest_whole_turns_within_the_budget():
+    messages = turns(4)
+    two_turns = count_tokens_approximately(messages[4:])
+    memory = ConversationMemory(store=object(), max_tokens=10_000, keep_tokens=two_turns)
+    assert memory._split(messages) == 4
+    memory.keep_tokens = two_turns - 1
+    assert memory._split(messages) == 6
+
+
+def test_split_always_keeps_the_last_turn():
+    memory = ConversationMemory(store=object(), max_tokens=10_000, keep_tokens=1)
+    assert memory._split(turns(3, words=200)) == 4
+
+
+def test_recording_folds_the_oldest_turns_once_over_budget(tmp_path):
+    store = SQLiteSessionStore(str(tmp_path / "sessions.sqlite"))
+    one_turn = count_tokens_approximately(turns(1))
+    memory = RecordingMemory(store=store, max_tokens=3 * one_turn, keep_tokens=one_turn)
+
+    async def run():
+        for i in range(4):
+            async with memory.turn("s") as session:
+                await memory.arecord_turn(session, f"question {i} " + "word " * 20, f"answer {i} " + "word " * 20)
+        return await store.aload("s")
+
+    session = asyncio.run(run())
+    assert [len(messages) for messages in memory.folded] == [6]
+    assert session.summary == "+6"
+    assert [message.content.split()[:2] for message in session.messages] == [["question", "3"], ["answer", "3"]]
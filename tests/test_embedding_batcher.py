@@ -0,0 +1,91 @@
+import threading
+import pytest
+from services.embedding_batcher import EmbeddingBatcher, EmbeddingQueueFull
+
+
+def fake_embed(texts):
+    """One-value "embedding" per text, so results can be traced back to their text."""
+    if any(text.startswith("bad") for text in texts):
+        raise ValueError("cannot embed")
+    return [[float(len(text))] for text in texts]
+
+
+class RecordingEmbed:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, texts):
+        self.calls.append(list(texts))
+        return fake_embed(texts)
+
+
+def test_concurrent_requests_share_a_batch():
+    embed = RecordingEmbed()
+    batcher = EmbeddingBatcher(embed, max_batch_size=32, max_wait_ms=200)
+    futures = [batcher.submit(["a", "bb"]), batcher.submit(["ccc"]), batcher.submit(["dddd", "eeeee"])]
+    for future in futures:
+        future.result(timeout=5)
+    assert embed.calls == [["a", "bb", "ccc", "dddd", "eeeee"]]
+
+
+def test_each_caller_gets_its_own_embeddings_in_order():
+    batcher = EmbeddingBatcher(fake_embed, max_batch_size=32, max_wait_ms=200)
+    first = batcher.submit(["xxx", "x", "xx"])
+    second = batcher.submit(["yyyyy", "yyyy"])
+    assert first.result(timeout=5) == [[3.0], [1.0], [2.0]]
+    assert second.result(timeout=5) == [[5.0], [4.0]]
+
+
+def test_batches_are_split_at_max_batch_size():
+    embed = RecordingEmbed()
+    batcher = EmbeddingBatcher(embed, max_batch_size=2, max_wait_ms=0)
+    assert batcher.submit(["a", "bb", "ccc"]).result(timeout=5) == [[1.0], [2.0], [3.0]]
+    assert embed.calls == [["a", "bb"], ["ccc"]]
+
+
+def test_empty_request_resolves_without_inference():
+    embed = RecordingEmbed()
+    batcher = EmbeddingBatcher(embed)
+    assert batcher.submit([]).result(timeout=5) == []
+    assert embed.calls == []
+
+
+def test_submit_rejects_when_queue_is_full():
+    started, release = threading.Event(), threading.Event()
+
+    def blocking_embed(texts):
+        started.set()
+        release.wait(5)
+        return fake_embed(texts)
+
+    batcher = EmbeddingBatcher(blocking_embed, max_batch_size=1, max_wait_ms=0, max_pending=1)
+    running = batcher.submit(["a"])
+    assert started.wait(5)  # the worker holds the first request
+    queued = batcher.submit(["b"])
+    with pytest.raises(EmbeddingQueueFull):
+        batcher.submit(["c"])
+    release.set()
+    assert running.result(timeout=5) == [[1.0]]
+    assert queued.result(timeout=5) == [[1.0]]
+
+
+def test_failing_request_does_not_fail_its_batch():
+    embed = RecordingEmbed()
+    batcher = EmbeddingBatcher(embed, max_batch_size=32, max_wait_ms=200)
+    good = batcher.submit(["aa"])
+    bad = batcher.submit(["bad text"])
+    other = batcher.submit(["ccc", "d"])
+    assert good.result(timeout=5) == [[2.0]]
+    assert other.result(timeout=5) == [[3.0], [1.0]]
+    with pytest.raises(ValueError):
+        bad.result(timeout=5)
+    # One combined attempt, then one per request
+    assert embed.calls == [["aa", "bad text", "ccc", "d"], ["aa"], ["bad text"], ["ccc", "d"]]
+
+
+def test_failure_of_a_lone_request_is_not_retried():
+    embed = RecordingEmbed()
+    batcher = EmbeddingBatcher(embed, max_wait_ms=0)
+    with pytest.raises(ValueError):
+        batcher.submit(["bad"]).result(timeout=5)
+    assert embed.calls == [["bad"]]
@@ -0,0 +1,33 @@
+from services.embedding_cache import EmbeddingCache
+
+
+def test_lookups_return_copies_the_caller_may_modify():
+    cache = EmbeddingCache(max_entries=10, path=None)
+    stored = [0.5, 0.25]
+    cache.put_many({"key": stored})
+    stored.append(1.0)  # the caller keeps using what it stored
+
+    first = cache.get_many(["key"])["key"]
+    first[0] = 9.0
+    assert cache.get_many(["key"])["key"] == [0.5, 0.25]
+    assert cache.get_many(["key"])["key"] is not cache.get_many(["key"])["key"]
+
+
+def test_disk_hits_are_promoted_as_copies(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    EmbeddingCache(max_entries=10, path=path).put_many({"key": [0.5, 0.25]})
+
+    cache = EmbeddingCache(max_entries=10, path=path)
+    from_disk = cache.get_many(["key"])["key"]
+    from_disk[0] = 9.0
+    assert cache.get_many(["key"])["key"] == [0.5, 0.25]
+    assert cache.stats()["disk_hits"] == 1 and cache.stats()["hits"] == 1
+
+
+def test_least_recently_used_entries_are_evicted():
+    cache = EmbeddingCache(max_entries=2, path=None)
+    cache.put_many({"a": [1.0], "b": [2.0]})
+    cache.get_many(["a"])
+    cache.put_many({"c": [3.0]})
+    assert set(cache.get_many(["a", "b", "c"])) == {"a", "c"}
+    assert cache.stats()["evictions"] == 1
@@ -0,0 +1,55 @@
+import os
+import numpy as np
+from services.local_vector_index import LocalVectorIndex
+from services.search_backends import LocalIndexBackend
+from services.search_options import SearchOptions
+
+
+def make_chunks(document_id, count, offset=0):
+    return [
+        {"chunk_id": f"{document_id}-{offset + i}", "chunk_text": f"text {offset + i}", "chunk_index": offset + i,
+         "document_id": document_id, "metadata": {}, "created_at": None}
+        for i in range(count)
+    ]
+
+
+def test_reading_a_missing_index_creates_nothing(tmp_path):
+    index = LocalVectorIndex(str(tmp_path / "missing"), dim=4)
+    assert len(index) == 0
+    assert index.search([1, 0, 0, 0]) == []
+    assert not os.path.exists(index.path)
+
+
+def test_backend_lookup_of_an_unknown_collection_creates_nothing(tmp_path):
+    backend = LocalIndexBackend(str(tmp_path))
+    assert backend.search(None, [0.0] * 4, SearchOptions(collection="nothing_here")) == []
+    assert not backend.has_collection("nothing_here")
+    assert os.listdir(tmp_path) == []
+
+
+def test_appends_grow_the_file_in_blocks_and_survive_a_reload(tmp_path):
+    path = str(tmp_path / "index")
+    index = LocalVectorIndex(path, dim=4)
+    index.append(np.eye(4)[:3], make_chunks("a", 3))
+    size = os.path.getsize(index.vectors_path)
+    assert size > 3 * 4 * 4  # capacity reserved ahead of the rows
+    index.append(np.eye(4)[3:], make_chunks("a", 1, offset=3))
+    assert os.path.getsize(index.vectors_path) == size  # written into the existing mapping
+
+    reloaded = LocalVectorIndex(path, dim=4)
+    assert len(reloaded) == 4
+    assert reloaded.search([0, 0, 0, 1], limit=1)[0]["chunk_id"] == "a-3"
+    assert reloaded.context("a", 1, 1) == [
+        {"chunk_index": 0, "text": "text 0"}, {"chunk_index": 1, "text": "text 1"}, {"chunk_index": 2, "text": "text 2"}
+    ]
+    reloaded.append(np.ones((1, 4)), make_chunks("b", 1))
+    assert len(LocalVectorIndex(path, dim=4)) == 5
+
+
+def test_a_search_keeps_its_snapshot_across_an_append(tmp_path):
+    index = LocalVectorIndex(str(tmp_path / "index"), dim=4)
+    index.append(np.eye(4)[:2], make_chunks("a", 2))
+    vectors, chunks = index._vectors, index._chunks
+    index.append(np.eye(4)[2:], make_chunks("a", 2, offset=2))
+    assert len(vectors) == 2 and len(chunks) == 4  # the chunk list is extended in place
+    assert len(index.search([0, 0, 1, 0], limit=4)) == 4
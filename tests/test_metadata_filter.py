@@ -0,0 +1,108 @@
+import json
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from services.metadata_filter import MetadataFilter
+
+# (filter, metadata, whether the document matches)
+CASES = [
+    ({"source": "wiki"}, {"source": "wiki"}, True),
+    ({"source": "wiki"}, {"source": "web"}, False),
+    ({"source": "wiki"}, {}, False),
+    ({"flag": True}, {"flag": 1}, False),
+    ({"rank": 2}, {"rank": 2.0}, True),
+    ({"tags": {"$contains": ["python", "sql"]}}, {"tags": ["sql", "go", "python"]}, True),
+    ({"tags": {"$contains": ["python", "sql"]}}, {"tags": ["python"]}, False),
+    ({"tags": {"$contains": "python"}}, {"tags": ["python"]}, True),
+    ({"tags": {"$contains": "python"}}, {"tags": "python"}, False),
+    ({"lang": {"$in": ["en", "de"]}}, {"lang": "de"}, True),
+    ({"lang": {"$in": ["en", "de"]}}, {"lang": "fr"}, False),
+    ({"lang": {"$in": ["en", "de"]}}, {"lang": ["fr", "en"]}, True),
+    ({"lang": {"$in": ["en", "de"]}}, {}, False),
+    ({"published": {"$gte": "2024-01-01", "$lt": "2025-01-01"}}, {"published": "2024-06-30"}, True),
+    ({"published": {"$gte": "2024-01-01", "$lt": "2025-01-01"}}, {"published": "2025-01-01"}, False),
+    ({"published": {"$gte": "2024-01-01"}}, {"published": 20240601}, False),
+    ({"rank": {"$gt": 2}}, {"rank": 3}, True),
+    ({"rank": {"$gt": 2}}, {"rank": "3"}, False),
+    ({"rank": {"$lte": 2}}, {"rank": [5, 1]}, True),
+    ({"source": {"$ne": "wiki"}}, {"source": "web"}, True),
+    ({"source": {"$ne": "wiki"}}, {"source": "wiki"}, False),
+    ({"source": {"$ne": "wiki"}}, {}, False),
+    ({"draft": {"$exists": False}}, {}, True),
+    ({"draft": {"$exists": False}}, {"draft": False}, False),
+    ({"draft": {"$exists": True}}, {"draft": None}, True),
+    ({"source": "wiki", "lang": {"$in": ["en"]}}, {"source": "wiki", "lang": "de"}, False),
+]
+
+
+@pytest.mark.parametrize("filters, metadata, expected", CASES)
+def test_python_evaluation(filters, metadata, expected):
+    assert MetadataFilter.parse(filters).matches(metadata) is expected
+
+
+def test_equality_and_contains_compile_into_one_containment_value():
+    compiled = MetadataFilter.parse({"source": "wiki", "tags": {"$contains": "python"}})
+    assert json.loads(compiled.containment_json) == {"source": "wiki", "tags": ["python"]}
+    assert compiled.jsonpath is None
+
+
+def test_other_operators_compile_into_one_jsonpath_predicate():
+    compiled = MetadataFilter.parse({
+        "lang": {"$in": ["en", "de"]}, "published": {"$gte": "2024-01-01"}, "draft": {"$exists": False}
+    })
+    assert compiled.containment_json is None
+    assert compiled.jsonpath == (
+        '($."lang" == "en" || $."lang" == "de") && $."published" >= "2024-01-01" && !(exists($."draft"))'
+    )
+
+
+def test_keys_are_quoted_in_the_jsonpath():
+    compiled = MetadataFilter.parse({'odd key "x"': {"$gt": 1}})
+    assert compiled.jsonpath == '$."odd key \\"x\\"" > 1'
+
+
+def test_empty_filters_compile_to_nothing():
+    assert MetadataFilter.parse(None) is None
+    assert MetadataFilter.parse({}) is None
+
+
+@pytest.mark.parametrize("filters", [
+    ["source"],
+    {"$source": "wiki"},
+    {"source": {}},
+    {"source": {"$like": "w%"}},
+    {"source": {"$eq": ["a"]}},
+    {"lang": {"$in": []}},
+    {"lang": {"$in": "en"}},
+    {"draft": {"$exists": "yes"}},
+    {"rank": {"$gt": None}},
+    {"rank": {"$gt": True}},
+    {"tags": {"$eq": "a", "$contains": ["b"]}},
+])
+def test_malformed_filters_are_rejected(filters):
+    with pytest.raises(ValueError):
+        MetadataFilter.parse(filters)
+
+
+@pytest.fixture(scope="module")
+def connection():
+    from database.database import engine
+    try:
+        conn = engine.connect()
+    except SQLAlchemyError:
+        pytest.skip("database not reachable")
+    yield conn
+    conn.close()
+
+
+@pytest.mark.parametrize("filters, metadata, expected", CASES)
+def test_sql_agrees_with_python(connection, filters, metadata, expected):
+    compiled = MetadataFilter.parse(filters)
+    matched = connection.scalar(
+        text("""
+            SELECT (CAST(:containment AS jsonb) IS NULL OR CAST(:metadata AS jsonb) @> CAST(:containment AS jsonb))
+               AND (CAST(:jsonpath AS jsonpath) IS NULL OR CAST(:metadata AS jsonb) @@ CAST(:jsonpath AS jsonpath))
+        """),
+        {"metadata": json.dumps(metadata), "containment": compiled.containment_json, "jsonpath": compiled.jsonpath}
+    )
+    assert bool(matched) is expected
@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("llama_cpp")
+
+from services.reranker_service import maximal_marginal_relevance
+
+# Two near-identical candidates and a different, slightly less relevant one
+VECTORS = np.array([[1.0, 0.0], [0.99, 0.01], [0.0, 1.0]], dtype=np.float32)
+RELEVANCE = np.array([0.9, 0.89, 0.8], dtype=np.float32)
+
+
+def test_relevance_alone_keeps_the_ranking():
+    assert maximal_marginal_relevance(VECTORS, RELEVANCE, 3, 1.0) == [0, 1, 2]
+
+
+def test_a_near_duplicate_loses_to_a_different_candidate():
+    assert maximal_marginal_relevance(VECTORS, RELEVANCE, 2, 0.5) == [0, 2]
+
+
+def test_the_most_relevant_candidate_is_always_picked_first():
+    assert maximal_marginal_relevance(VECTORS, np.array([0.1, 0.2, 0.3]), 1, 0.0) == [2]
+
+
+def test_picks_are_unique_and_capped_by_the_candidates():
+    picked = maximal_marginal_relevance(VECTORS, RELEVANCE, 10, 0.3)
+    assert sorted(picked) == [0, 1, 2]
+
+
+def test_zero_vectors_are_not_similar_to_anything():
+    vectors = np.array([[1.0, 0.0], [0.0, 0.0], [1.0, 0.0]], dtype=np.float32)
+    assert maximal_marginal_relevance(vectors, np.array([0.9, 0.5, 0.85]), 2, 0.5) == [0, 1]
+
+
+def test_nothing_to_pick():
+    assert maximal_marginal_relevance(np.empty((0, 2)), np.array([]), 3, 0.5) == []
+    assert maximal_marginal_relevance(VECTORS, RELEVANCE, 0, 0.5) == []
@@ -0,0 +1,35 @@
+import os
+import pytest
+
+pytest.importorskip("llama_cpp")
+
+from services.reranker_service import RerankerService, RERANKER_MODEL_PATH
+
+pytestmark = pytest.mark.skipif(not os.path.exists(RERANKER_MODEL_PATH), reason="reranker model not downloaded")
+
+QUERY = "What is the capital of France?"
+RELEVANT = "Paris is the capital and largest city of France."
+UNRELATED = "Bananas are a good source of potassium."
+
+
+@pytest.fixture(scope="module")
+def reranker():
+    service = RerankerService(n_threads=2, workers=0)
+    yield service
+    service.shutdown()
+
+
+def test_scores_a_known_pair(reranker):
+    relevant, unrelated = reranker.score(QUERY, [RELEVANT, UNRELATED])
+    assert relevant > unrelated
+
+
+def test_rank_pooling_returns_only_the_class_scores(reranker):
+    outputs = reranker.llm.embed(reranker._pairs(QUERY, [RELEVANT, UNRELATED]))
+    assert [len(output) for output in outputs] == [1, 1]
+
+
+def test_score_does_not_depend_on_batch_neighbours(reranker):
+    alone = reranker.score(QUERY, [RELEVANT])[0]
+    batched = reranker.score(QUERY, [UNRELATED, RELEVANT, UNRELATED])[1]
+    assert alone == pytest.approx(batched, abs=1e-3)
@@ -0,0 +1,91 @@
+import asyncio
+from datetime import datetime
+import numpy as np
+from services import response_cache
+from services.response_cache import SemanticResponseCache
+
+ANSWERED_AT = datetime(2026, 1, 1)
+
+
+def unit(angle):
+    """A 2-d question embedding; cosine distance between two of them is 1 - cos(angle difference)."""
+    return [float(np.cos(angle)), float(np.sin(angle))]
+
+
+def cache_with_answer(**kwargs):
+    cache = SemanticResponseCache(**{"max_entries": 10, "ttl": 60, "max_distance": 0.05, **kwargs})
+    cache.put("docs", unit(0.0), "question", "answer", ["doc-1", "doc-2"], ANSWERED_AT)
+    return cache
+
+
+def test_a_close_question_hits_and_a_distant_one_misses():
+    cache = cache_with_answer()
+    assert cache.lookup("docs", unit(0.3)).answer == "answer"  # distance 0.045
+    assert cache.lookup("docs", unit(0.35)) is None  # distance 0.061
+
+
+def test_entries_belong_to_their_collection():
+    assert cache_with_answer().lookup("other", unit(0.0)) is None
+
+
+def test_the_closest_question_wins():
+    cache = cache_with_answer()
+    cache.put("docs", unit(0.2), "closer", "closer answer", ["doc-3"], ANSWERED_AT)
+    assert cache.lookup("docs", unit(0.25)).answer == "closer answer"
+
+
+def test_ungrounded_answers_are_not_cached():
+    cache = SemanticResponseCache(max_entries=10, ttl=60, max_distance=0.05)
+    assert cache.put("docs", unit(0.0), "question", "answer", [], ANSWERED_AT) is None
+    assert cache.stats()["size"] == 0
+
+
+def test_entries_expire_after_the_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(response_cache.time, "monotonic", lambda: now[0])
+    cache = cache_with_answer(ttl=60)
+    now[0] += 59
+    assert cache.lookup("docs", unit(0.0)) is not None
+    now[0] += 1
+    assert cache.lookup("docs", unit(0.0)) is None
+    assert cache.stats()["size"] == 0
+
+
+def test_least_recently_used_entries_are_evicted():
+    cache = cache_with_answer(max_entries=2)
+    cache.put("docs", unit(1.0), "second", "second answer", ["doc-3"], ANSWERED_AT)
+    cache.lookup("docs", unit(0.0))
+    cache.put("docs", unit(2.0), "third", "third answer", ["doc-4"], ANSWERED_AT)
+    assert cache.lookup("docs", unit(0.0)) is not None
+    assert cache.lookup("docs", unit(1.0)) is None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_modifying_a_cited_document_invalidates_its_answers():
+    cache = cache_with_answer()
+    assert cache.invalidate_documents(["doc-9"]) == 0
+    assert cache.invalidate_documents(["doc-2"]) == 1
+    assert cache.lookup("docs", unit(0.0)) is None
+
+
+def test_deleting_a_collection_invalidates_its_answers():
+    cache = cache_with_answer()
+    cache.put("other", unit(0.0), "question", "answer", ["doc-5"], ANSWERED_AT)
+    assert cache.invalidate_collection("docs") == 1
+    assert cache.lookup("docs", unit(0.0)) is None
+    assert cache.lookup("other", unit(0.0)) is not None
+
+
+def test_an_entry_failing_validation_is_dropped_as_a_miss(monkeypatch):
+    cache = cache_with_answer()
+    valid = [True]
+
+    async def avalidate(entry):
+        return valid[0]
+
+    monkeypatch.setattr(cache, "avalidate", avalidate)
+    assert asyncio.run(cache.alookup("docs", unit(0.0))).answer == "answer"
+    valid[0] = False
+    assert asyncio.run(cache.alookup("docs", unit(0.0))) is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["invalidations"], stats["size"]) == (1, 1, 1, 0)
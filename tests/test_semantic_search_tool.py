@@ -0,0 +1,23 @@
+from agent.tools.semantic_search_tool import _interleave
+
+
+def hits(*chunk_ids):
+    return [{"chunk_id": chunk_id} for chunk_id in chunk_ids]
+
+
+def ids(results):
+    return [result["chunk_id"] for result in results]
+
+
+def test_results_are_merged_rank_by_rank():
+    assert ids(_interleave([hits("a1", "a2", "a3"), hits("b1", "b2", "b3")])) == ["a1", "b1", "a2", "b2", "a3", "b3"]
+
+
+def test_a_chunk_found_by_several_queries_keeps_its_first_position():
+    assert ids(_interleave([hits("x", "a2"), hits("b1", "x", "b3")])) == ["x", "b1", "a2", "b3"]
+
+
+def test_shorter_and_empty_lists_drop_out():
+    assert ids(_interleave([hits("a1"), [], hits("c1", "c2", "c3")])) == ["a1", "c1", "c2", "c3"]
+    assert _interleave([]) == []
+    assert _interleave([[], []]) == []
@@ -0,0 +1,121 @@
+import time
+from contextlib import contextmanager
+from prometheus_client import Counter, Gauge, Histogram, REGISTRY
+from prometheus_client.core import GaugeMetricFamily
+from utils.tracing import start_span
+
+# Latency buckets (seconds) shared by the request and stage histograms
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+TOKEN_BUCKETS = (50, 100, 250, 500, 1000, 2000, 4000, 8000, 16000)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS
+)
+EMBEDDING_BATCH_SECONDS = Histogram(
+    "embedding_batch_duration_seconds",
+    "Embedding inference time per llama.cpp batch",
+    ["model", "batch_size"],
+    buckets=LATENCY_BUCKETS
+)
+EMBEDDING_BATCH_TEXTS = Histogram(
+    "embedding_batch_texts",
+    "Texts embedded per llama.cpp batch",
+    ["model"],
+    buckets=BATCH_SIZE_BUCKETS
+)
+SEARCH_QUERY_SECONDS = Histogram(
+    "search_query_duration_seconds",
+    "Time spent in the search SQL statement",
+    ["backend", "mode"],
+    buckets=LATENCY_BUCKETS
+)
+STAGE_SECONDS = Histogram(
+    "stage_duration_seconds",
+    "Latency of each stage of an operation (chat, search, store...)",
+    ["operation", "stage"],
+    buckets=LATENCY_BUCKETS
+)
+AGENT_STEPS = Histogram(
+    "agent_steps",
+    "LLM calls made by the agent to answer one chat request",
+    buckets=(1, 2, 3, 4, 5, 6, 8, 10, 15, 20)
+)
+TOOL_SECONDS = Histogram(
+    "tool_duration_seconds",
+    "Agent tool latency",
+    ["tool", "status"],
+    buckets=LATENCY_BUCKETS
+)
+LLM_SECONDS = Histogram(
+    "llm_request_duration_seconds",
+    "Latency of one LLM call",
+    ["model"],
+    buckets=LATENCY_BUCKETS
+)
+LLM_TOKENS = Counter(
+    "llm_tokens_total",
+    "Tokens reported by the LLM",
+    ["model", "type"]
+)
+SEARCH_CONTEXT_TOKENS = Histogram(
+    "search_context_tokens",
+    "LLM tokens of search results per tool call, before (raw) and after (packed) context packing",
+    ["stage"],
+    buckets=TOKEN_BUCKETS
+)
+CHAT_CACHE_LOOKUPS = Counter(
+    "chat_cache_lookups_total",
+    "Semantic answer cache lookups (stale = matched but its documents changed; also counted as miss)",
+    ["result"]
+)
+CHAT_CACHE_ENTRIES = Gauge(
+    "chat_cache_entries",
+    "Answers held in the semantic answer cache"
+)
+
+
+def batch_size_label(size: int) -> str:
+    """Round a batch size up to a power of two, keeping the label set small."""
+    bucket = 1
+    while bucket < size:
+        bucket *= 2
+    return str(bucket)
+
+
+@contextmanager
+def stage_timer(operation: str, stage: str, **attributes):
+    """
+    Time one stage of an operation into STAGE_SECONDS (and a trace span when tracing is on).
+
+    Args:
+        operation: Operation the stage belongs to, e.g. "chat" or "search"
+        stage: Stage name, e.g. "embed" or "sql"
+        **attributes: Extra span attributes
+    """
+    start = time.perf_counter()
+    with start_span(f"{operation}.{stage}", attributes):
+        try:
+            yield
+        finally:
+            STAGE_SECONDS.labels(operation, stage).observe(time.perf_counter() - start)
+
+
+class DatabasePoolCollector:
+    """Reports the connection pool counters of both engines at scrape time."""
+
+    def collect(self):
+        from database.database import pool_stats
+
+        stats = pool_stats()
+        for field in ("size", "checked_out", "checked_in", "overflow", "max_overflow"):
+            gauge = GaugeMetricFamily(f"db_pool_{field}", f"Connection pool {field.replace('_', ' ')}", labels=["engine"])
+            for engine_name, counters in stats.items():
+                gauge.add_metric([engine_name], counters[field])
+            yield gauge
+
+
+REGISTRY.register(DatabasePoolCollector())
@@ -1,17 +1,32 @@
 import functools
+import inspect
+import time
 from typing import Callable
 from utils.logger import logger
+from utils.metrics import TOOL_SECONDS
+from utils.tracing import start_span
+
+
+class ToolErrorMessage(str):
+    """
+    Error text returned to the LLM instead of raising.
+
+    Tools that report failures to the model as their answer return this, so
+    log_tool_call still logs and counts the call as an error.
+    """
 
 
 def log_tool_call(func: Callable) -> Callable:
     """
     Decorator to automatically log tool calls.
-    Logs [TOOL START], [TOOL END], and [TOOL ERROR] for all tool functions.
+    Logs [TOOL START], [TOOL END], and [TOOL ERROR] for all tool functions,
+    records the call in the tool_duration_seconds histogram and wraps it in a span.
+    A returned ToolErrorMessage counts as an error, like a raised exception.
+    Works for both sync and async tools.
     """
-    @functools.wraps(func)
-    def wrapper(*args, **kwargs):
-        tool_name = func.__name__
-        
+    tool_name = func.__name__
+    
+    def log_start(args, kwargs):
         # Format arguments for logging
         args_str = ", ".join([str(arg) for arg in args])
         kwargs_str = ", ".join([f"{k}={v}" for k, v in kwargs.items()])
@@ -19,22 +34,61 @@ def log_tool_call(func: Callable) -> Callable:
         
         # Log tool start
         logger.info(f"[TOOL START] {tool_name}: {all_args}")
+    
+    def log_end(result):
+        result_str = str(result)
+        len_result_str = len(result_str)
+        
+        # Log tool end
+        logger.info(f"[TOOL END] {tool_name}: {result_str[:100]}{' (truncated)' if len_result_str > 100 else ''}")
+    
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            log_start(args, kwargs)
+            start = time.perf_counter()
+            status = "ok"
+            try:
+                with start_span(f"tool.{tool_name}"):
+                    result = await func(*args, **kwargs)
+                if isinstance(result, ToolErrorMessage):
+                    status = "error"
+                    logger.error(f"[TOOL ERROR] {tool_name}: {result}")
+                else:
+                    log_end(result)
+                return result
+            except Exception as e:
+                # Log tool error
+                status = "error"
+                logger.error(f"[TOOL ERROR] {tool_name}: {str(e)}")
+                raise
+            finally:
+                TOOL_SECONDS.labels(tool_name, status).observe(time.perf_counter() - start)
         
+        return async_wrapper
+    
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        log_start(args, kwargs)
+        start = time.perf_counter()
+        status = "ok"
         try:
             # Execute the tool function
-            result = func(*args, **kwargs)
-            
-            result_str = str(result)
-            len_result_str = len(result_str)
-            
-            # Log tool end
-            logger.info(f"[TOOL END] {tool_name}: {result_str[:100]}{' (truncated)' if len_result_str > 100 else ''}")
-            
+            with start_span(f"tool.{tool_name}"):
+                result = func(*args, **kwargs)
+            if isinstance(result, ToolErrorMessage):
+                status = "error"
+                logger.error(f"[TOOL ERROR] {tool_name}: {result}")
+            else:
+                log_end(result)
             return result
             
         except Exception as e:
             # Log tool error
+            status = "error"
             logger.error(f"[TOOL ERROR] {tool_name}: {str(e)}")
             raise
+        finally:
+            TOOL_SECONDS.labels(tool_name, status).observe(time.perf_counter() - start)
     
     return wrapper
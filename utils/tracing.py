@@ -0,0 +1,60 @@
+import os
+from contextlib import contextmanager
+from typing import Dict, Optional
+from utils.logger import logger
+
+# Optional OpenTelemetry span export (needs opentelemetry-sdk and opentelemetry-exporter-otlp)
+OTEL_ENABLED = os.getenv("OTEL_ENABLED", "false").lower() == "true"
+OTEL_EXPORTER_OTLP_ENDPOINT = os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT", "http://localhost:4317")
+OTEL_SERVICE_NAME = os.getenv("OTEL_SERVICE_NAME", "rag-app")
+
+_tracer = None
+
+
+def setup_tracing():
+    """
+    Start exporting spans to the OTLP collector if OTEL_ENABLED is set.
+
+    Missing OpenTelemetry packages only disable tracing; the app keeps running.
+    """
+    global _tracer
+    if not OTEL_ENABLED or _tracer is not None:
+        return
+    try:
+        from opentelemetry import trace
+        from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+    except ImportError:
+        logger.warning("[OTEL] OTEL_ENABLED is set but opentelemetry-sdk/exporter are not installed; tracing disabled")
+        return
+
+    provider = TracerProvider(resource=Resource.create({"service.name": OTEL_SERVICE_NAME}))
+    provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter(endpoint=OTEL_EXPORTER_OTLP_ENDPOINT, insecure=True)))
+    trace.set_tracer_provider(provider)
+    _tracer = trace.get_tracer("rag_app")
+    logger.info(f"[OTEL] exporting spans to {OTEL_EXPORTER_OTLP_ENDPOINT}")
+
+
+def shutdown_tracing():
+    """Flush spans still buffered for export."""
+    if _tracer is not None:
+        from opentelemetry import trace
+
+        trace.get_tracer_provider().shutdown()
+
+
+@contextmanager
+def start_span(name: str, attributes: Optional[Dict] = None):
+    """
+    Open a span as a child of the current one; does nothing when tracing is off.
+
+    Yields:
+        The span, or None when tracing is off
+    """
+    if _tracer is None:
+        yield None
+        return
+    with _tracer.start_as_current_span(name, attributes=attributes or None) as span:
+        yield span